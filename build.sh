@@ -14,6 +14,9 @@ python manage.py collectstatic --no-input
 # Run migrations
 python manage.py migrate
 
+# Create the cache table in case CACHE_URL points at db://
+python manage.py createcachetable
+
 # Create superuser if it doesn't exist
 python manage.py shell << END
 from django.contrib.auth import get_user_model
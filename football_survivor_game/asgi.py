@@ -2,6 +2,8 @@
 ASGI config for football_survivor_game project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Live event streams under /survivor/live/ are served by survivor.streams
+directly, so idle listeners never occupy Django's request handling.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'football_survivor_game.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, since it loads models
+from survivor.streams import PREFIX as LIVE_EVENTS_PREFIX, live_events  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'].startswith(LIVE_EVENTS_PREFIX):
+        await live_events(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
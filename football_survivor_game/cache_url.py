@@ -0,0 +1,54 @@
+"""
+Cache backend configuration from a URL, in the spirit of dj-database-url.
+
+    redis://[:password@]host:6379/0  (or rediss://)   RedisCache, needs the redis package
+    file:///var/cache/survivor                       FileBasedCache in that directory
+    db://survivor_cache                              DatabaseCache; run createcachetable
+    locmem://[name]                                  LocMemCache, private to the process
+    dummy://                                         DummyCache, caches nothing
+
+The file and db backends keep up to ?max_entries= keys (100000 by default).
+Django's default of 300 is soon reached with a page kept per user, and every
+write past it deletes a random third of the keys, locks and counters included.
+"""
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+DEFAULT_TABLE = 'survivor_cache'
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def parse(url):
+    """The CACHES entry for a cache URL"""
+    parts = urlsplit(url)
+    if parts.scheme not in BACKENDS:
+        raise ImproperlyConfigured(
+            f"Unsupported cache URL {url!r}; use one of {', '.join(f'{s}://' for s in BACKENDS)}"
+        )
+    config = {'BACKEND': BACKENDS[parts.scheme]}
+    if parts.scheme in ('redis', 'rediss'):
+        config['LOCATION'] = url
+    elif parts.scheme == 'file':
+        if not parts.path:
+            raise ImproperlyConfigured(f'Cache URL {url!r} needs a directory, e.g. file:///var/cache/survivor')
+        config['LOCATION'] = parts.netloc + parts.path
+    elif parts.scheme == 'db':
+        config['LOCATION'] = parts.netloc or DEFAULT_TABLE
+    if parts.scheme in ('file', 'db'):
+        max_entries = parse_qs(parts.query).get('max_entries', [DEFAULT_MAX_ENTRIES])[0]
+        try:
+            config['OPTIONS'] = {'MAX_ENTRIES': int(max_entries)}
+        except ValueError:
+            raise ImproperlyConfigured(f'Cache URL {url!r} has a max_entries that is not a number')
+    elif parts.scheme == 'locmem':
+        config['LOCATION'] = parts.netloc
+    return config
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
+from . import cache_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'survivor.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +75,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'football_survivor_game.wsgi.application'
 
+# Route the read-only pages to survivor/async_views.py; only worth it when
+# served by asgi.py under an ASGI worker, as render.yaml does
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -83,6 +91,16 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# CACHE_URL picks the backend (see cache_url.py): redis://host:6379/0,
+# file:///var/cache/survivor or db://survivor_cache. Without it the workers
+# of one host share a file cache; the tests get a private locmem one (see
+# test_runner.py).
+
+CACHES = {'default': cache_url.parse(os.environ.get('CACHE_URL', f"file://{BASE_DIR / 'cache'}"))}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -144,3 +162,51 @@ BUNDESLIGA_COMPETITION_CODE = 'BL1'
 # API Rate Limiting (free tier: 10 requests per minute)
 API_RATE_LIMIT = 10
 API_RATE_PERIOD = 60  # in seconds
+
+# Metrics
+# Each process writes its metrics snapshot here; /metrics merges them all
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(BASE_DIR, 'metrics'))
+METRICS_FLUSH_INTERVAL = 5  # in seconds
+# Optional bearer token required to scrape /metrics
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Points the tests at a private cache and a temporary METRICS_DIR
+TEST_RUNNER = 'football_survivor_game.test_runner.SurvivorTestRunner'
+
+# Degradation (services/degradation.py): home, fixtures and pool_detail serve
+# their last good render while queries take DEGRADED_DB_LATENCY on average
+# (a moving average weighting each new query by DB_LATENCY_EWMA_ALPHA), and
+# for DEGRADED_COOLDOWN after a query fails
+DEGRADED_DB_LATENCY = 0.25  # in seconds
+DB_LATENCY_EWMA_ALPHA = 0.2
+DEGRADED_COOLDOWN = 30  # in seconds
+# How long a page's last good render is kept, and how often it is replaced
+DEGRADED_PAGE_TIMEOUT = 60 * 60 * 6  # in seconds
+DEGRADED_KEEP_INTERVAL = 60  # in seconds
+
+# Live events (services/live.py): how often each process checks for new ones,
+# how far back it looks for rows committed out of id order, the keep-alive
+# interval of open streams and how long events are kept
+LIVE_EVENTS_POLL_INTERVAL = 1.0  # in seconds
+LIVE_EVENTS_RESCAN = 30  # in seconds
+LIVE_EVENTS_HEARTBEAT = 15  # in seconds
+LIVE_EVENTS_RETENTION = 60 * 60 * 24 * 2  # in seconds
+
+# Caching
+# Versioned keys never go stale; the timeout only evicts superseded versions
+# get_or_compute (services/caching.py): XFetch's beta (higher refreshes
+# earlier), how long a recompute holds its lock and how long others wait for it
+CACHE_XFETCH_BETA = 1.0
+CACHE_LOCK_TIMEOUT = 30  # in seconds
+CACHE_LOCK_WAIT = 5  # in seconds
+# Where incr() keeps its lock files on backends without an atomic incr
+CACHE_LOCK_DIR = os.environ.get('CACHE_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'survivor-cache-locks'))
+STANDINGS_CACHE_TIMEOUT = 60 * 60 * 24  # in seconds
+# Standings rows per page; more are loaded as the table scrolls
+STANDINGS_PAGE_SIZE = 50
+# Completed matchdays are cached forever; others until the next sync or this timeout
+FIXTURE_GRID_CACHE_TIMEOUT = 60 * 60 * 24  # in seconds
+# Pick plans are keyed by calendar version and pick state; the timeout only evicts old ones
+PICK_PLAN_CACHE_TIMEOUT = 60 * 60 * 24  # in seconds
+# Pool analytics only change when a matchday completes; keyed by the last completed one
+POOL_ANALYTICS_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # in seconds
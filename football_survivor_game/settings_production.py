@@ -35,6 +35,7 @@ else:
 
 # Static files with WhiteNoise
 MIDDLEWARE = [
+    'survivor.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add this after SecurityMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -0,0 +1,34 @@
+"""
+Test runner that keeps test runs away from the deployment's shared state.
+
+The tests get a locmem cache of their own, whatever CACHE_URL says, and
+write metrics snapshots to a temporary METRICS_DIR, removed afterwards,
+instead of the one /metrics reads.
+"""
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from . import cache_url
+
+
+class SurvivorTestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.metrics_dir = tempfile.TemporaryDirectory(prefix='survivor-test-metrics-')
+        self.isolated = override_settings(
+            CACHES={'default': cache_url.parse('locmem://survivor-tests')},
+            METRICS_DIR=self.metrics_dir.name,
+        )
+        self.isolated.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        from survivor.services import metrics
+
+        # Nothing recorded by the tests is left for the exit hook to write
+        metrics.registry.reset()
+        self.isolated.disable()
+        self.metrics_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
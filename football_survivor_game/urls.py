@@ -17,13 +17,19 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
+from django.conf import settings
 from survivor import views
 
+read_views = views
+if settings.ASYNC_VIEWS:
+    from survivor import async_views as read_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', views.home, name='home'),
+    path('', read_views.home, name='home'),
     path('accounts/login/', auth_views.LoginView.as_view(template_name='login.html'), name='login'),
     path('accounts/logout/', auth_views.LogoutView.as_view(), name='logout'),
     path('accounts/signup/', views.signup, name='signup'),
+    path('metrics', views.metrics, name='metrics'),
     path('survivor/', include('survivor.urls'))
 ]
@@ -1,12 +1,39 @@
 from django.contrib import admin
-from .models import Team, Season, Matchday, Match, GamePool, PlayerEntry, Pick
+from django.db import transaction
+from .models import (
+    Team, TeamAlias, Season, Matchday, Match, GamePool, PlayerEntry, Pick, PickDistribution,
+    SurvivalForecast, TeamRating, LeaderboardEntry, LiveEvent,
+)
+from .services.teams import invalidate_team_registry
 
 # Register your models here.
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
-    list_display = ('name', 'short_name')
+    list_display = ('name', 'short_name', 'rating')
     search_fields = ('name', 'short_name')
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(invalidate_team_registry)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        transaction.on_commit(invalidate_team_registry)
+
+@admin.register(TeamAlias)
+class TeamAliasAdmin(admin.ModelAdmin):
+    list_display = ('name', 'team_name', 'is_api_name')
+    list_filter = ('is_api_name',)
+    search_fields = ('name', 'team_name')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(invalidate_team_registry)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        transaction.on_commit(invalidate_team_registry)
+
 @admin.register(Season)
 class SeasonAdmin(admin.ModelAdmin):
     list_display = ['year', 'is_active', 'start_date', 'end_date']
@@ -39,4 +66,33 @@ class PlayerEntryAdmin(admin.ModelAdmin):
 class PickAdmin(admin.ModelAdmin):
     list_display = ['player_entry', 'matchday', 'team', 'created_at', 'is_successful']
     list_filter = ['matchday', 'is_successful']
-    search_fields = ['player_entry__user__username', 'team__name']
\ No newline at end of file
+    search_fields = ['player_entry__user__username', 'team__name']
+
+@admin.register(PickDistribution)
+class PickDistributionAdmin(admin.ModelAdmin):
+    list_display = ['matchday', 'pool', 'team', 'count']
+    list_filter = ['matchday']
+
+@admin.register(SurvivalForecast)
+class SurvivalForecastAdmin(admin.ModelAdmin):
+    list_display = ['player_entry', 'survive_next', 'survive_season', 'win_probability', 'trials', 'computed_at']
+    list_filter = ['player_entry__pool']
+    list_select_related = ['player_entry__user', 'player_entry__pool__season']
+
+@admin.register(TeamRating)
+class TeamRatingAdmin(admin.ModelAdmin):
+    list_display = ['team', 'matchday', 'rating']
+    list_filter = ['matchday__season', 'team']
+    list_select_related = ['team', 'matchday__season']
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'matchdays_survived', 'pools_entered', 'best_finish', 'updated_at']
+    search_fields = ['user__username']
+    list_select_related = ['user']
+
+@admin.register(LiveEvent)
+class LiveEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'matchday', 'pool', 'created_at']
+    list_filter = ['kind', 'matchday__season']
+    list_select_related = ['matchday__season', 'pool']
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class SurvivorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'survivor'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .services.degradation import watch_connection
+
+        # Time every query, so pages can fall back to their last good render
+        connection_created.connect(watch_connection)
@@ -0,0 +1,92 @@
+# survivor/async_views.py
+"""
+Async twins of the read-only views, served when ASYNC_VIEWS is on.
+
+Under an ASGI worker these run on the event loop and read through
+Django's async ORM, so a worker interleaves many requests instead of
+holding a thread for each one while it waits on the database. The
+in-process caches (calendar, fixture grid, pick distribution) are sync
+and cheap when warm; they run in the thread pool via sync_to_async.
+
+request.user is resolved with auser() before rendering: it loads the
+session too, so the auth and messages context processors never touch
+the database from the event loop.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+
+from .models import GamePool, Match, Matchday
+from .services.calendar import get_active_season
+from .services.degradation import serve_stale
+from .services.pick_distribution import get_pick_counts
+from .services.standings import aget_pool_standings, arender_standings_rows
+from .views import (
+    active_pools_query, fixtures_context, matchday_fixtures_context, pool_id_param,
+    upcoming_matches_query,
+)
+
+
+@serve_stale
+async def home(request):
+    request.user = await request.auser()
+    context = {
+        'active_pools': [pool async for pool in active_pools_query()],
+        'upcoming_matches': [match async for match in upcoming_matches_query()],
+    }
+    return render(request, 'home.html', context)
+
+
+@login_required
+@serve_stale
+async def fixtures(request, pool_id=None):
+    """views.fixtures on the async ORM"""
+    request.user = await request.auser()
+    season = await sync_to_async(get_active_season)()
+    if not season:
+        messages.warning(request, 'No active season found.')
+        return redirect('home')
+
+    pool = None
+    if pool_id:
+        pool = await aget_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
+        season = pool.season
+
+    context = await sync_to_async(fixtures_context)(request, season, pool)
+    return render(request, 'fixtures.html', context)
+
+
+async def matchday_fixtures(request, matchday_id):
+    """views.matchday_fixtures on the async ORM"""
+    request.user = await request.auser()
+    matchday = await aget_object_or_404(Matchday, id=matchday_id)
+    matches = [
+        match async for match in Match.objects.filter(matchday=matchday)
+        .select_related('home_team', 'away_team').order_by('kickoff')
+    ]
+
+    pool = None
+    pool_id = pool_id_param(request)
+    if pool_id:
+        pool = await aget_object_or_404(GamePool, id=pool_id)
+
+    team_picks = {}
+    if request.user.is_authenticated:
+        team_picks = await sync_to_async(get_pick_counts)(matchday, pool=pool)
+
+    context = matchday_fixtures_context(matchday, pool, matches, team_picks)
+    return render(request, 'matchday_fixtures.html', context)
+
+
+@login_required
+async def pool_standings_rows(request, pool_id):
+    """views.pool_standings_rows on the async ORM"""
+    pool = await aget_object_or_404(GamePool, id=pool_id)
+    after = request.GET.get('after')
+    prefix = request.GET.get('q', '').strip()
+
+    if not after and not prefix:
+        return HttpResponse((await aget_pool_standings(pool))['rows'])
+    return HttpResponse(await arender_standings_rows(pool, after, prefix))
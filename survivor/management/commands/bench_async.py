@@ -0,0 +1,232 @@
+# survivor/management/commands/bench_async.py
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+from asgiref.sync import ThreadSensitiveContext
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from survivor.models import GamePool, PlayerEntry, Season
+from survivor.services import benchmark
+from survivor.services import metrics as survivor_metrics
+from survivor.services.calendar import get_season_calendar
+from survivor.services.synthetic import ScaleDataGenerator
+
+from .bench_views import BENCH_CACHES
+
+VIEWS = ['home', 'fixtures', 'matchday_fixtures', 'pool_standings_rows']
+
+
+@contextmanager
+def query_latency(seconds):
+    """Add a round trip to every query on connections opened meanwhile, as with a database on another host"""
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def add_delay(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delay)
+
+    if not seconds:
+        yield
+        return
+    connection_created.connect(add_delay)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(add_delay)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the throughput of the sync and async read-only views at a fixed '
+        'number of workers, on a seeded throwaway database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pools', type=int, default=100, help='Pools to seed')
+        parser.add_argument('--entries-per-pool', type=int, default=50, help='Entries per pool to seed')
+        parser.add_argument('--played', type=int, default=10, help='Matchdays already played')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the generated data')
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Workers in both modes; they share this process, so keep it at or below the CPU count'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help='Requests in flight per async worker; a sync worker always has one'
+        )
+        parser.add_argument('--requests', type=int, default=50, help='Requests per worker and view')
+        parser.add_argument(
+            '--db-latency', type=float, default=5.0,
+            help='Milliseconds added to every query, like the network round trip to '
+                 'a database server; SQLite on local disk has none (default 5)'
+        )
+        parser.add_argument('--views', nargs='+', choices=VIEWS, default=VIEWS, help='Views to benchmark')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        isolated = override_settings(CACHES=BENCH_CACHES, METRICS_DIR=None)
+        with benchmark.benchmark_database(), isolated:
+            self._seed(options)
+            urls, user = self._targets()
+            with query_latency(options['db_latency'] / 1000):
+                results = self._run(urls, user, options)
+        survivor_metrics.registry.reset()
+
+        self._report(results, options)
+
+        if options['output']:
+            benchmark.write_json(options['output'], {
+                'config': {
+                    key: options[key]
+                    for key in (
+                        'pools', 'entries_per_pool', 'played', 'seed',
+                        'workers', 'concurrency', 'requests', 'db_latency',
+                    )
+                },
+                'views': results,
+            })
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _run(self, urls, user, options):
+        results = {}
+        for view in options['views']:
+            with benchmark.use_async_views(False):
+                sync = self._run_sync(urls[view], user, options)
+            with benchmark.use_async_views(True):
+                async_ = self._run_async(urls[view], user, options)
+            results[view] = {'sync': sync, 'async': async_}
+            self.stdout.write(
+                f"  {view:<20} sync {sync['throughput_rps']} req/s  "
+                f"async {async_['throughput_rps']} req/s"
+            )
+        return results
+
+    def _seed(self, options):
+        self.stdout.write(
+            f"Seeding {options['pools']} pools x {options['entries_per_pool']} entries..."
+        )
+        started = time.perf_counter()
+        call_command('load_teams', stdout=StringIO())
+        ScaleDataGenerator(
+            pools=options['pools'],
+            entries_per_pool=options['entries_per_pool'],
+            played=options['played'],
+            seed=options['seed'],
+        ).generate()
+        self.stdout.write(f'  → Seeded in {time.perf_counter() - started:.1f}s')
+
+    def _targets(self):
+        season = Season.objects.get(is_active=True)
+        matchday = get_season_calendar(season.id).current()
+        pool = GamePool.objects.filter(season=season).order_by('id').first()
+        user = PlayerEntry.objects.filter(pool=pool).select_related('user').first().user
+        rows = reverse('survivor:pool_standings_rows', args=[pool.id])
+        urls = {
+            'home': reverse('home'),
+            'fixtures': reverse('survivor:fixtures'),
+            'matchday_fixtures': f"{reverse('survivor:matchday_fixtures', args=[matchday.id])}?pool={pool.id}",
+            # A deeper page than the cached first one, so every request reads entries
+            'pool_standings_rows': f'{rows}?q=load',
+        }
+        return urls, user
+
+    def _run_sync(self, url, user, options):
+        """Each worker serves one request at a time, like a sync WSGI worker"""
+        def worker(client, record):
+            client.get(url)
+            start.wait()
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                status = client.get(url).status_code
+                record(time.perf_counter() - started, status)
+
+        start = threading.Barrier(options['workers'] + 1)
+        return self._run_workers(worker, Client, user, start, options)
+
+    def _run_async(self, url, user, options):
+        """Each worker is an event loop with --concurrency requests in flight"""
+        def worker(client, record):
+            async def fetch(count):
+                for _ in range(count):
+                    started = time.perf_counter()
+                    # ASGIHandler gives each request its own thread for sync
+                    # code; the test client does not, so do it here
+                    async with ThreadSensitiveContext():
+                        status = (await client.get(url)).status_code
+                    record(time.perf_counter() - started, status)
+
+            async def serve():
+                await client.get(url)
+                await asyncio.get_running_loop().run_in_executor(None, start.wait)
+                per_task, extra = divmod(options['requests'], options['concurrency'])
+                await asyncio.gather(*(
+                    fetch(per_task + (1 if i < extra else 0)) for i in range(options['concurrency'])
+                ))
+
+            asyncio.run(serve())
+
+        start = threading.Barrier(options['workers'] + 1)
+        return self._run_workers(worker, AsyncClient, user, start, options)
+
+    def _run_workers(self, worker, client_class, user, start, options):
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def record(elapsed, status):
+            with lock:
+                latencies.append(elapsed)
+                if status != 200:
+                    errors.append(status)
+
+        def run(client):
+            try:
+                worker(client, record)
+            finally:
+                connections.close_all()
+
+        clients = []
+        for _ in range(options['workers']):
+            client = client_class()
+            client.force_login(user)
+            clients.append(client)
+        threads = [threading.Thread(target=run, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        wall_time = time.perf_counter() - started
+        return benchmark.summarize(latencies, [], wall_time, errors=len(errors))
+
+    def _report(self, results, options):
+        self.stdout.write('\n' + '='*78)
+        self.stdout.write(self.style.SUCCESS(
+            f"ASYNC BENCHMARK: {options['workers']} workers, "
+            f"{options['concurrency']} in flight per async worker, "
+            f"{options['db_latency']}ms per query"
+        ))
+        self.stdout.write('='*78)
+        self.stdout.write(
+            f"{'view':<20} {'sync r/s':>9} {'async r/s':>10} {'change':>8} "
+            f"{'sync p95':>9} {'async p95':>10} {'errors':>7}"
+        )
+        for view, result in results.items():
+            sync, async_ = result['sync'], result['async']
+            change = ''
+            if sync['throughput_rps'] and async_['throughput_rps']:
+                change = f"{async_['throughput_rps'] / sync['throughput_rps']:.2f}x"
+            self.stdout.write(
+                f"{view:<20} {sync['throughput_rps']:>9} {async_['throughput_rps']:>10} {change:>8} "
+                f"{sync['p95_ms']:>9} {async_['p95_ms']:>10} {sync['errors'] + async_['errors']:>7}"
+            )
+        self.stdout.write('='*78)
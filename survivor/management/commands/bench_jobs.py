@@ -0,0 +1,182 @@
+# survivor/management/commands/bench_jobs.py
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from survivor.models import Matchday
+from survivor.services import benchmark
+from survivor.services import metrics as survivor_metrics
+from survivor.services.synthetic import ScaleDataGenerator
+
+from .bench_views import BENCH_CACHES
+
+JOBS = ['sync_fixtures', 'process_results']
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark sync_fixtures and process_results on a match night, '
+        'across a sweep of pick counts, on throwaway databases'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Open picks on the benchmarked matchday, one run per size (e.g. 1000 10000 100000 1000000)'
+        )
+        parser.add_argument('--entries-per-pool', type=int, default=50, help='Entries per pool to seed')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the generated data')
+        parser.add_argument('--jobs', nargs='+', choices=JOBS, default=JOBS, help='Jobs to benchmark')
+        parser.add_argument(
+            '--payload',
+            help='Recorded API responses (sync_fixtures --record) to replay instead of generated ones'
+        )
+        parser.add_argument(
+            '--no-tracemalloc', action='store_true',
+            help='Skip peak memory tracking, which slows the jobs down'
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Compare against a JSON file written by --output')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Allowed slowdown against the baseline, as a fraction (default 0.2)'
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        with override_settings(CACHES=BENCH_CACHES, METRICS_DIR=None):
+            for size in options['sizes']:
+                with benchmark.benchmark_database():
+                    results.update(self._run_size(size, options))
+        survivor_metrics.registry.reset()
+
+        self._report(results)
+
+        data = {
+            'config': {key: options[key] for key in ('sizes', 'entries_per_pool', 'seed')},
+            'runs': results,
+        }
+        if options['output']:
+            benchmark.write_json(options['output'], data)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            baseline = benchmark.load_baseline(options['baseline'])
+            regressions = benchmark.compare(
+                results, baseline['runs'], options['threshold'],
+                higher_is_worse=('wall_s', 'queries', 'peak_mb'),
+                lower_is_worse=('rows_per_s',),
+            )
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(f'  REGRESSION {regression}'))
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def _run_size(self, size, options):
+        """Seed a season on its first matchday with `size` open picks, then run the jobs"""
+        self.stdout.write(f'\nSeeding {size:,} picks...')
+        started = time.perf_counter()
+        call_command('load_teams', stdout=StringIO())
+        entries_per_pool = min(options['entries_per_pool'], size)
+        generator = ScaleDataGenerator(
+            pools=max(1, size // entries_per_pool),
+            entries_per_pool=entries_per_pool,
+            # Nothing played yet: every entry has an open pick on matchday 1
+            played=0,
+            seed=options['seed'],
+        )
+        generator.generate()
+        self.stdout.write(f'  → Seeded in {time.perf_counter() - started:.1f}s')
+
+        matchday = Matchday.objects.get(season=generator.season, number=1)
+        runs = {}
+        payload_path = options['payload']
+        with tempfile.TemporaryDirectory(prefix='survivor-bench-') as tmp_dir:
+            if not payload_path:
+                # Simulated full-time scores for matchday 1, everything else scheduled
+                rng = random.Random(options['seed'])
+                scores = {
+                    match_id: (rng.randint(0, 3), rng.randint(0, 3))
+                    for match_id in matchday.matches.values_list('id', flat=True)
+                }
+                payload_path = os.path.join(tmp_dir, 'matches.json')
+                with open(payload_path, 'w') as f:
+                    json.dump(benchmark.recorded_matches_payload(generator.season, scores), f)
+
+            if 'sync_fixtures' in options['jobs']:
+                runs[f'sync_fixtures@{size}'] = self._measure(
+                    'sync_fixtures', options,
+                    '--from-file', payload_path, '--season', generator.season.year[:4],
+                )
+            else:
+                call_command(
+                    'sync_fixtures', '--from-file', payload_path,
+                    '--season', generator.season.year[:4], stdout=StringIO()
+                )
+
+            if 'process_results' in options['jobs']:
+                runs[f'process_results@{size}'] = self._measure(
+                    'process_results', options, '--matchday', '1'
+                )
+        return runs
+
+    def _measure(self, command, options, *args):
+        """Run a command once; wall time, queries, peak traced memory and rows it reported"""
+        rows_before = self._rows(command)
+        counter = benchmark.QueryCounter()
+        trace = not options['no_tracemalloc']
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            with counter.measure():
+                call_command(command, *args, stdout=StringIO())
+        finally:
+            wall_time = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace else None
+            if trace:
+                tracemalloc.stop()
+        rows = self._rows(command) - rows_before
+
+        result = {
+            'wall_s': round(wall_time, 3),
+            'queries': counter.count,
+            'peak_mb': round(peak / 2**20, 1) if peak is not None else None,
+            'rows': rows,
+            'rows_per_s': round(rows / wall_time, 1) if wall_time else None,
+        }
+        self.stdout.write(
+            f"  {command:<16} {result['wall_s']}s  {result['queries']} queries  "
+            f"{result['rows']} rows"
+        )
+        return result
+
+    def _rows(self, command):
+        """Rows the command reported through its metrics tracker so far"""
+        return sum(
+            value for (name, _), value in survivor_metrics.COMMAND_ROWS.values.items()
+            if name == command
+        )
+
+    def _report(self, results):
+        self.stdout.write('\n' + '='*84)
+        self.stdout.write(self.style.SUCCESS('BATCH JOB BENCHMARK:'))
+        self.stdout.write('='*84)
+        self.stdout.write(
+            f"{'run':<26} {'wall s':>9} {'queries':>9} {'peak MB':>9} {'rows':>10} {'rows/s':>12}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<26} {result['wall_s']:>9} {result['queries']:>9} "
+                f"{str(result['peak_mb']):>9} {result['rows']:>10} {result['rows_per_s']:>12}"
+            )
+        self.stdout.write('='*84)
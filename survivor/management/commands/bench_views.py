@@ -0,0 +1,248 @@
+# survivor/management/commands/bench_views.py
+import threading
+import time
+from io import StringIO
+
+from django.contrib import messages
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from survivor.models import MAX_PICKS_PER_TEAM, PlayerEntry, Season
+from survivor.services import benchmark
+from survivor.services import metrics as survivor_metrics
+from survivor.services.calendar import get_season_calendar
+from survivor.services.synthetic import ScaleDataGenerator
+from survivor.services.teams import get_team_registry
+
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'survivor-bench',
+    }
+}
+
+VIEWS = ['home', 'pool_detail', 'fixtures', 'pick_history', 'matchday_fixtures', 'make_pick']
+
+
+class VirtualUser:
+    """A logged-in test client playing one pool entry"""
+
+    def __init__(self, entry, current_matchday, next_matchday, teams):
+        self.entry = entry
+        self.client = Client()
+        self.client.force_login(entry.user)
+        self.current_matchday = current_matchday
+        self.next_matchday = next_matchday
+        # Two teams the entry may still pick; make_pick alternates between
+        # them, so each also has to stay pickable while its pick for the next
+        # matchday counts against it
+        used = list(entry.picks.exclude(matchday=next_matchday).values_list('team_id', flat=True))
+        self.pick_teams = [team.id for team in teams if used.count(team.id) < MAX_PICKS_PER_TEAM - 1][:2]
+        self.picks_made = 0
+
+    def request(self, view):
+        pool_id = self.entry.pool_id
+        if view == 'home':
+            return self.client.get(reverse('home')), 200
+        if view == 'pool_detail':
+            return self.client.get(reverse('survivor:pool_detail', args=[pool_id])), 200
+        if view == 'fixtures':
+            return self.client.get(reverse('survivor:fixtures')), 200
+        if view == 'pick_history':
+            return self.client.get(reverse('survivor:pick_history', args=[pool_id])), 200
+        if view == 'matchday_fixtures':
+            url = reverse('survivor:matchday_fixtures', args=[self.current_matchday.id])
+            return self.client.get(url, {'pool': pool_id}), 200
+        if view == 'make_pick':
+            team_id = self.pick_teams[self.picks_made % len(self.pick_teams)]
+            self.picks_made += 1
+            response = self.client.post(
+                reverse('survivor:make_pick', args=[pool_id]),
+                {'matchday_id': self.next_matchday.id, 'team_id': team_id},
+            )
+            return response, 302
+        raise ValueError(view)
+
+    def succeeded(self, view, response, expected):
+        """Whether the request did its work, not just answered with the expected status"""
+        if response.status_code != expected:
+            return False
+        if view == 'make_pick':
+            # make_pick redirects when it refuses a pick too, with an error message
+            return not any(
+                message.level == messages.ERROR for message in messages.get_messages(response.wsgi_request)
+            )
+        return True
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main views with concurrent virtual users on a seeded throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pools', type=int, default=200, help='Pools to seed')
+        parser.add_argument('--entries-per-pool', type=int, default=50, help='Entries per pool to seed')
+        parser.add_argument('--played', type=int, default=10, help='Matchdays already played')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the generated data')
+        parser.add_argument('--users', type=int, default=4, help='Concurrent virtual users')
+        parser.add_argument('--requests', type=int, default=25, help='Requests per virtual user and view')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per virtual user and view')
+        parser.add_argument('--views', nargs='+', choices=VIEWS, default=VIEWS, help='Views to benchmark')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Compare against a JSON file written by --output')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Allowed slowdown against the baseline, as a fraction (default 0.2)'
+        )
+
+    def handle(self, *args, **options):
+        # A private cache, so nothing cached for the real database is served,
+        # and the benchmark's requests kept out of the real metrics
+        isolated = override_settings(CACHES=BENCH_CACHES, METRICS_DIR=None)
+        with benchmark.benchmark_database(), isolated:
+            self._seed(options)
+            results = self._run(options)
+        survivor_metrics.registry.reset()
+
+        self._report(results)
+
+        data = {
+            'config': {
+                key: options[key]
+                for key in ('pools', 'entries_per_pool', 'played', 'seed', 'users', 'requests')
+            },
+            'views': results,
+        }
+        if options['output']:
+            benchmark.write_json(options['output'], data)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            baseline = benchmark.load_baseline(options['baseline'])
+            regressions = benchmark.compare(
+                results, baseline['views'], options['threshold'],
+                higher_is_worse=('p50_ms', 'p95_ms', 'p99_ms', 'queries'),
+                lower_is_worse=('throughput_rps',),
+            )
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(f'  REGRESSION {regression}'))
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def _seed(self, options):
+        self.stdout.write(
+            f"Seeding {options['pools']} pools x {options['entries_per_pool']} entries..."
+        )
+        started = time.perf_counter()
+        call_command('load_teams', stdout=StringIO())
+        ScaleDataGenerator(
+            pools=options['pools'],
+            entries_per_pool=options['entries_per_pool'],
+            played=options['played'],
+            seed=options['seed'],
+        ).generate()
+        self.stdout.write(f'  → Seeded in {time.perf_counter() - started:.1f}s')
+
+    def _run(self, options):
+        season = Season.objects.get(is_active=True)
+        calendar = get_season_calendar(season.id)
+        current_matchday, next_matchday = calendar.current(), calendar.next()
+        teams = list(get_team_registry())
+
+        # Surviving entries only, so make_pick exercises the full write path
+        entries = list(
+            PlayerEntry.objects.filter(pool__season=season, is_eliminated=False)
+            .select_related('user').order_by('id')[:options['users']]
+        )
+        if len(entries) < options['users']:
+            raise CommandError(
+                f"Only {len(entries)} entries are still alive; seed fewer --played matchdays or use fewer --users"
+            )
+        users = [VirtualUser(entry, current_matchday, next_matchday, teams) for entry in entries]
+        if 'make_pick' in options['views'] and any(len(user.pick_teams) < 2 for user in users):
+            raise CommandError('Some entries have no two teams left to pick; seed fewer --played matchdays')
+
+        results = {}
+        for view in options['views']:
+            results[view] = self._run_view(view, users, options)
+            summary = results[view]
+            self.stdout.write(
+                f"  {view:<18} p50 {summary['p50_ms']}ms  p95 {summary['p95_ms']}ms  "
+                f"{summary['throughput_rps']} req/s"
+            )
+            if summary['warmup_errors']:
+                self.stdout.write(self.style.WARNING(
+                    f"    {summary['warmup_errors']} warmup requests failed; the view may not work at all"
+                ))
+        return results
+
+    def _run_view(self, view, users, options):
+        latencies, query_counts = [], []
+        errors, warmup_errors = [], []
+        lock = threading.Lock()
+        start = threading.Barrier(len(users) + 1)
+
+        def worker(user):
+            counter = benchmark.QueryCounter()
+            try:
+                for _ in range(options['warmup']):
+                    try:
+                        failed = not user.succeeded(view, *user.request(view))
+                    except Exception:
+                        failed = True
+                    if failed:
+                        with lock:
+                            warmup_errors.append(view)
+                start.wait()
+                for _ in range(options['requests']):
+                    counter.count = 0
+                    started = time.perf_counter()
+                    response = None
+                    try:
+                        with counter.measure():
+                            response, expected = user.request(view)
+                    except Exception:
+                        pass
+                    elapsed = time.perf_counter() - started
+                    try:
+                        failed = response is None or not user.succeeded(view, response, expected)
+                    except Exception:
+                        failed = True
+                    with lock:
+                        latencies.append(elapsed)
+                        query_counts.append(counter.count)
+                        if failed:
+                            errors.append(view)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        wall_time = time.perf_counter() - started
+
+        summary = benchmark.summarize(latencies, query_counts, wall_time, errors=len(errors))
+        summary['warmup_errors'] = len(warmup_errors)
+        return summary
+
+    def _report(self, results):
+        self.stdout.write('\n' + '='*78)
+        self.stdout.write(self.style.SUCCESS('VIEW BENCHMARK:'))
+        self.stdout.write('='*78)
+        self.stdout.write(
+            f"{'view':<18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'req/s':>8} {'errors':>7}"
+        )
+        for view, summary in results.items():
+            self.stdout.write(
+                f"{view:<18} {summary['p50_ms']:>8} {summary['p95_ms']:>8} {summary['p99_ms']:>8} "
+                f"{summary['queries']:>8} {summary['throughput_rps']:>8} {summary['errors']:>7}"
+            )
+        self.stdout.write('='*78)
@@ -0,0 +1,29 @@
+# survivor/management/commands/build_pick_cube.py
+from django.core.management.base import BaseCommand, CommandError
+from survivor.models import Season
+from survivor.services.pick_cube import rebuild_pick_cube
+
+class Command(BaseCommand):
+    help = "Rebuild a season's pick cube (pool x matchday x team) from the locked pick distributions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            help='Season to rebuild, e.g. 2024-25 (default: the active season)'
+        )
+
+    def handle(self, *args, **options):
+        if options.get('season'):
+            season = Season.objects.filter(year=options['season']).first()
+        else:
+            season = Season.objects.filter(is_active=True).first()
+        if season is None:
+            raise CommandError('Season not found')
+
+        cube = rebuild_pick_cube(season)
+        pools, _, teams = cube.counts.shape
+        self.stdout.write(
+            f'✓ {season.year}: {pools} pools x {len(cube.matchday_numbers)} locked matchdays x {teams} teams, '
+            f'{int(cube.counts.sum())} picks'
+        )
+        self.stdout.write(self.style.SUCCESS('\nPick cube rebuilt!'))
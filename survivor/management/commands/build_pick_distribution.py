@@ -0,0 +1,40 @@
+# survivor/management/commands/build_pick_distribution.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from survivor.models import Matchday
+from survivor.services.pick_distribution import rebuild_pick_distribution
+
+class Command(BaseCommand):
+    help = 'Recount per-matchday pick distributions and lock those whose deadline has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--matchday',
+            type=int,
+            help='Rebuild a specific matchday number of the active season'
+        )
+
+    def handle(self, *args, **options):
+        if options.get('matchday'):
+            matchdays = Matchday.objects.filter(
+                season__is_active=True,
+                number=options['matchday']
+            )
+        else:
+            # Every matchday whose picks locked but was never recounted
+            matchdays = Matchday.objects.filter(
+                start_date__lte=timezone.now(),
+                pick_distribution_final=False
+            )
+
+        matchdays = list(matchdays.order_by('number'))
+        if not matchdays:
+            self.stdout.write(self.style.WARNING('No matchdays to rebuild.'))
+            return
+
+        for matchday in matchdays:
+            rows = rebuild_pick_distribution(matchday)
+            status = 'final' if matchday.pick_distribution_final else 'open'
+            self.stdout.write(f'✓ Matchday {matchday.number}: {rows} rows ({status})')
+
+        self.stdout.write(self.style.SUCCESS('\nPick distribution rebuilt!'))
@@ -0,0 +1,31 @@
+# survivor/management/commands/build_standings_snapshots.py
+from django.core.management.base import BaseCommand
+from survivor.models import Matchday
+from survivor.services.snapshots import write_matchday_snapshots
+
+class Command(BaseCommand):
+    help = 'Backfill standings snapshots for completed matchdays (existing snapshots are kept)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            help='Season to backfill, e.g. 2024-25 (default: the active season)'
+        )
+
+    def handle(self, *args, **options):
+        matchdays = Matchday.objects.filter(is_complete=True)
+        if options.get('season'):
+            matchdays = matchdays.filter(season__year=options['season'])
+        else:
+            matchdays = matchdays.filter(season__is_active=True)
+
+        matchdays = list(matchdays.order_by('number'))
+        if not matchdays:
+            self.stdout.write(self.style.WARNING('No completed matchdays.'))
+            return
+
+        for matchday in matchdays:
+            written = write_matchday_snapshots(matchday)
+            self.stdout.write(f'✓ Matchday {matchday.number}: {written} new snapshots')
+
+        self.stdout.write(self.style.SUCCESS('\nStandings snapshots built!'))
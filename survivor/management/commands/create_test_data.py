@@ -5,7 +5,10 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from datetime import timedelta, datetime
 from survivor.models import Season, Matchday, Match, Team, GamePool, PlayerEntry, Pick
+from survivor.services.calendar import invalidate_calendar
+from survivor.services.synthetic import ScaleDataGenerator
 import random
+import time
 
 class Command(BaseCommand):
     help = 'Creates comprehensive test data for development'
@@ -14,11 +17,53 @@ class Command(BaseCommand):
         parser.add_argument(
             '--users',
             type=int,
+            help='Number of test users to create (default: 10, or half the entries with --scale)'
+        )
+        parser.add_argument(
+            '--scale',
+            action='store_true',
+            help='Generate a full synthetic season with bulk inserts for load testing'
+        )
+        parser.add_argument(
+            '--pools',
+            type=int,
+            default=2000,
+            help='Number of pools to create with --scale'
+        )
+        parser.add_argument(
+            '--entries-per-pool',
+            type=int,
+            default=50,
+            help='Number of entries per pool with --scale'
+        )
+        parser.add_argument(
+            '--played',
+            type=int,
             default=10,
-            help='Number of test users to create'
+            help='Number of matchdays already played with --scale'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed; the same seed always generates the same data'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk insert with --scale'
+        )
+        parser.add_argument(
+            '--season-year',
+            default='2030-31',
+            help='Season to create with --scale (must not exist yet)'
         )
     
     def handle(self, *args, **options):
+        if options['scale']:
+            return self.handle_scale(options)
+        
         self.stdout.write('Creating test data...')
         
         # Step 1: Create or get season
@@ -43,9 +88,10 @@ class Command(BaseCommand):
         
         # Step 3: Create matchdays and matches
         self.create_matchdays_and_matches(season, teams)
+        invalidate_calendar()
         
         # Step 4: Create test users
-        test_users = self.create_test_users(options['users'])
+        test_users = self.create_test_users(options['users'] or 10)
         
         # Step 5: Create game pools
         pools = self.create_game_pools(season, test_users[0] if test_users else None)
@@ -57,6 +103,44 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('\n✓ Test data creation complete!'))
         self.print_summary()
     
+    def handle_scale(self, options):
+        """Bulk-generate a production-sized dataset and report insert throughput"""
+        self.stdout.write(
+            f"Generating {options['pools']} pools x {options['entries_per_pool']} entries "
+            f"(seed {options['seed']})..."
+        )
+        generator = ScaleDataGenerator(
+            pools=options['pools'],
+            entries_per_pool=options['entries_per_pool'],
+            users=options['users'],
+            played=options['played'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            season_year=options['season_year'],
+            stdout=self.stdout,
+        )
+        started = time.perf_counter()
+        try:
+            stats = generator.generate()
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(f'ERROR: {e}'))
+            return
+        elapsed = time.perf_counter() - started
+        
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(self.style.SUCCESS('SCALE DATA SUMMARY:'))
+        self.stdout.write('='*50)
+        total_rows = 0
+        for model, (rows, seconds) in stats.items():
+            rate = f'{rows / seconds:,.0f} rows/s' if rows and seconds else ''
+            self.stdout.write(f'• {model:<16} {rows:>10,} rows  {seconds:7.2f}s  {rate}')
+            total_rows += rows
+        self.stdout.write(
+            f'• Total: {total_rows:,} rows in {elapsed:.2f}s '
+            f'({total_rows / elapsed:,.0f} rows/s)'
+        )
+        self.stdout.write('='*50)
+    
     def create_matchdays_and_matches(self, season, teams):
         """Create first 5 matchdays with matches"""
         for md_num in range(1, 6):
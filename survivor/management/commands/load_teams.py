@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from survivor.models import Team
+from survivor.services.teams import invalidate_team_registry
 
 class Command(BaseCommand):
     help = 'Load Bundesliga teams'
@@ -38,4 +39,7 @@ class Command(BaseCommand):
             if created:
                 self.stdout.write(f"Created team: {team.name}")
             else:
-                self.stdout.write(f"Team already exists: {team.name}")
\ No newline at end of file
+                self.stdout.write(f"Team already exists: {team.name}")
+
+        # Make every process reload its team registry
+        invalidate_team_registry()
@@ -0,0 +1,58 @@
+# survivor/management/commands/plan_picks.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from survivor.models import PlayerEntry
+from survivor.services import metrics
+from survivor.services.planner import get_pick_plan
+from survivor.services.teams import get_team_registry
+
+class Command(BaseCommand):
+    help = 'Print the best-survival plan of picks for the remaining matchdays of live entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entry',
+            type=int,
+            help='Plan a specific entry id'
+        )
+        parser.add_argument(
+            '--pool',
+            type=int,
+            help='Plan every live entry of a pool'
+        )
+
+    def handle(self, *args, **options):
+        with metrics.track_command('plan_picks') as tracker:
+            self._handle(options, tracker)
+
+    def _handle(self, options, tracker):
+        entries = PlayerEntry.objects.filter(is_eliminated=False).select_related('user', 'pool__season')
+        if options.get('entry'):
+            entries = entries.filter(pk=options['entry'])
+        elif options.get('pool'):
+            entries = entries.filter(pool_id=options['pool'])
+        else:
+            raise CommandError('Pass --entry or --pool')
+
+        teams = get_team_registry()
+        for entry in entries:
+            started = time.perf_counter()
+            plan = get_pick_plan(entry)
+            tracker.rows('plans_computed')
+            self.stdout.write(
+                f'\n{entry.user.username} ({entry.pool.name}): '
+                f"{plan['survival']:.4%} to survive the season "
+                f'({(time.perf_counter() - started) * 1000:.0f}ms)'
+            )
+            for row in plan['matchdays']:
+                team = teams.get(row['team_id'])
+                opponent = teams.get(row['opponent_id'])
+                versus = ''
+                if opponent:
+                    versus = f"vs {opponent.short_name} (H)" if row['is_home'] else f"@ {opponent.short_name} (A)"
+                self.stdout.write(
+                    f"  MD{row['number']:>2}  {team.name if team else 'No team left':<28} {versus:<12} "
+                    f"{row['probability']:.1%}{'  (locked)' if row['locked'] else ''}"
+                )
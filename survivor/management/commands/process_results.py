@@ -1,6 +1,13 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from survivor.models import Match, Pick, PlayerEntry, Matchday
+from survivor.models import Match, Pick, PlayerEntry, Matchday, GamePool
+from survivor.services import metrics
+from survivor.services.pick_distribution import rebuild_pick_distribution
+from survivor.services.calendar import invalidate_calendar
+from survivor.services.ratings import RatingEngine
+from survivor.services.snapshots import write_matchday_snapshots
+from survivor.services.leaderboard import record_matchday_finishes, record_survivals
+from survivor.services.live import elimination_event, matchday_complete_event, publish
 
 class Command(BaseCommand):
     help = 'Process match results and eliminate players who picked losing teams'
@@ -18,6 +25,11 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        with metrics.track_command('process_results') as tracker:
+            self.tracker = tracker
+            self._handle(options)
+
+    def _handle(self, options):
         dry_run = options.get('dry_run', False)
         matchday_num = options.get('matchday')
 
@@ -34,7 +46,9 @@ class Command(BaseCommand):
             matches_query = matches_query.filter(matchday__number=matchday_num)
             self.stdout.write(f'Processing only matchday {matchday_num}')
 
-        matches = matches_query.select_related('matchday', 'home_team', 'away_team')
+        matches = matches_query.select_related(
+            'matchday__season', 'home_team', 'away_team'
+        ).order_by('kickoff', 'id')
 
         if not matches.exists():
             self.stdout.write(self.style.WARNING('No unprocessed matches with results found.'))
@@ -43,18 +57,32 @@ class Command(BaseCommand):
         # Group matches by matchday
         matchdays = {}
         for match in matches:
-            if match.matchday.number not in matchdays:
+            if match.matchday not in matchdays:
                 matchdays[match.matchday] = []
             matchdays[match.matchday].append(match)
 
+        # Ratings are updated match by match in kickoff order
+        self.ratings = RatingEngine()
+
         # Process each matchday
         for matchday, matchday_matches in matchdays.items():
             self.stdout.write(f'\n{self.style.NOTICE(f"Processing Matchday {matchday.number}")}')
             self.process_matchday(matchday, matchday_matches, dry_run)
 
+        if not dry_run:
+            # Refresh the fixture probabilities with the new ratings
+            for season in {matchday.season for matchday in matchdays}:
+                updated = self.ratings.update_match_probabilities(season)
+                self.tracker.rows('match_probabilities_updated', updated)
+            invalidate_calendar()
+
     def process_matchday(self, matchday, matches, dry_run):
         """Process all matches for a matchday and eliminate players"""
 
+        # Picks are locked now, so freeze the pick distribution
+        if not dry_run and not matchday.pick_distribution_final:
+            rebuild_pick_distribution(matchday)
+
         # Get all teams that played in this matchday
         teams_in_matchday = set()
         for match in matches:
@@ -62,14 +90,15 @@ class Command(BaseCommand):
             teams_in_matchday.add(match.away_team)
 
         # Get all picks for this matchday
-        picks = Pick.objects.filter(
+        picks = list(Pick.objects.filter(
             matchday=matchday,
             is_successful__isnull=True # Only unprocessed picks
-        ).select_related('player_entry__user', 'player_entry__pool', 'team')
+        ).select_related('player_entry__user', 'player_entry__pool', 'team'))
 
-        if not picks.exists():
+        # Results still count for ratings, and the matches get marked as
+        # processed, when nobody picked
+        if not picks:
             self.stdout.write('No picks to process for this matchday')
-            return
         
         successful_picks = []
         failed_picks = []
@@ -129,36 +158,72 @@ class Command(BaseCommand):
                 if not dry_run:
                     # Save pick without validation
                     Pick.objects.filter(pk=pick.pk).update(is_successful=pick.is_successful)
+                    self.tracker.rows('picks_updated')
                     if pick.is_successful == False:
                         # Save player entry without validation
                         PlayerEntry.objects.filter(pk=pick.player_entry.pk).update(
                             is_eliminated=True,
-                            eliminated_matchday=matchday
+                            eliminated_matchday=matchday,
+                            eliminated_number=matchday.number
                         )
+                        self.tracker.rows('entries_eliminated')
+
+            if not dry_run and successful_picks:
+                self.tracker.rows(
+                    'leaderboard_updated',
+                    record_survivals(pick.player_entry.user_id for pick in successful_picks)
+                )
 
-            # Mark matches as processed
+            if not dry_run and failed_picks:
+                # Invalidate cached standings of pools that lost players
+                GamePool.bump_standings_version(
+                    {pick.player_entry.pool_id for pick in failed_picks}
+                )
+
+            # Update team ratings and mark matches as processed
             if not dry_run:
+                for match in matches:
+                    self.ratings.apply(match)
+                self.tracker.rows('ratings_updated', self.ratings.save())
                 for match in matches:
                     match.is_processed = True
                     match.save()
+                self.tracker.rows('matches_processed', len(matches))
 
             # Mark matchday as complete if all matches are done
             all_matches_complete = not matchday.matches.filter(result__isnull=True).exists()
             if all_matches_complete and not dry_run:
                 matchday.is_complete = True
                 matchday.save()
+                self.tracker.rows('matchdays_completed')
+                # Record who is still alive in every pool
+                self.tracker.rows('snapshots_written', write_matchday_snapshots(matchday))
+                # Positions of the players knocked out, and of any winners
+                self.tracker.rows('leaderboard_updated', record_matchday_finishes(matchday))
+                # Only once the matchday is committed, or other processes reload it incomplete
+                transaction.on_commit(invalidate_calendar)
 
         # Print summary
         self.stdout.write(f'\n {self.style.SUCCESS("Summary for Matchday " + str(matchday.number))}')
         self.stdout.write(f'  Survived: {len(successful_picks)} players')
         self.stdout.write(f'  Eliminated: {len(failed_picks)} players')
 
+        # Usernames knocked out in each pool, for the live pool streams
+        eliminated_by_pool = {}
+        for pick in failed_picks:
+            eliminated_by_pool.setdefault(pick.player_entry.pool_id, []).append(pick.player_entry.user.username)
+        live_events = []
+        if all_matches_complete:
+            live_events.append(matchday_complete_event(matchday))
+
         # Check for pool winneers
         for pool in set(pick.player_entry.pool for pick in picks):
             active_count = PlayerEntry.objects.filter(
                 pool=pool,
                 is_eliminated=False
             ).count()
+            if pool.id in eliminated_by_pool:
+                live_events.append(elimination_event(matchday, pool.id, eliminated_by_pool[pool.id], active_count))
 
             if active_count == 1:
                 winner = PlayerEntry.objects.filter(
@@ -175,4 +240,7 @@ class Command(BaseCommand):
                     self.style.WARNING(
                         f'\n  🤝 NO SURVIVORS: Everyone eliminated in {pool.name}!'
                     )
-                )
\ No newline at end of file
+                )
+
+        if not dry_run and live_events:
+            self.tracker.rows('live_events', publish(live_events))
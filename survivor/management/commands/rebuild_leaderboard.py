@@ -0,0 +1,14 @@
+# survivor/management/commands/rebuild_leaderboard.py
+from django.core.management.base import BaseCommand
+from survivor.services import metrics
+from survivor.services.leaderboard import rebuild_leaderboard
+
+class Command(BaseCommand):
+    help = 'Rebuild the global leaderboard from every pool entry and processed pick'
+
+    def handle(self, *args, **options):
+        with metrics.track_command('rebuild_leaderboard') as tracker:
+            rows = rebuild_leaderboard()
+            tracker.rows('leaderboard_rows', rows)
+        self.stdout.write(f'✓ {rows} players')
+        self.stdout.write(self.style.SUCCESS('\nLeaderboard rebuilt!'))
@@ -0,0 +1,60 @@
+# survivor/management/commands/rebuild_ratings.py
+from django.core.management.base import BaseCommand, CommandError
+
+from survivor.models import Season
+from survivor.services import metrics
+from survivor.services.calendar import invalidate_calendar
+from survivor.services.football_api import FootballDataAPI
+from survivor.services.ratings import rebuild_ratings, ratings_from_standings
+from survivor.services.teams import get_team_registry
+
+class Command(BaseCommand):
+    help = "Recompute team ratings by replaying a season's results, and refresh fixture probabilities"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            help='Season to replay, e.g. 2024-25 (default: the active season)'
+        )
+        parser.add_argument(
+            '--from-standings',
+            action='store_true',
+            help=(
+                'Start from ratings derived from the current football-data.org table instead of '
+                'equal ratings (run it before the season starts, when the table is last season\'s)'
+            )
+        )
+
+    def handle(self, *args, **options):
+        with metrics.track_command('rebuild_ratings') as tracker:
+            self._handle(options, tracker)
+
+    def _handle(self, options, tracker):
+        if options.get('season'):
+            season = Season.objects.filter(year=options['season']).first()
+        else:
+            season = Season.objects.filter(is_active=True).first()
+        if season is None:
+            raise CommandError('Season not found')
+
+        initial = None
+        if options['from_standings']:
+            self.stdout.write('Fetching standings...')
+            initial = ratings_from_standings(FootballDataAPI().get_standings())
+            if not initial:
+                raise CommandError('Failed to fetch standings')
+            self.stdout.write(f'  → Seeded {len(initial)} teams from the table')
+
+        engine, played, history = rebuild_ratings(season, initial)
+        tracker.rows('ratings_updated', history)
+        invalidate_calendar()
+
+        self.stdout.write(f'✓ Replayed {played} matches of {season.year} ({history} rating history rows)')
+        ranked = sorted(engine.ratings.items(), key=lambda item: -item[1])
+        teams = get_team_registry()
+        for position, (team_id, rating) in enumerate(ranked, 1):
+            team = teams.get(team_id)
+            if team:
+                self.stdout.write(f'  {position:>2}. {team.name:<28} {rating:7.1f}')
+
+        self.stdout.write(self.style.SUCCESS('\nRatings rebuilt!'))
@@ -0,0 +1,82 @@
+# survivor/management/commands/simulate_pools.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from survivor.models import GamePool
+from survivor.services import metrics
+from survivor.services.simulation import match_probabilities, simulate_pool
+
+class Command(BaseCommand):
+    help = 'Simulate the rest of the season and store survival and win odds for every live entry'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pool',
+            type=int,
+            help='Simulate a specific pool id (default: active pools of the active season)'
+        )
+        parser.add_argument(
+            '--trials',
+            type=int,
+            default=10000,
+            help='Number of simulated seasons'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed, for reproducible odds'
+        )
+        parser.add_argument(
+            '--draw-rate',
+            type=float,
+            help="Probability of a draw in matches without ratings (default: the season's draw rate)"
+        )
+        parser.add_argument(
+            '--home-advantage',
+            type=float,
+            help='Points-per-game bonus for the home team in matches without ratings'
+        )
+
+    def handle(self, *args, **options):
+        with metrics.track_command('simulate_pools') as tracker:
+            self._handle(options, tracker)
+
+    def _handle(self, options, tracker):
+        if options.get('pool'):
+            pools = GamePool.objects.filter(pk=options['pool'])
+        else:
+            pools = GamePool.objects.filter(is_active=True, season__is_active=True)
+        pools = list(pools.select_related('season'))
+        if not pools:
+            self.stdout.write(self.style.WARNING('No pools to simulate.'))
+            return
+
+        # Match probabilities only depend on the season, so share them
+        probabilities = {}
+        overrides = {}
+        if options.get('home_advantage') is not None:
+            overrides['home_advantage'] = options['home_advantage']
+
+        for pool in pools:
+            if pool.season_id not in probabilities:
+                probabilities[pool.season_id] = match_probabilities(
+                    pool.season, draw_rate=options.get('draw_rate'), **overrides
+                )
+            started = time.perf_counter()
+            model, forecasts = simulate_pool(
+                pool,
+                trials=options['trials'],
+                seed=options.get('seed'),
+                probabilities=probabilities[pool.season_id],
+            )
+            tracker.rows('forecasts_written', len(forecasts))
+            self.stdout.write(
+                f'✓ {pool.name}: {len(forecasts)} live entries, {len(model.path_counts)} distinct paths, '
+                f'{len(model.matchdays)} matchdays left ({time.perf_counter() - started:.1f}s)'
+            )
+            favourite = max(forecasts, key=lambda f: f.win_probability, default=None)
+            if favourite:
+                self.stdout.write(f'  → Favourite: entry {favourite.player_entry_id} at {favourite.win_probability:.1%}')
+
+        self.stdout.write(self.style.SUCCESS('\nSimulation complete!'))
@@ -3,7 +3,14 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import datetime, timedelta
 from survivor.models import Season, Matchday, Match, Team
-from survivor.services.football_api import FootballDataAPI, TeamMapper
+from survivor.services.football_api import FootballDataAPI, RecordedFootballDataAPI, TeamMapper
+from survivor.services import metrics
+from survivor.services.calendar import invalidate_calendar
+from survivor.services.fixtures import forget_final_matchday
+from survivor.services.ratings import RatingEngine, rebuild_ratings
+from survivor.services.teams import get_team_registry
+from survivor.services.live import prune_live_events, publish, score_event
+import json
 import pytz
 
 class Command(BaseCommand):
@@ -25,9 +32,29 @@ class Command(BaseCommand):
             action='store_true',
             help='Only update results for existing matches'
         )
+        parser.add_argument(
+            '--from-file',
+            help='Replay API responses saved with --record instead of calling the API'
+        )
+        parser.add_argument(
+            '--record',
+            help='Save the API responses to this file for later --from-file runs'
+        )
     
     def handle(self, *args, **options):
-        api = FootballDataAPI()
+        with metrics.track_command('sync_fixtures') as tracker:
+            self.tracker = tracker
+            self._handle(options)
+    
+    def _handle(self, options):
+        # Set when a match already rated by process_results gets a new score
+        self.rerate = False
+        if options.get('from_file'):
+            api = RecordedFootballDataAPI(options['from_file'])
+        else:
+            api = FootballDataAPI()
+            if options.get('record'):
+                api.recording = {}
         
         # Get current season from API if not specified
         if not options['season']:
@@ -51,6 +78,11 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Failed to fetch matches from API'))
             return
         
+        if api.recording is not None:
+            with open(options['record'], 'w') as f:
+                json.dump(api.recording, f)
+            self.stdout.write(f"Recorded API responses to {options['record']}")
+        
         # Group matches by matchday
         matches_by_matchday = {}
         for match in api_matches:
@@ -66,6 +98,28 @@ class Command(BaseCommand):
             
             self._process_matchday(season, matchday_num, matches, options.get('results_only', False))
         
+        if self.rerate:
+            # Ratings only move forward; replay the season to take a corrected score back
+            _, _, history = rebuild_ratings(season)
+            self.tracker.rows('ratings_updated', history)
+            self.stdout.write('  → Corrected results: replayed the season\'s ratings')
+        else:
+            # New or rescheduled fixtures get probabilities from the current ratings
+            self.tracker.rows(
+                'match_probabilities_updated', RatingEngine().update_match_probabilities(season)
+            )
+        
+        # Matchday dates and status may have changed
+        invalidate_calendar()
+        
+        # Live events are only needed while someone could still be waiting for them
+        prune_live_events()
+        
+        if TeamMapper.misses:
+            self.stdout.write(self.style.WARNING('\nUnmapped API team names (add them as team aliases):'))
+            for api_name, count in TeamMapper.misses.most_common():
+                self.stdout.write(f'  {api_name}: {count} occurrences')
+        
         self.stdout.write(self.style.SUCCESS('\n✓ Sync complete!'))
     
     def _ensure_season_exists(self, year):
@@ -114,8 +168,10 @@ class Command(BaseCommand):
             
             if created:
                 self.stdout.write(f'\n✓ Created Matchday {matchday_num}')
+                self.tracker.rows('matchdays_created')
             else:
                 self.stdout.write(f'\n✓ Updating Matchday {matchday_num}')
+                self.tracker.rows('matchdays_updated')
         else:
             try:
                 matchday = Matchday.objects.get(season=season, number=matchday_num)
@@ -123,6 +179,15 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.WARNING(f'Matchday {matchday_num} not found'))
                 return
         
+        # Scores before this sync, so only changed ones are pushed to live pages
+        self.previous_scores = {
+            (home_id, away_id): (home_score, away_score)
+            for home_id, away_id, home_score, away_score in matchday.matches.values_list(
+                'home_team_id', 'away_team_id', 'home_score', 'away_score'
+            )
+        }
+        self.score_changes = []
+        
         # Process each match
         created_count = 0
         updated_count = 0
@@ -134,15 +199,24 @@ class Command(BaseCommand):
             elif result == 'updated':
                 updated_count += 1
         
+        if self.score_changes:
+            self.tracker.rows('live_events', publish([score_event(match) for match in self.score_changes]))
+        
         self.stdout.write(
             f'  → Matchday {matchday_num}: '
             f'Created {created_count}, Updated {updated_count} matches'
         )
+        self.tracker.rows('matches_created', created_count)
+        self.tracker.rows('matches_updated', updated_count)
         
         # Update matchday completion status
         if all(m['status'] == 'FINISHED' for m in matches):
             matchday.is_complete = True
             matchday.save()
+        
+        # A completed matchday's grid entry is kept until its matches change
+        if self.score_changes or created_count:
+            forget_final_matchday(matchday.id)
     
     def _process_match(self, matchday, api_match, results_only=False):
         """Process a single match"""
@@ -151,11 +225,11 @@ class Command(BaseCommand):
         home_team_name = TeamMapper.get_team_name(api_match['homeTeam']['name'])
         away_team_name = TeamMapper.get_team_name(api_match['awayTeam']['name'])
         
-        # Get teams from database
-        try:
-            home_team = Team.objects.get(name=home_team_name)
-            away_team = Team.objects.get(name=away_team_name)
-        except Team.DoesNotExist as e:
+        # Get teams from the in-process registry
+        teams = get_team_registry().by_name
+        home_team = teams.get(home_team_name)
+        away_team = teams.get(away_team_name)
+        if home_team is None or away_team is None:
             self.stdout.write(
                 self.style.WARNING(
                     f'  ⚠ Team not found: {home_team_name} or {away_team_name}'
@@ -197,6 +271,7 @@ class Command(BaseCommand):
                     match.away_score = away_score
                     match.result = result
                     match.save()
+                    self._score_changed(match)
                     
                     self.stdout.write(
                         f'  ✓ Updated result: {home_team.short_name} {home_score}-{away_score} {away_team.short_name}'
@@ -221,7 +296,8 @@ class Command(BaseCommand):
                     'home_score': home_score,
                     'away_score': away_score,
                     'result': result,
-                    'is_processed': False  # Will be processed by process_results command
+                    # is_processed is left alone: process_results rates a match
+                    # once, and rerunning it on a processed match counts it twice
                 }
             )
             
@@ -232,11 +308,21 @@ class Command(BaseCommand):
                 )
                 return 'created'
             else:
-                if match.home_score != home_score or match.away_score != away_score:
+                if self._score_changed(match):
                     self.stdout.write(
                         f'  ✓ Updated: {home_team.short_name} {home_score or "?"}-'
                         f'{away_score or "?"} {away_team.short_name}'
                     )
                 return 'updated'
         
-        return None
\ No newline at end of file
+        return None
+    
+    def _score_changed(self, match):
+        """Queue a live score event if the match's score differs from before the sync"""
+        before = self.previous_scores.get((match.home_team_id, match.away_team_id), (None, None))
+        if match.home_score is None or before == (match.home_score, match.away_score):
+            return False
+        self.score_changes.append(match)
+        if match.is_processed:
+            self.rerate = True
+        return True
@@ -0,0 +1,44 @@
+# survivor/middleware.py
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .services import metrics
+
+
+class MetricsMiddleware:
+    """Record per-view request latency for the /metrics endpoint"""
+
+    # Runs natively under ASGI too, so async views stay on the event loop
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started)
+        return response
+
+    def _observe(self, request, response, elapsed):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else 'unresolved'
+        metrics.VIEW_LATENCY.observe(
+            elapsed,
+            view=view_name,
+            method=request.method,
+            status=response.status_code,
+        )
+        metrics.registry.flush()
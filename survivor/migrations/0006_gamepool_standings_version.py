@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-19 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0005_gamepool_deadline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamepool',
+            name='standings_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
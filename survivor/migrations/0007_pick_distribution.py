@@ -0,0 +1,58 @@
+# Generated by Django 5.1 on 2026-10-19 07:27
+
+import django.db.models.deletion
+from collections import defaultdict
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def backfill_pick_distribution(apps, schema_editor):
+    Pick = apps.get_model('survivor', 'Pick')
+    PickDistribution = apps.get_model('survivor', 'PickDistribution')
+    Matchday = apps.get_model('survivor', 'Matchday')
+
+    rows = Pick.objects.values('matchday', 'player_entry__pool', 'team').annotate(count=Count('id'))
+    distribution = []
+    totals = defaultdict(int)
+    for row in rows:
+        distribution.append(PickDistribution(
+            matchday_id=row['matchday'], pool_id=row['player_entry__pool'],
+            team_id=row['team'], count=row['count']
+        ))
+        totals[(row['matchday'], row['team'])] += row['count']
+    distribution.extend(
+        PickDistribution(matchday_id=matchday_id, pool_id=None, team_id=team_id, count=count)
+        for (matchday_id, team_id), count in totals.items()
+    )
+    PickDistribution.objects.bulk_create(distribution, batch_size=1000)
+    Matchday.objects.filter(start_date__lte=timezone.now()).update(pick_distribution_final=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0006_gamepool_standings_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchday',
+            name='pick_distribution_final',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='PickDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('matchday', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pick_distribution', to='survivor.matchday')),
+                ('pool', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pick_distribution', to='survivor.gamepool')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='survivor.team')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('matchday', 'pool', 'team'), name='unique_pool_pick_distribution'), models.UniqueConstraint(condition=models.Q(('pool__isnull', True)), fields=('matchday', 'team'), name='unique_global_pick_distribution')],
+            },
+        ),
+        migrations.RunPython(backfill_pick_distribution, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1 on 2026-10-19 07:33
+
+from django.db import migrations, models
+
+# Names and colours previously hard-coded in TeamMapper and sync_teams
+SEED_ALIASES = [
+    ('FC Bayern München', 'Bayern Munich', '#DC052D', '#FFFFFF'),
+    ('Borussia Dortmund', 'Borussia Dortmund', '#FDE100', '#000000'),
+    ('Bayer 04 Leverkusen', 'Bayer Leverkusen', '#E32221', '#000000'),
+    ('RB Leipzig', 'RB Leipzig', '#DD0741', '#FFFFFF'),
+    ('1. FC Union Berlin', 'Union Berlin', '#EB1923', '#FFC947'),
+    ('Sport-Club Freiburg', 'SC Freiburg', '#5B5B5B', '#FFFFFF'),
+    ('Eintracht Frankfurt', 'Eintracht Frankfurt', '#E00005', '#000000'),
+    ('VfL Wolfsburg', 'VfL Wolfsburg', '#65B32E', '#FFFFFF'),
+    ('1. FSV Mainz 05', 'Mainz 05', '#C3141E', '#FFFFFF'),
+    ('Borussia Mönchengladbach', 'Borussia Mönchengladbach', '#000000', '#FFFFFF'),
+    ('1. FC Köln', 'FC Köln', '#ED1C24', '#FFFFFF'),
+    ('TSG 1899 Hoffenheim', 'Hoffenheim', '#1961B5', '#FFFFFF'),
+    ('SV Werder Bremen', 'Werder Bremen', '#1D9053', '#FFFFFF'),
+    ('FC Augsburg', 'FC Augsburg', '#BA3733', '#FFFFFF'),
+    ('VfB Stuttgart', 'VfB Stuttgart', '#E32219', '#FFFFFF'),
+    ('VfL Bochum 1848', 'VfL Bochum', '#005BA4', '#FFFFFF'),
+    ('1. FC Heidenheim 1846', 'FC Heidenheim', '#ED1C24', '#003D7C'),
+    ('SV Darmstadt 98', 'SV Darmstadt 98', '#004BA0', '#FFFFFF'),
+]
+
+
+def seed_aliases(apps, schema_editor):
+    TeamAlias = apps.get_model('survivor', 'TeamAlias')
+    TeamAlias.objects.bulk_create([
+        TeamAlias(name=name, team_name=team_name, is_api_name=True,
+                  color_primary=primary, color_secondary=secondary)
+        for name, team_name, primary, secondary in SEED_ALIASES
+    ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0007_pick_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('team_name', models.CharField(max_length=100)),
+                ('is_api_name', models.BooleanField(default=False)),
+                ('color_primary', models.CharField(blank=True, max_length=7)),
+                ('color_secondary', models.CharField(blank=True, max_length=7)),
+            ],
+            options={
+                'verbose_name_plural': 'team aliases',
+                'ordering': ['team_name', 'name'],
+            },
+        ),
+        migrations.RunPython(seed_aliases, migrations.RunPython.noop),
+    ]
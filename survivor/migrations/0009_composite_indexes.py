@@ -0,0 +1,39 @@
+# Generated by Django 5.1 on 2026-10-19 07:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0008_team_alias'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['matchday', 'kickoff'], name='match_matchday_kickoff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['kickoff', 'result'], name='match_kickoff_result_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(condition=models.Q(('is_processed', False)), fields=['is_processed', 'result'], name='match_unprocessed_result_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pick',
+            index=models.Index(fields=['matchday', 'is_successful'], name='pick_matchday_success_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pick',
+            index=models.Index(fields=['player_entry', 'team'], name='pick_entry_team_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerentry',
+            index=models.Index(fields=['pool', 'is_eliminated'], name='entry_pool_eliminated_idx'),
+        ),
+    ]
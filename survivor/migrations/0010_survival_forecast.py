@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-19 07:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0009_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurvivalForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('survive_next', models.FloatField()),
+                ('survive_season', models.FloatField()),
+                ('win_probability', models.FloatField()),
+                ('trials', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('player_entry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='survivor.playerentry')),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-19 07:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0010_survival_forecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='away_win_probability',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='draw_probability',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='home_win_probability',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='rating',
+            field=models.FloatField(default=1500.0),
+        ),
+        migrations.CreateModel(
+            name='TeamRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField()),
+                ('matchday', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_ratings', to='survivor.matchday')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='survivor.team')),
+            ],
+            options={
+                'ordering': ['matchday__number', 'team__name'],
+                'unique_together': {('team', 'matchday')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-19 07:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0011_team_ratings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_entry_id', models.PositiveIntegerField(default=0)),
+                ('survivors', models.BinaryField()),
+                ('alive_count', models.PositiveIntegerField()),
+                ('total_count', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('matchday', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='survivor.matchday')),
+                ('pool', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='survivor.gamepool')),
+            ],
+            options={
+                'ordering': ['pool', 'matchday__number'],
+                'unique_together': {('pool', 'matchday')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-19 07:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0012_standings_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PickCube',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pick_cube', to='survivor.season')),
+            ],
+        ),
+    ]
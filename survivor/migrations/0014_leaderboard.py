@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-19 07:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0013_pick_cube'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pools_entered', models.PositiveIntegerField(default=0)),
+                ('matchdays_survived', models.PositiveIntegerField(default=0)),
+                ('best_finish', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-matchdays_survived', 'user_id'],
+                'indexes': [models.Index(fields=['-matchdays_survived', 'user'], name='leaderboard_order_idx')],
+            },
+        ),
+    ]
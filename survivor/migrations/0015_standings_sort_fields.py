@@ -0,0 +1,50 @@
+# Generated by Django 5.1 on 2026-10-19 07:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_sort_fields(apps, schema_editor):
+    PlayerEntry = apps.get_model('survivor', 'PlayerEntry')
+    Matchday = apps.get_model('survivor', 'Matchday')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    PlayerEntry.objects.update(
+        username=Subquery(User.objects.filter(id=OuterRef('user_id')).values('username')[:1])
+    )
+    PlayerEntry.objects.filter(eliminated_matchday__isnull=False).update(
+        eliminated_number=Subquery(
+            Matchday.objects.filter(id=OuterRef('eliminated_matchday_id')).values('number')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0014_leaderboard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='playerentry',
+            options={'ordering': ['is_eliminated', '-eliminated_number', 'username']},
+        ),
+        migrations.AddField(
+            model_name='playerentry',
+            name='eliminated_number',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='playerentry',
+            name='username',
+            field=models.CharField(blank=True, max_length=150),
+        ),
+        migrations.RunPython(backfill_sort_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='playerentry',
+            index=models.Index(fields=['pool', 'is_eliminated', '-eliminated_number', 'username'], name='entry_standings_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-19 08:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survivor', '0015_standings_sort_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('score', 'Score update'), ('elimination', 'Eliminations'), ('matchday_complete', 'Matchday complete')], max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('matchday', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='live_events', to='survivor.matchday')),
+                ('pool', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='live_events', to='survivor.gamepool')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='live_events', to='survivor.season')),
+            ],
+        ),
+    ]
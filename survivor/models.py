@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -8,6 +9,8 @@ class Team(models.Model):
     short_name = models.CharField(max_length=3)
     color_primary = models.CharField(max_length=7, default='#FFFFFF') # Hex color
     color_secondary = models.CharField(max_length=7, default='#000000') # Hex color
+    # Current Elo rating, updated by process_results (see services/ratings.py)
+    rating = models.FloatField(default=1500.0)
 
     class Meta:
         ordering = ['name']
@@ -15,6 +18,22 @@ class Team(models.Model):
     def __str__(self):
         return self.name
 
+class TeamAlias(models.Model):
+    """Another name for a team, such as the one football-data.org uses"""
+    name = models.CharField(max_length=100, unique=True)
+    team_name = models.CharField(max_length=100)  # Team.name this alias maps to
+    is_api_name = models.BooleanField(default=False)  # Used for reverse lookups
+    # Colours applied when sync_teams creates the team; blank keeps the defaults
+    color_primary = models.CharField(max_length=7, blank=True)
+    color_secondary = models.CharField(max_length=7, blank=True)
+
+    class Meta:
+        ordering = ['team_name', 'name']
+        verbose_name_plural = 'team aliases'
+
+    def __str__(self):
+        return f"{self.name} → {self.team_name}"
+
 class Season(models.Model):
     year = models.CharField(max_length=7, unique=True) # e.g. "2024-25"
     is_active = models.BooleanField(default=False)
@@ -37,6 +56,8 @@ class Matchday(models.Model):
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     is_complete = models.BooleanField(default=False)
+    # Set once the pick distribution has been recounted after the deadline
+    pick_distribution_final = models.BooleanField(default=False)
 
     class Meta:
         unique_together = ['season', 'number']
@@ -71,6 +92,26 @@ class Match(models.Model):
     away_score = models.IntegerField(null=True, blank=True)
     is_processed = models.BooleanField(default=False)
     modified_at = models.DateTimeField(auto_now=True)
+    # Outcome probabilities from the teams' ratings, refreshed until kickoff
+    home_win_probability = models.FloatField(null=True, blank=True)
+    draw_probability = models.FloatField(null=True, blank=True)
+    away_win_probability = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Fixture grid: matches of given matchdays in kickoff order
+            models.Index(fields=['matchday', 'kickoff'], name='match_matchday_kickoff_idx'),
+            # Home page: next unplayed matches
+            models.Index(fields=['kickoff', 'result'], name='match_kickoff_result_idx'),
+            # process_results: finished but unprocessed matches. Partial, because
+            # nearly every row is processed and a plain boolean index looks
+            # useless to the planner
+            models.Index(
+                fields=['is_processed', 'result'],
+                name='match_unprocessed_result_idx',
+                condition=Q(is_processed=False),
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         # Auto-calculate result from scores
@@ -83,6 +124,14 @@ class Match(models.Model):
                 self.result = 'DRAW'
         super().save(*args, **kwargs)
 
+    def not_lose_probability(self, team):
+        """Rated chance of the given team not losing, None if not rated yet"""
+        if self.draw_probability is None:
+            return None
+        if team == self.home_team:
+            return self.home_win_probability + self.draw_probability
+        return self.away_win_probability + self.draw_probability
+
     def did_not_lose(self, team):
         """Check if the given team did not lose this match"""
         if self.result is None:
@@ -98,6 +147,19 @@ class Match(models.Model):
     def __str__(self):
         return f"{self.home_team.short_name} vs {self.away_team.short_name} on {self.kickoff.strftime('%Y-%m-%d')}"
 
+class TeamRating(models.Model):
+    """A team's Elo rating after its matches of a matchday"""
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='ratings')
+    matchday = models.ForeignKey(Matchday, on_delete=models.CASCADE, related_name='team_ratings')
+    rating = models.FloatField()
+
+    class Meta:
+        unique_together = ['team', 'matchday']
+        ordering = ['matchday__number', 'team__name']
+
+    def __str__(self):
+        return f"{self.team.name} - Matchday {self.matchday.number}: {self.rating:.0f}"
+
 class GamePool(models.Model):
     name = models.CharField(max_length=100)
     season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='pools')
@@ -105,9 +167,16 @@ class GamePool(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     deadline = models.DateTimeField(blank=True, null=True)
+    # Bumped whenever the standings change; keys the cached standings fragment
+    standings_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.name} ({self.season.year})"
+
+    @classmethod
+    def bump_standings_version(cls, pool_ids):
+        """Invalidate the cached standings of the given pools"""
+        cls.objects.filter(pk__in=pool_ids).update(standings_version=F('standings_version') + 1)
     
     @property
     def is_open(self):
@@ -131,10 +200,21 @@ class PlayerEntry(models.Model):
                                             on_delete=models.SET_NULL, 
                                             related_name='eliminations')
     joined_at = models.DateTimeField(auto_now_add=True)
+    # Copies of eliminated_matchday.number (0 while alive) and user.username,
+    # so the standings order is a single index (see services/standings.py)
+    eliminated_number = models.PositiveSmallIntegerField(default=0)
+    username = models.CharField(max_length=150, blank=True)
 
     class Meta:
         unique_together = ['user', 'pool']
-        ordering = ['is_eliminated', '-eliminated_matchday__number', 'user__username']
+        ordering = ['is_eliminated', '-eliminated_number', 'username']
+        indexes = [
+            # Active/total player counts per pool
+            models.Index(fields=['pool', 'is_eliminated'], name='entry_pool_eliminated_idx'),
+            # Standings pages and username search within a pool
+            models.Index(fields=['pool', 'is_eliminated', '-eliminated_number', 'username'],
+                         name='entry_standings_idx'),
+        ]
 
     def __str__(self):
         status = "Eliminated" if self.is_eliminated else "Active"
@@ -146,16 +226,16 @@ class PlayerEntry(models.Model):
     
     def can_pick_team(self, team):
         """Check if the player can pick the given team (not picked twice already)"""
-        return self.get_pick_count_for_team(team) < 2
+        return self.get_pick_count_for_team(team) < MAX_PICKS_PER_TEAM
     
     def get_available_teams(self, matchday=None):
         """Get list of teams that can still be picked by this player"""
-        teams = Team.objects.all()
-        available = []
-        for team in teams:
-            if self.can_pick_team(team):
-                available.append(team)
-        return available
+        from survivor.services.teams import get_team_registry
+
+        pick_counts = {}
+        for team_id in self.picks.values_list('team_id', flat=True):
+            pick_counts[team_id] = pick_counts.get(team_id, 0) + 1
+        return [team for team in get_team_registry() if pick_counts.get(team.id, 0) < MAX_PICKS_PER_TEAM]
 
     def clean(self):
         # Ensure that a player can only join a GamePool if it is open
@@ -165,7 +245,47 @@ class PlayerEntry(models.Model):
     def save(self, *args, **kwargs):
         # Run validation before saving
         self.full_clean()
+        self.username = self.user.username
+        self.eliminated_number = self.eliminated_matchday.number if self.eliminated_matchday_id else 0
         super().save(*args, **kwargs)
+        GamePool.bump_standings_version([self.pool_id])
+
+    def delete(self, *args, **kwargs):
+        pool_id = self.pool_id
+        result = super().delete(*args, **kwargs)
+        GamePool.bump_standings_version([pool_id])
+        return result
+
+class StandingsSnapshot(models.Model):
+    """
+    The entries of a pool still alive after a completed matchday.
+
+    Append-only. Survivors are stored as a packed bitset over entry ids
+    starting at `base_entry_id` (see services/snapshots.py), so "who was
+    alive after matchday N" is a single row read.
+    """
+    pool = models.ForeignKey(GamePool, on_delete=models.CASCADE, related_name='snapshots')
+    matchday = models.ForeignKey(Matchday, on_delete=models.CASCADE, related_name='snapshots')
+    base_entry_id = models.PositiveIntegerField(default=0)
+    survivors = models.BinaryField()
+    alive_count = models.PositiveIntegerField()
+    total_count = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['pool', 'matchday']
+        ordering = ['pool', 'matchday__number']
+
+    def __str__(self):
+        return f"{self.pool.name} after Matchday {self.matchday.number}: {self.alive_count}/{self.total_count}"
+
+    def survivor_ids(self):
+        from survivor.services.snapshots import decode_ids
+
+        return decode_ids(self.base_entry_id, self.survivors)
+
+# How often an entry may pick the same team in a season (see Pick.clean)
+MAX_PICKS_PER_TEAM = 2
 
 class Pick(models.Model):
     player_entry = models.ForeignKey(PlayerEntry, on_delete=models.CASCADE,
@@ -179,6 +299,12 @@ class Pick(models.Model):
     class Meta:
         unique_together = ['player_entry', 'matchday']
         ordering = ['matchday__number']
+        indexes = [
+            # process_results: unprocessed picks of a matchday
+            models.Index(fields=['matchday', 'is_successful'], name='pick_matchday_success_idx'),
+            # Pick.clean: how often an entry picked a team
+            models.Index(fields=['player_entry', 'team'], name='pick_entry_team_idx'),
+        ]
 
     def __str__(self):
         return f"{self.player_entry.user.username} picked {self.team.short_name} for Matchday {self.matchday.number}"
@@ -192,7 +318,7 @@ class Pick(models.Model):
                 team=self.team
             ).exclude(pk=self.pk).count()
 
-            if pick_count >= 2:
+            if pick_count >= MAX_PICKS_PER_TEAM:
                 raise ValidationError(f"You've already picked {self.team} twice!")
         
         # Check if pick deadline has passed
@@ -206,5 +332,146 @@ class Pick(models.Model):
     def save(self, *args, **kwargs):
         # Run validation before saving
         self.full_clean()
-        super().save(*args, **kwargs)
+        previous = None
+        if self.pk:
+            previous = Pick.objects.filter(pk=self.pk).values_list('matchday_id', 'team_id').first()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous != (self.matchday_id, self.team_id):
+                pool_id = self.player_entry.pool_id
+                if previous is not None:
+                    previous_matchday_id, previous_team_id = previous
+                    PickDistribution.adjust(previous_matchday_id, pool_id, previous_team_id, -1)
+                PickDistribution.adjust(self.matchday_id, pool_id, self.team_id, 1)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            PickDistribution.adjust(self.matchday_id, self.player_entry.pool_id, self.team_id, -1)
+            return super().delete(*args, **kwargs)
 
+class PickDistribution(models.Model):
+    """
+    Pick counts per team for a matchday, per pool and across all pools (pool is null).
+
+    Pick.save() and Pick.delete() keep the counts current. Bulk writes,
+    QuerySet.update() and deletes, and cascades from PlayerEntry or GamePool
+    bypass them; code that changes picks that way calls
+    rebuild_pick_distribution() afterwards, and the recount at kickoff
+    corrects whatever was missed.
+    """
+    matchday = models.ForeignKey(Matchday, on_delete=models.CASCADE, related_name='pick_distribution')
+    pool = models.ForeignKey(GamePool, null=True, blank=True, on_delete=models.CASCADE,
+                             related_name='pick_distribution')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['matchday', 'pool', 'team'],
+                                    name='unique_pool_pick_distribution'),
+            models.UniqueConstraint(fields=['matchday', 'team'], condition=Q(pool__isnull=True),
+                                    name='unique_global_pick_distribution'),
+        ]
+
+    def __str__(self):
+        scope = self.pool.name if self.pool_id else 'all pools'
+        return f"Matchday {self.matchday.number}: {self.team.short_name} x{self.count} ({scope})"
+
+    @classmethod
+    def adjust(cls, matchday_id, pool_id, team_id, delta):
+        """Add delta to the pool row and the all-pools row for a team"""
+        for scope in (pool_id, None):
+            rows = cls.objects.filter(matchday_id=matchday_id, pool_id=scope, team_id=team_id)
+            if rows.update(count=F('count') + delta) or delta < 0:
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(matchday_id=matchday_id, pool_id=scope, team_id=team_id, count=delta)
+            except IntegrityError:
+                # Another request created the row first
+                rows.update(count=F('count') + delta)
+
+
+class SurvivalForecast(models.Model):
+    """Simulated odds of a live entry, written by the simulate_pools command"""
+    player_entry = models.OneToOneField(PlayerEntry, on_delete=models.CASCADE, related_name='forecast')
+    survive_next = models.FloatField()  # Survives the next unfinished matchday
+    survive_season = models.FloatField()  # Survives every remaining matchday
+    win_probability = models.FloatField()  # Outlasts everyone else; shared on ties
+    trials = models.PositiveIntegerField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.player_entry}: {self.win_probability:.1%} to win"
+
+    @property
+    def survive_next_pct(self):
+        return self.survive_next * 100
+
+    @property
+    def win_pct(self):
+        return self.win_probability * 100
+
+class PickCube(models.Model):
+    """
+    A season's locked pick counts as a (pool x matchday x team) array.
+
+    Stored as a compressed NPZ blob and loaded by services/pick_cube.py;
+    each matchday's slice is filled from PickDistribution when its picks
+    lock.
+    """
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, related_name='pick_cube')
+    data = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Pick cube {self.season.year}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    A user's totals across every pool, for the global leaderboard.
+
+    Kept up to date by join_pool and process_results (services/leaderboard.py)
+    and rebuilt from scratch by the rebuild_leaderboard command.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='leaderboard_entry')
+    pools_entered = models.PositiveIntegerField(default=0)
+    matchdays_survived = models.PositiveIntegerField(default=0)  # Successful picks in all pools
+    best_finish = models.PositiveIntegerField(null=True, blank=True)  # Best final position in a pool
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-matchdays_survived', 'user_id']
+        indexes = [
+            # Keyset pagination walks this index (see leaderboard_page)
+            models.Index(fields=['-matchdays_survived', 'user'], name='leaderboard_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.matchdays_survived} matchdays survived"
+
+
+class LiveEvent(models.Model):
+    """
+    A score update or elimination, pushed to live pages as a server-sent event.
+
+    Written by sync_fixtures and process_results; each process polls for
+    new rows by id (see services/live.py). Events with a pool go to that
+    pool's stream, the others to their matchday's and season's streams.
+    """
+    KIND_CHOICES = [
+        ('score', 'Score update'),
+        ('elimination', 'Eliminations'),
+        ('matchday_complete', 'Matchday complete'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='live_events')
+    matchday = models.ForeignKey(Matchday, on_delete=models.CASCADE, related_name='live_events')
+    pool = models.ForeignKey(GamePool, null=True, blank=True, on_delete=models.CASCADE, related_name='live_events')
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} (Matchday {self.matchday.number})"
@@ -0,0 +1,133 @@
+# survivor/services/analytics.py
+"""
+Survival and elimination analytics for a pool.
+
+Everything is derived from one query over the pool's processed picks,
+loaded into NumPy arrays: survivors per matchday, the elimination rate of
+each picked team, the picks that knocked out the most players and every
+entry's path. Only completed matchdays are included, so the result for a
+given last completed matchday (and standings version) never changes.
+"""
+import numpy as np
+from django.conf import settings
+
+from survivor.models import Pick, PlayerEntry
+from survivor.services.caching import get_or_compute
+from survivor.services.calendar import get_season_calendar
+from survivor.services.teams import get_team_registry
+
+TOP_LOSING_PICKS = 10
+
+
+def last_completed_matchday(pool):
+    """Number of the pool season's latest completed matchday, 0 if none"""
+    calendar = get_season_calendar(pool.season_id)
+    return max((matchday.number for matchday in calendar.matchdays if matchday.is_complete), default=0)
+
+
+def analytics_cache_key(pool, through):
+    # The standings version also moves when someone joins late
+    return f'analytics:pool:{pool.id}:md{through}:v{pool.standings_version}'
+
+
+def compute_pool_analytics(pool, through):
+    """Analytics of a pool over matchdays 1..`through`"""
+    teams = get_team_registry()
+    entries = list(
+        PlayerEntry.objects.filter(pool=pool).order_by('id').values_list('id', 'user__username')
+    )
+    entry_ids = np.array([entry_id for entry_id, _ in entries], dtype=np.int64)
+
+    picks = np.array(
+        Pick.objects.filter(
+            player_entry__pool=pool,
+            matchday__season_id=pool.season_id,
+            matchday__number__lte=through,
+            is_successful__isnull=False,
+        ).values_list('player_entry_id', 'matchday__number', 'team_id', 'is_successful'),
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    entry, number, team, success = picks.T
+    failed = success == 0
+    row = np.searchsorted(entry_ids, entry)
+
+    # An entry is eliminated by its first failed pick
+    eliminated = np.full(len(entries), through + 1, dtype=np.int64)
+    np.minimum.at(eliminated, row[failed], number[failed])
+    eliminations = np.bincount(eliminated, minlength=through + 2)
+    survivors = len(entries) - np.cumsum(eliminations)
+
+    # Elimination rate by picked team
+    team_ids, team_index = np.unique(team, return_inverse=True)
+    picked = np.bincount(team_index, minlength=len(team_ids))
+    lost = np.bincount(team_index, weights=failed, minlength=len(team_ids)).astype(np.int64)
+    by_team = sorted(
+        (
+            {
+                'team': _team_name(teams, team_id),
+                'picks': int(picked[i]),
+                'eliminations': int(lost[i]),
+                'elimination_rate': float(lost[i] / picked[i]),
+            }
+            for i, team_id in enumerate(team_ids.tolist())
+        ),
+        key=lambda item: (-item['elimination_rate'], -item['picks'], item['team']),
+    )
+
+    # Most popular losing picks: (matchday, team) pairs by failed picks
+    losing_pairs, losing_counts = np.unique(
+        np.stack([number[failed], team[failed]], axis=1), axis=0, return_counts=True
+    )
+    top = np.argsort(-losing_counts, kind='stable')[:TOP_LOSING_PICKS]
+    losing_picks = [
+        {
+            'matchday': int(losing_pairs[i, 0]),
+            'team': _team_name(teams, int(losing_pairs[i, 1])),
+            'eliminated': int(losing_counts[i]),
+        }
+        for i in top
+    ]
+
+    # Every entry's picks in matchday order
+    order = np.lexsort((number, row))
+    bounds = np.searchsorted(row[order], np.arange(len(entries) + 1))
+    paths = {}
+    for i, (entry_id, username) in enumerate(entries):
+        span = order[bounds[i]:bounds[i + 1]]
+        paths[entry_id] = {
+            'username': username,
+            'eliminated_matchday': int(eliminated[i]) if eliminated[i] <= through else None,
+            'picks': [
+                [int(number[p]), _team_name(teams, int(team[p]), short=True), bool(success[p])]
+                for p in span
+            ],
+        }
+
+    return {
+        'pool': pool.name,
+        'through_matchday': through,
+        'entries': len(entries),
+        'survivors': [
+            {'matchday': n, 'alive': int(survivors[n])} for n in range(1, through + 1)
+        ],
+        'elimination_by_team': by_team,
+        'losing_picks': losing_picks,
+        'paths': paths,
+    }
+
+
+def _team_name(teams, team_id, short=False):
+    team = teams.get(team_id)
+    if team is None:
+        return str(team_id)
+    return team.short_name if short else team.name
+
+
+def get_pool_analytics(pool):
+    """The pool's analytics through its last completed matchday, cached until the next one"""
+    through = last_completed_matchday(pool)
+    return get_or_compute(
+        analytics_cache_key(pool, through),
+        lambda: compute_pool_analytics(pool, through),
+        settings.POOL_ANALYTICS_CACHE_TIMEOUT,
+    )
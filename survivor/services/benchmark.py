@@ -0,0 +1,182 @@
+# survivor/services/benchmark.py
+"""
+Helpers shared by the benchmark commands.
+
+The benchmarks run against a throwaway database created the same way the
+test runner creates one, seeded with the synthetic data generator, and
+report machine-readable JSON that can be saved as a baseline and compared
+against later runs.
+"""
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import clear_url_caches
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, query_counts, wall_time, errors=0):
+    """Latency percentiles (ms), mean queries per request and throughput"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        'queries': round(sum(query_counts) / len(query_counts), 1) if query_counts else None,
+        'throughput_rps': round(len(latencies) / wall_time, 1) if wall_time else None,
+    }
+
+
+class QueryCounter:
+    """Counts queries run on this thread's connection, without DEBUG"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def measure(self):
+        with connection.execute_wrapper(self):
+            yield self
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """
+    Create a fresh database for the duration of a benchmark.
+
+    SQLite gets a file instead of the test runner's in-memory database so
+    that worker threads share it, and waits for locks instead of failing
+    concurrent writes straight away.
+    """
+    setup_test_environment()
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_options = dict(connection.settings_dict.get('OPTIONS', {}))
+    tmp_dir = None
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['OPTIONS'] = {
+            'timeout': 30, 'transaction_mode': 'IMMEDIATE', **old_options
+        }
+        if not test_settings.get('NAME'):
+            tmp_dir = tempfile.mkdtemp(prefix='survivor-bench-')
+            test_settings['NAME'] = os.path.join(tmp_dir, 'bench.sqlite3')
+    old_name = connection.settings_dict['NAME']
+    try:
+        connection.creation.create_test_db(
+            verbosity=verbosity, autoclobber=True, serialize=False
+        )
+        yield connection.settings_dict['NAME']
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        connection.settings_dict['OPTIONS'] = old_options
+        if tmp_dir:
+            test_settings.pop('NAME', None)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        teardown_test_environment()
+
+
+def _reload_urlconfs():
+    for name in ('survivor.urls', settings.ROOT_URLCONF):
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+    clear_url_caches()
+
+
+@contextmanager
+def use_async_views(enabled=True):
+    """Route the read-only pages to the sync or async views for a while"""
+    try:
+        with override_settings(ASYNC_VIEWS=enabled):
+            _reload_urlconfs()
+            yield
+    finally:
+        _reload_urlconfs()
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline, threshold, higher_is_worse=(), lower_is_worse=()):
+    """
+    List regressions of `results` against `baseline`.
+
+    Both map a case name to a dict of numbers. A metric that moved more than
+    `threshold` (a fraction) in the bad direction is a regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in (*higher_is_worse, *lower_is_worse):
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None or old == new:
+                continue
+            if metric in higher_is_worse:
+                regressed = new > old * (1 + threshold)
+            else:
+                regressed = new < old * (1 - threshold)
+            if regressed:
+                change = f'{(new - old) / old * 100:+.0f}%' if old else 'new'
+                regressions.append(f'{name}: {metric} {old} -> {new} ({change})')
+    return regressions
+
+
+def recorded_matches_payload(season, results):
+    """
+    football-data.org responses for a season's matches, in the format of
+    FootballDataAPI.recording, so sync_fixtures can replay them offline.
+
+    `results` maps match id to (home score, away score) for finished matches.
+    """
+    from survivor.models import Match
+    from survivor.services.football_api import TeamMapper
+
+    competition_id = 2002
+    start_year = season.year[:4]
+    matches = []
+    for match in Match.objects.filter(matchday__season=season).select_related(
+        'matchday', 'home_team', 'away_team'
+    ).order_by('kickoff'):
+        home_score, away_score = results.get(match.id, (None, None))
+        matches.append({
+            'id': match.id,
+            'matchday': match.matchday.number,
+            'utcDate': match.kickoff.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'status': 'FINISHED' if match.id in results else 'SCHEDULED',
+            'homeTeam': {'name': TeamMapper.get_api_name(match.home_team.name)},
+            'awayTeam': {'name': TeamMapper.get_api_name(match.away_team.name)},
+            'score': {'fullTime': {'home': home_score, 'away': away_score}},
+        })
+    return {
+        f'competitions/{competition_id}': {'currentSeason': {'startDate': f'{start_year}-08-01'}},
+        f'competitions/{competition_id}/matches': {'matches': matches},
+    }
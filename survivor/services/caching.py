@@ -0,0 +1,180 @@
+# survivor/services/caching.py
+"""
+Shared-cache helpers that hold up with many workers.
+
+get_or_compute() stores each value with how long it took to compute and
+when it expires. A reader recomputes early with a probability that grows as
+the expiry gets closer and as the computation gets slower (XFetch), so a
+popular key is usually refreshed by a single request shortly before it
+expires instead of by every request right after. Whoever recomputes first
+takes a lock key with add(); the others keep serving the old value,
+or, on a cold miss, wait for the winner's for up to CACHE_LOCK_WAIT seconds.
+
+add() and incr() stay atomic across processes also on the file and
+database backends, whose own add() and incr() are a read followed by a
+write.
+"""
+import hashlib
+import math
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.files import locks
+
+from . import metrics
+
+LOCK_PREFIX = 'survivor:lock:'
+# Backends whose add() and incr() are atomic on their own
+ATOMIC_BACKENDS = ('RedisCache', 'LocMemCache', 'PyMemcacheCache', 'PyLibMCCache')
+WAIT_POLL_INTERVAL = 0.05  # in seconds
+
+
+def _entry(value, delta, timeout):
+    """What get_or_compute stores: the value, its compute time and its expiry"""
+    return value, delta, None if timeout is None else time.time() + timeout
+
+
+def _is_fresh(entry, beta):
+    _, delta, expires = entry
+    if expires is None:
+        return True
+    # -log(u) for u in (0, 1] is exponentially distributed with mean 1
+    return time.time() - delta * beta * math.log(1.0 - random.random()) < expires
+
+
+def get_or_compute(key, compute, timeout, beta=None):
+    """
+    Return the cached value of `key`, calling `compute()` to fill it.
+
+    `beta` above 1 refreshes earlier, below 1 later (CACHE_XFETCH_BETA by
+    default). Only values stored by this function can be read with it.
+    """
+    beta = settings.CACHE_XFETCH_BETA if beta is None else beta
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry, beta):
+        metrics.CACHE_LOOKUPS.inc(outcome='hit')
+        return entry[0]
+
+    lock = LOCK_PREFIX + key
+    if not add(lock, 1, settings.CACHE_LOCK_TIMEOUT):
+        if entry is None:
+            entry = _wait_for(key)
+        if entry is not None:
+            # Someone else is recomputing it
+            metrics.CACHE_LOOKUPS.inc(outcome='shared')
+            return entry[0]
+        lock = None  # The winner is stuck or gone; compute it here too
+
+    metrics.CACHE_LOOKUPS.inc(outcome='early' if entry is not None else 'miss')
+    try:
+        started = time.perf_counter()
+        value = compute()
+        cache.set(key, _entry(value, time.perf_counter() - started, timeout), timeout)
+    finally:
+        if lock:
+            cache.delete(lock)
+    return value
+
+
+def _wait_for(key):
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+async def aget_or_compute(key, compute, timeout, beta=None):
+    """get_or_compute for async callers; `compute` is a coroutine function"""
+    beta = settings.CACHE_XFETCH_BETA if beta is None else beta
+    entry = await cache.aget(key)
+    if entry is not None and _is_fresh(entry, beta):
+        metrics.CACHE_LOOKUPS.inc(outcome='hit')
+        return entry[0]
+
+    lock = LOCK_PREFIX + key
+    if not await aadd(lock, 1, settings.CACHE_LOCK_TIMEOUT):
+        if entry is None:
+            entry = await sync_to_async(_wait_for, thread_sensitive=False)(key)
+        if entry is not None:
+            metrics.CACHE_LOOKUPS.inc(outcome='shared')
+            return entry[0]
+        lock = None
+
+    metrics.CACHE_LOOKUPS.inc(outcome='early' if entry is not None else 'miss')
+    try:
+        started = time.perf_counter()
+        value = await compute()
+        await cache.aset(key, _entry(value, time.perf_counter() - started, timeout), timeout)
+    finally:
+        if lock:
+            await cache.adelete(lock)
+    return value
+
+
+@contextmanager
+def _file_lock(key):
+    """An exclusive lock on `key` shared by every process on this host"""
+    os.makedirs(settings.CACHE_LOCK_DIR, exist_ok=True)
+    path = os.path.join(settings.CACHE_LOCK_DIR, hashlib.md5(key.encode()).hexdigest() + '.lock')
+    with open(path, 'a') as f:
+        locks.lock(f, locks.LOCK_EX)
+        try:
+            yield
+        finally:
+            locks.unlock(f)
+
+
+def _is_atomic():
+    return type(caches['default']).__name__ in ATOMIC_BACKENDS
+
+
+def add(key, value, timeout):
+    """cache.add() that only one process can win, also on the file and database backends"""
+    if _is_atomic():
+        return cache.add(key, value, timeout)
+    with _file_lock(key):
+        if cache.has_key(key):
+            return False
+        cache.set(key, value, timeout)
+        return True
+
+
+async def aadd(key, value, timeout):
+    if _is_atomic():
+        return await cache.aadd(key, value, timeout)
+    return await sync_to_async(add, thread_sensitive=False)(key, value, timeout)
+
+
+def incr(key, timeout, delta=1):
+    """
+    Add `delta` to the counter at `key`, creating it with `timeout`, and
+    return the new count.
+
+    Redis, memcached and locmem increment atomically themselves. On the
+    file and database backends the counter is updated under a file lock,
+    which keeps it exact between the workers of one host; the timeout
+    restarts with every update there, so key counters by time window
+    rather than relying on it.
+    """
+    if _is_atomic():
+        if cache.add(key, delta, timeout):
+            return delta
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # Expired between the add and the incr
+            cache.set(key, delta, timeout)
+            return delta
+
+    with _file_lock(key):
+        count = cache.get(key, 0) + delta
+        cache.set(key, count, timeout)
+        return count
@@ -0,0 +1,130 @@
+# survivor/services/calendar.py
+"""
+In-process season calendar.
+
+The matchday schedule only changes when sync_fixtures (or process_results,
+which completes matchdays) runs, so each process loads it once and answers
+"current", "next" and "past/future" lookups with a bisect over sorted start
+and end times, without touching the database.
+"""
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.utils import timezone
+
+from survivor.models import Matchday, Season
+from survivor.services.versions import VersionedSnapshot
+
+
+class SeasonCalendar:
+    """Sorted matchday start/end times for one season"""
+
+    def __init__(self, season, matchdays):
+        self.season = season
+        # In matchday number order
+        self.matchdays = sorted(matchdays, key=lambda md: md.number)
+
+        self._by_start = sorted(self.matchdays, key=lambda md: md.start_date)
+        self._starts = [md.start_date for md in self._by_start]
+        self._by_end = sorted(self.matchdays, key=lambda md: md.end_date)
+        self._ends = [md.end_date for md in self._by_end]
+
+        # Dates are not guaranteed to follow matchday numbers (postponements),
+        # so keep the highest number among started matchdays for each prefix
+        # and the lowest number among not-yet-started ones for each suffix.
+        self._latest_started = []
+        latest = None
+        for md in self._by_start:
+            if latest is None or md.number > latest.number:
+                latest = md
+            self._latest_started.append(latest)
+
+        self._earliest_upcoming = [None] * (len(self._by_start) + 1)
+        earliest = None
+        for i in range(len(self._by_start) - 1, -1, -1):
+            md = self._by_start[i]
+            if earliest is None or md.number < earliest.number:
+                earliest = md
+            self._earliest_upcoming[i] = earliest
+
+    def current(self, now=None):
+        """The highest-numbered matchday that has started"""
+        i = bisect_right(self._starts, now or timezone.now())
+        return self._latest_started[i - 1] if i else None
+
+    def next(self, now=None):
+        """The lowest-numbered matchday that has not started yet"""
+        i = bisect_right(self._starts, now or timezone.now())
+        return self._earliest_upcoming[i]
+
+    def past(self, now=None):
+        """Matchdays that have ended, in number order"""
+        i = bisect_left(self._ends, now or timezone.now())
+        return sorted(self._by_end[:i], key=lambda md: md.number)
+
+    def future(self, now=None):
+        """Matchdays that have not started, in number order"""
+        i = bisect_right(self._starts, now or timezone.now())
+        return sorted(self._by_start[i:], key=lambda md: md.number)
+
+    def in_progress(self, now=None):
+        """Matchdays that have started but not ended, in number order"""
+        now = now or timezone.now()
+        ended = {md.pk for md in self.past(now)}
+        upcoming = {md.pk for md in self.future(now)}
+        return [md for md in self.matchdays if md.pk not in ended and md.pk not in upcoming]
+
+
+class CalendarRegistry:
+    """Calendars for every season, plus the active season"""
+
+    def __init__(self, seasons, matchdays):
+        self.seasons = {season.pk: season for season in seasons}
+        self.active_season = next((s for s in seasons if s.is_active), None)
+
+        by_season = {pk: [] for pk in self.seasons}
+        for matchday in matchdays:
+            # Share the season instance so str(matchday) needs no query
+            matchday.season = self.seasons[matchday.season_id]
+            by_season[matchday.season_id].append(matchday)
+        self.calendars = {
+            pk: SeasonCalendar(self.seasons[pk], mds) for pk, mds in by_season.items()
+        }
+
+    def for_season(self, season_id):
+        calendar = self.calendars.get(season_id)
+        if calendar is None:
+            # Season created after the last load; an empty calendar is correct
+            # until the next sync bumps the version
+            return SeasonCalendar(None, [])
+        return calendar
+
+
+def _load_calendars():
+    seasons = list(Season.objects.order_by('pk'))
+    matchdays = list(Matchday.objects.order_by('season_id', 'number'))
+    return CalendarRegistry(seasons, matchdays)
+
+
+_calendars = VersionedSnapshot(
+    'calendar',
+    _load_calendars,
+    max_age=getattr(settings, 'CALENDAR_MAX_AGE', 600),
+)
+
+
+def get_calendars():
+    return _calendars.get()
+
+
+def get_season_calendar(season_id):
+    return _calendars.get().for_season(season_id)
+
+
+def get_active_season():
+    return _calendars.get().active_season
+
+
+def invalidate_calendar():
+    """Called by the sync commands after matchday dates or status change"""
+    _calendars.invalidate()
@@ -0,0 +1,74 @@
+# survivor/services/dashboard.py
+"""
+The "My pools" dashboard: every pool a user has joined on one page.
+
+Three queries cover any number of pools: the user's entries with their
+pools, the player counts of those pools in one grouped query, and all of
+the user's picks. Matchdays and teams come from the in-process calendar
+and team registry.
+"""
+from django.db.models import Count, Q
+
+from survivor.models import MAX_PICKS_PER_TEAM, Pick, PlayerEntry
+from survivor.services.calendar import get_season_calendar
+from survivor.services.teams import get_team_registry
+
+
+def get_user_pools(user, now=None):
+    """One dict per entry of `user`, live entries first, in pool name order"""
+    entries = list(
+        PlayerEntry.objects.filter(user=user)
+        .select_related('pool__season')
+        .order_by('is_eliminated', 'pool__name')
+    )
+    if not entries:
+        return []
+
+    counts = {
+        row['pool_id']: row
+        for row in PlayerEntry.objects.filter(pool_id__in=[entry.pool_id for entry in entries])
+        .values('pool_id')
+        .annotate(total=Count('id'), active=Count('id', filter=Q(is_eliminated=False)))
+    }
+
+    picks = {entry.id: [] for entry in entries}
+    for entry_id, matchday_id, team_id in Pick.objects.filter(
+        player_entry__in=entries
+    ).values_list('player_entry_id', 'matchday_id', 'team_id'):
+        picks[entry_id].append((matchday_id, team_id))
+
+    teams = get_team_registry()
+    pools = []
+    for entry in entries:
+        calendar = get_season_calendar(entry.pool.season_id)
+        next_matchday = calendar.next(now)
+        picked = picks[entry.id]
+
+        used = {}
+        for _, team_id in picked:
+            used[team_id] = used.get(team_id, 0) + 1
+        next_pick = None
+        if next_matchday:
+            next_pick = next(
+                (teams.get(team_id) for matchday_id, team_id in picked if matchday_id == next_matchday.id),
+                None,
+            )
+
+        team_usage = [
+            {'team': team, 'used': used.get(team.id, 0),
+             'remaining': max(0, MAX_PICKS_PER_TEAM - used.get(team.id, 0))}
+            for team in teams
+        ]
+        pool_counts = counts.get(entry.pool_id, {'total': 0, 'active': 0})
+        pools.append({
+            'entry': entry,
+            'pool': entry.pool,
+            'eliminated_matchday': entry.eliminated_number or None,
+            'next_matchday': next_matchday,
+            'next_pick': next_pick,
+            'team_usage': team_usage,
+            'picks_left': sum(usage['remaining'] for usage in team_usage),
+            'active_count': pool_counts['active'],
+            'total_count': pool_counts['total'],
+        })
+    return pools
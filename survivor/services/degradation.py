@@ -0,0 +1,228 @@
+# survivor/services/degradation.py
+"""
+Serving the last good render of a page while the database struggles.
+
+Every query's duration feeds a moving average per process. While it is
+above DEGRADED_DB_LATENCY, or for DEGRADED_COOLDOWN seconds after a query
+failed with OperationalError (a lock or statement timeout, say, while
+process_results holds its transaction), views wrapped in @serve_stale
+answer from their last good render with a notice that it may be out of
+date, and one background thread per page renders it afresh. That
+thread's queries keep the average moving, so the pages go live again by
+themselves once the database recovers.
+
+Renders are kept per user and URL, refreshed at most every
+DEGRADED_KEEP_INTERVAL seconds; pages that showed flash messages are not
+kept.
+"""
+import copy
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from . import caching, metrics
+
+logger = logging.getLogger(__name__)
+
+# Where base.html puts the notice on stale pages
+NOTICE_SLOT = b'<!-- stale-notice -->'
+PAGE_PREFIX = 'survivor:stale:'
+KEPT_PREFIX = 'survivor:stale-kept:'
+REVALIDATE_PREFIX = 'survivor:stale-revalidate:'
+
+
+class DatabaseHealth:
+    """Moving average of this process's query times, and when a query last failed"""
+
+    def __init__(self):
+        self.latency = 0.0
+        self.failed_at = None
+
+    def observe(self, seconds):
+        self.latency += settings.DB_LATENCY_EWMA_ALPHA * (seconds - self.latency)
+
+    def fail(self):
+        self.failed_at = time.monotonic()
+
+    def degraded(self):
+        """Why pages should be served stale ('error' or 'slow'), or None"""
+        if self.failed_at is not None and time.monotonic() - self.failed_at < settings.DEGRADED_COOLDOWN:
+            return 'error'
+        if self.latency > settings.DEGRADED_DB_LATENCY:
+            return 'slow'
+        return None
+
+    def reset(self):
+        self.latency = 0.0
+        self.failed_at = None
+
+
+health = DatabaseHealth()
+
+
+def time_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError:
+        health.fail()
+        raise
+    finally:
+        health.observe(time.perf_counter() - started)
+
+
+def watch_connection(sender, connection, **kwargs):
+    """connection_created receiver timing every query on the new connection"""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def page_key(request, view):
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{PAGE_PREFIX}{view.__name__}:{user_id}:{path}'
+
+
+def _page(request, response):
+    """What to keep of a response, or None if it should not be served again"""
+    messages = getattr(request, '_messages', None)
+    if response.status_code != 200 or response.streaming or (messages is not None and messages.used):
+        return None
+    return {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'rendered_at': timezone.now(),
+    }
+
+
+def _stale_response(view, page, reason):
+    metrics.STALE_PAGES.inc(view=view.__name__, reason=reason)
+    notice = render_to_string('partials/stale_notice.html', {'rendered_at': page['rendered_at']})
+    response = HttpResponse(
+        page['content'].replace(NOTICE_SLOT, notice.encode(), 1),
+        content_type=page['content_type'],
+    )
+    response['Age'] = max(0, int((timezone.now() - page['rendered_at']).total_seconds()))
+    response['X-Survivor-Stale'] = reason
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+
+def _revalidate(view, request, key, args, kwargs):
+    """Render the page again in a background thread, unless this process already is"""
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+    threading.Thread(target=_revalidate_in_thread, args=(view, request, key, args, kwargs), daemon=True).start()
+
+
+def _revalidate_in_thread(view, request, key, args, kwargs):
+    try:
+        render_again(view, request, key, args, kwargs)
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(key)
+        connection.close()
+
+
+def render_again(view, request, key, args, kwargs):
+    """Render a page served stale and keep the result, unless another process is already doing so"""
+    lock = REVALIDATE_PREFIX + key
+    if not caching.add(lock, 1, settings.CACHE_LOCK_TIMEOUT):
+        return
+    try:
+        request = copy.copy(request)
+        # Messages added now would never be shown; keep them out of the session
+        request._messages = CookieStorage(request)
+        if iscoroutinefunction(view):
+            response = async_to_sync(view)(request, *args, **kwargs)
+        else:
+            response = view(request, *args, **kwargs)
+    except Exception:
+        metrics.PAGE_REVALIDATIONS.inc(view=view.__name__, outcome='error')
+        logger.warning('Revalidating %s failed', key, exc_info=True)
+    else:
+        page = _page(request, response)
+        if page is not None:
+            cache.set(key, page, settings.DEGRADED_PAGE_TIMEOUT)
+        metrics.PAGE_REVALIDATIONS.inc(view=view.__name__, outcome='ok')
+    finally:
+        cache.delete(lock)
+
+
+def serve_stale(view):
+    """
+    Serve the last good render of a GET page while the database is degraded.
+
+    Works for sync and async views; put it inside login_required, so only
+    users allowed to see the page get its kept render.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await view(request, *args, **kwargs)
+            request.user = await request.auser()
+            key = page_key(request, view)
+            reason = health.degraded()
+            if reason:
+                page = await cache.aget(key)
+                if page is not None:
+                    _revalidate(view, request, key, args, kwargs)
+                    return _stale_response(view, page, reason)
+            try:
+                response = await view(request, *args, **kwargs)
+            except OperationalError:
+                health.fail()
+                page = await cache.aget(key)
+                if page is None:
+                    raise
+                _revalidate(view, request, key, args, kwargs)
+                return _stale_response(view, page, 'error')
+            page = _page(request, response)
+            if page is not None and await cache.aadd(KEPT_PREFIX + key, 1, settings.DEGRADED_KEEP_INTERVAL):
+                await cache.aset(key, page, settings.DEGRADED_PAGE_TIMEOUT)
+            return response
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view(request, *args, **kwargs)
+        key = page_key(request, view)
+        reason = health.degraded()
+        if reason:
+            page = cache.get(key)
+            if page is not None:
+                _revalidate(view, request, key, args, kwargs)
+                return _stale_response(view, page, reason)
+        try:
+            response = view(request, *args, **kwargs)
+        except OperationalError:
+            health.fail()
+            page = cache.get(key)
+            if page is None:
+                raise
+            _revalidate(view, request, key, args, kwargs)
+            return _stale_response(view, page, 'error')
+        page = _page(request, response)
+        if page is not None and cache.add(KEPT_PREFIX + key, 1, settings.DEGRADED_KEEP_INTERVAL):
+            cache.set(key, page, settings.DEGRADED_PAGE_TIMEOUT)
+        return response
+    return wrapper
@@ -0,0 +1,94 @@
+# survivor/services/fixtures.py
+"""
+Pre-serialized fixture grid for the fixtures page.
+
+Each matchday is cached as plain data (dates, teams, scores). Completed
+matchdays rarely change, so their entries are keyed by id alone and kept
+until sync_fixtures changes one of their matches; the others are keyed by
+the calendar version, which the sync commands bump, so they are rebuilt
+after every sync.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from survivor.models import Match
+from survivor.services.versions import get_version
+
+
+def _team_data(team):
+    return {
+        'id': team.id,
+        'name': team.name,
+        'short_name': team.short_name,
+        'color_primary': team.color_primary,
+    }
+
+
+def serialize_matchday(matchday, matches):
+    return {
+        'id': matchday.id,
+        'number': matchday.number,
+        'start_date': matchday.start_date,
+        'end_date': matchday.end_date,
+        'is_complete': matchday.is_complete,
+        'matches': [
+            {
+                'id': match.id,
+                'kickoff': match.kickoff,
+                'home_team': _team_data(match.home_team),
+                'away_team': _team_data(match.away_team),
+                'home_score': match.home_score,
+                'away_score': match.away_score,
+                'result': match.result,
+            }
+            for match in matches
+        ],
+    }
+
+
+def _final_key(matchday_id):
+    return f'fixtures:matchday:{matchday_id}:final'
+
+
+def _cache_key(matchday, version):
+    if matchday.is_complete:
+        return _final_key(matchday.id)
+    return f'fixtures:matchday:{matchday.id}:v{version}'
+
+
+def forget_final_matchday(matchday_id):
+    """Drop the kept entry of a completed matchday whose matches changed"""
+    cache.delete(_final_key(matchday_id))
+
+
+def get_fixture_grid(matchdays):
+    """
+    Return serialized matchdays, in the given order, with their matches.
+
+    Cache misses are filled with a single query for all missing matchdays.
+    """
+    version = get_version('calendar')
+    keys = {matchday.id: _cache_key(matchday, version) for matchday in matchdays}
+    cached = cache.get_many(keys.values())
+
+    missing = [matchday for matchday in matchdays if keys[matchday.id] not in cached]
+    if missing:
+        matches_by_matchday = {matchday.id: [] for matchday in missing}
+        matches = Match.objects.filter(
+            matchday_id__in=matches_by_matchday
+        ).select_related('home_team', 'away_team').order_by('kickoff')
+        for match in matches:
+            matches_by_matchday[match.matchday_id].append(match)
+
+        final, current = {}, {}
+        for matchday in missing:
+            key = keys[matchday.id]
+            data = serialize_matchday(matchday, matches_by_matchday[matchday.id])
+            (final if matchday.is_complete else current)[key] = data
+            cached[key] = data
+        if final:
+            cache.set_many(final, None)
+        if current:
+            cache.set_many(current, settings.FIXTURE_GRID_CACHE_TIMEOUT)
+
+    return [cached[keys[matchday.id]] for matchday in matchdays]
@@ -1,11 +1,18 @@
 # survivor/services/football_api.py
+import json
 import requests
+import re
 import time
+import unicodedata
+from collections import Counter
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.core.cache import cache
 import logging
 
+from . import caching, metrics
+from .versions import VersionedSnapshot
+
 logger = logging.getLogger(__name__)
 
 class FootballDataAPI:
@@ -18,6 +25,8 @@ class FootballDataAPI:
             'X-Auth-Token': self.api_key
         }
         self.competition_id = 2002  # Bundesliga ID
+        # Set to a dict to keep every response, keyed by endpoint (see RecordedFootballDataAPI)
+        self.recording = None
         
     def _make_request(self, endpoint, params=None):
         """Make API request with rate limiting and error handling"""
@@ -26,43 +35,59 @@ class FootballDataAPI:
         self._check_rate_limit()
         
         url = f"{self.base_url}/{endpoint}"
+        # Collapse ids so metrics have one series per endpoint
+        endpoint_label = re.sub(r'\d+', '{id}', endpoint)
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            with metrics.API_LATENCY.time(endpoint=endpoint_label):
+                response = requests.get(url, headers=self.headers, params=params)
             
-            # Record this request for rate limiting
-            self._record_request()
+            metrics.API_REQUESTS.inc(endpoint=endpoint_label, status=response.status_code)
             
             if response.status_code == 200:
-                return response.json()
+                data = response.json()
+                if self.recording is not None:
+                    self.recording[endpoint] = data
+                return data
             elif response.status_code == 429:
                 logger.warning("Rate limit exceeded, waiting...")
-                time.sleep(60)  # Wait a minute
+                metrics.API_RATE_LIMITED.inc(endpoint=endpoint_label)
+                self._wait(60, reason='http_429')  # Wait a minute
                 return self._make_request(endpoint, params)  # Retry
             else:
                 logger.error(f"API request failed: {response.status_code} - {response.text}")
                 return None
                 
         except requests.exceptions.RequestException as e:
+            metrics.API_REQUESTS.inc(endpoint=endpoint_label, status='error')
             logger.error(f"Request failed: {e}")
             return None
     
+    def _wait(self, seconds, reason):
+        """Sleep for rate limiting and record the wait"""
+        metrics.RATE_LIMIT_WAITS.inc(reason=reason)
+        metrics.RATE_LIMIT_WAIT_SECONDS.inc(seconds, reason=reason)
+        time.sleep(seconds)
+    
     def _check_rate_limit(self):
-        """Simple rate limiting using Django cache"""
-        cache_key = 'api_requests_count'
-        count = cache.get(cache_key, 0)
-        
-        if count >= settings.API_RATE_LIMIT:
-            # Wait until rate limit resets
+        """
+        Count this request against API_RATE_LIMIT per API_RATE_PERIOD, waiting
+        for the next window when it is used up.
+
+        The count is kept in the shared cache, so every process and command
+        making requests draws from the same allowance.
+        """
+        period = settings.API_RATE_PERIOD
+        while True:
+            window = int(time.time() // period)
+            if caching.incr(f'api_requests:{window}', period) <= settings.API_RATE_LIMIT:
+                return
+            # incr() may have waited on the file lock; the window can be over already
+            remaining = (window + 1) * period - time.time()
+            if remaining <= 0:
+                continue
             logger.info("Rate limit reached, waiting...")
-            time.sleep(60)
-            cache.set(cache_key, 0, settings.API_RATE_PERIOD)
-    
-    def _record_request(self):
-        """Record API request for rate limiting"""
-        cache_key = 'api_requests_count'
-        count = cache.get(cache_key, 0)
-        cache.set(cache_key, count + 1, settings.API_RATE_PERIOD)
+            self._wait(remaining, reason='local_limit')
     
     def get_teams(self):
         """Get all teams in Bundesliga"""
@@ -113,43 +138,130 @@ class FootballDataAPI:
         return self._make_request(endpoint)
 
 
+class RecordedFootballDataAPI(FootballDataAPI):
+    """
+    Replays responses saved from FootballDataAPI.recording, without network
+    access or rate limiting. Used by `sync_fixtures --from-file` and the
+    benchmarks.
+    """
+    
+    def __init__(self, path):
+        super().__init__()
+        with open(path) as f:
+            self.responses = json.load(f)
+    
+    def _make_request(self, endpoint, params=None):
+        data = self.responses.get(endpoint)
+        if data is None:
+            logger.error(f"No recorded response for {endpoint}")
+            return None
+        
+        matchday = (params or {}).get('matchday')
+        if matchday and 'matches' in data:
+            data = {**data, 'matches': [m for m in data['matches'] if m['matchday'] == matchday]}
+        return data
+
+
+# Words that only describe the club form ("FC", "SV", ...) and differ between sources
+CLUB_FORM_WORDS = {'fc', 'fsv', 'sc', 'sv', 'tsg', 'vfl', 'vfb', 'bv', 'ssv', 'bsc', 'spvgg', 'sport-club'}
+
+
+def normalize_team_name(name):
+    """
+    Reduce a team name to a comparable key.
+
+    Strips accents, ordinal prefixes ("1. FC"), club-form words and numbers
+    such as founding years, so "1. FC Heidenheim 1846" and "FC Heidenheim"
+    both become "heidenheim".
+    """
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode().lower()
+    name = re.sub(r'^\d+\.\s*', '', name)
+    words = [
+        word for word in re.split(r'[\s.]+', name)
+        if word and word not in CLUB_FORM_WORDS and not word.isdigit()
+    ]
+    return ' '.join(words)
+
+
+class _AliasIndex:
+    """Forward, normalized and reverse lookups built from TeamAlias and Team"""
+
+    def __init__(self, aliases, team_names):
+        self.forward = {}
+        self.reverse = {}
+        self.colors = {}
+        normalized = {}
+
+        def add_normalized(name, team_name):
+            key = normalize_team_name(name)
+            if key:
+                normalized.setdefault(key, set()).add(team_name)
+
+        for alias in aliases:
+            self.forward[alias.name] = alias.team_name
+            if alias.is_api_name:
+                self.reverse.setdefault(alias.team_name, alias.name)
+            if alias.color_primary:
+                self.colors[alias.name] = {
+                    'primary': alias.color_primary,
+                    'secondary': alias.color_secondary or '#FFFFFF',
+                }
+            add_normalized(alias.name, alias.team_name)
+            add_normalized(alias.team_name, alias.team_name)
+        for team_name in team_names:
+            add_normalized(team_name, team_name)
+
+        # Keys shared by two different teams are ambiguous and left out
+        self.normalized = {
+            key: team_names.pop() for key, team_names in normalized.items() if len(team_names) == 1
+        }
+
+
+def _load_alias_index():
+    from survivor.models import Team, TeamAlias
+
+    return _AliasIndex(
+        list(TeamAlias.objects.all()),
+        list(Team.objects.values_list('name', flat=True))
+    )
+
+
 class TeamMapper:
-    """Maps API team names to our database team names"""
-    
-    # Mapping between football-data.org names and our database names
-    # You might need to adjust these based on exact API responses
-    TEAM_MAPPINGS = {
-        'FC Bayern München': 'Bayern Munich',
-        'Borussia Dortmund': 'Borussia Dortmund',
-        'Bayer 04 Leverkusen': 'Bayer Leverkusen',
-        'RB Leipzig': 'RB Leipzig',
-        '1. FC Union Berlin': 'Union Berlin',
-        'Sport-Club Freiburg': 'SC Freiburg',
-        'Eintracht Frankfurt': 'Eintracht Frankfurt',
-        'VfL Wolfsburg': 'VfL Wolfsburg',
-        '1. FSV Mainz 05': 'Mainz 05',
-        'Borussia Mönchengladbach': 'Borussia Mönchengladbach',
-        '1. FC Köln': 'FC Köln',
-        'TSG 1899 Hoffenheim': 'Hoffenheim',
-        'SV Werder Bremen': 'Werder Bremen',
-        'FC Augsburg': 'FC Augsburg',
-        'VfB Stuttgart': 'VfB Stuttgart',
-        'VfL Bochum 1848': 'VfL Bochum',
-        '1. FC Heidenheim 1846': 'FC Heidenheim',
-        'SV Darmstadt 98': 'SV Darmstadt 98',
-        # Add any new teams or adjust as needed
-    }
+    """Maps API team names to our database team names using the TeamAlias table"""
+    
+    # Shares the 'teams' version so sync_teams and load_teams reload it too
+    _index = VersionedSnapshot('teams', _load_alias_index)
+    
+    # Names that could not be mapped in this process, with how often they were seen
+    misses = Counter()
     
     @classmethod
     def get_team_name(cls, api_name):
         """Convert API team name to our database team name"""
-        return cls.TEAM_MAPPINGS.get(api_name, api_name)
+        index = cls._index.get()
+        if api_name in index.forward:
+            return index.forward[api_name]
+        
+        team_name = index.normalized.get(normalize_team_name(api_name))
+        if team_name is not None:
+            return team_name
+        
+        cls.misses[api_name] += 1
+        metrics.TEAM_MAPPING_MISSES.inc()
+        logger.warning(f"No team mapping for '{api_name}'")
+        return api_name
     
     @classmethod
     def get_api_name(cls, db_name):
         """Convert our database team name to API team name"""
-        # Reverse mapping
-        for api_name, mapped_name in cls.TEAM_MAPPINGS.items():
-            if mapped_name == db_name:
-                return api_name
-        return db_name
\ No newline at end of file
+        return cls._index.get().reverse.get(db_name, db_name)
+    
+    @classmethod
+    def get_colors(cls, api_name):
+        """Colours to use when creating a team, or None if unknown"""
+        return cls._index.get().colors.get(api_name)
+    
+    @classmethod
+    def clear(cls):
+        """Drop this process's copy of the index"""
+        cls._index.clear()
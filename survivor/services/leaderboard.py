@@ -0,0 +1,177 @@
+# survivor/services/leaderboard.py
+"""
+The global leaderboard across all pools.
+
+One LeaderboardEntry row per user holds the pools entered, the matchdays
+survived (successful picks in any pool) and the best final position in a
+pool. The rows are adjusted in place as players join pools and results
+are processed, so reading the leaderboard never touches PlayerEntry or
+Pick; rebuild_leaderboard recomputes everything from scratch.
+
+A player eliminated in a matchday finishes one place behind the entries
+still alive once it completes, level with everyone else knocked out in it.
+The last entry standing in a pool, or every entry alive at the end of the
+season, finishes first. A rebuild cannot tell when an entry joined, so it
+counts late joiners as alive in matchdays they missed.
+
+Pages are read with a keyset cursor on (matchdays survived, user id)
+rather than an offset, so page 500 is one index range scan like page 1.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+
+from survivor.models import LeaderboardEntry, Matchday, Pick, PlayerEntry
+
+PAGE_SIZE = 50
+
+
+def _ensure_rows(user_ids):
+    LeaderboardEntry.objects.bulk_create(
+        [LeaderboardEntry(user_id=user_id) for user_id in user_ids],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def _add(field, counts):
+    """Add counts {user id: n} to a field, one UPDATE per distinct n"""
+    by_amount = defaultdict(list)
+    for user_id, n in counts.items():
+        by_amount[n].append(user_id)
+    for n, user_ids in by_amount.items():
+        LeaderboardEntry.objects.filter(user_id__in=user_ids).update(**{field: F(field) + n})
+
+
+def record_join(user):
+    """Count a newly created PlayerEntry"""
+    _ensure_rows([user.id])
+    _add('pools_entered', {user.id: 1})
+
+
+def record_survivals(user_ids):
+    """Count one survived matchday per successful pick; user_ids may repeat"""
+    counts = Counter(user_ids)
+    _ensure_rows(counts)
+    _add('matchdays_survived', counts)
+    return len(counts)
+
+
+def _matchday_finishes(matchday, is_last):
+    """{user id: best position} decided by the completion of `matchday`"""
+    entries = PlayerEntry.objects.filter(pool__season_id=matchday.season_id)
+    alive = dict(
+        entries.filter(Q(is_eliminated=False) | Q(eliminated_matchday__number__gt=matchday.number))
+        .values('pool_id').annotate(n=Count('id')).values_list('pool_id', 'n')
+    )
+
+    finishes = {}
+
+    def place(user_id, position):
+        finishes[user_id] = min(position, finishes.get(user_id, position))
+
+    for user_id, pool_id in entries.filter(eliminated_matchday=matchday).values_list('user_id', 'pool_id'):
+        place(user_id, alive.get(pool_id, 0) + 1)
+
+    if is_last:
+        winners = entries.filter(is_eliminated=False)
+    else:
+        winners = entries.filter(
+            is_eliminated=False, pool_id__in=[pool_id for pool_id, n in alive.items() if n == 1]
+        )
+    for user_id in winners.values_list('user_id', flat=True):
+        place(user_id, 1)
+    return finishes
+
+
+def _apply_finishes(finishes):
+    by_position = defaultdict(list)
+    for user_id, position in finishes.items():
+        by_position[position].append(user_id)
+    for position, user_ids in by_position.items():
+        LeaderboardEntry.objects.filter(
+            Q(best_finish__isnull=True) | Q(best_finish__gt=position), user_id__in=user_ids
+        ).update(best_finish=Value(position))
+
+
+def record_matchday_finishes(matchday):
+    """Update best finishes once `matchday` is complete"""
+    is_last = not Matchday.objects.filter(season_id=matchday.season_id, number__gt=matchday.number).exists()
+    finishes = _matchday_finishes(matchday, is_last)
+    _ensure_rows(finishes)
+    _apply_finishes(finishes)
+    return len(finishes)
+
+
+def rebuild_leaderboard():
+    """Recompute every row from the entries and picks; returns the row count"""
+    pools_entered = dict(
+        PlayerEntry.objects.values('user_id').annotate(n=Count('id')).values_list('user_id', 'n')
+    )
+    survived = dict(
+        Pick.objects.filter(is_successful=True)
+        .values('player_entry__user_id').annotate(n=Count('id'))
+        .values_list('player_entry__user_id', 'n')
+    )
+
+    finishes = {}
+    for matchday in Matchday.objects.filter(is_complete=True).order_by('season_id', 'number'):
+        is_last = not Matchday.objects.filter(season_id=matchday.season_id, number__gt=matchday.number).exists()
+        for user_id, position in _matchday_finishes(matchday, is_last).items():
+            finishes[user_id] = min(position, finishes.get(user_id, position))
+
+    # Readers see the old rows until the new ones are all in
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(
+            [
+                LeaderboardEntry(
+                    user_id=user_id,
+                    pools_entered=pools_entered.get(user_id, 0),
+                    matchdays_survived=survived.get(user_id, 0),
+                    best_finish=finishes.get(user_id),
+                )
+                for user_id in pools_entered.keys() | survived.keys() | finishes.keys()
+            ],
+            batch_size=1000,
+        )
+    return LeaderboardEntry.objects.count()
+
+
+def encode_cursor(row, position):
+    return f'{row.matchdays_survived}.{row.user_id}.{position}'
+
+
+def decode_cursor(cursor):
+    """(matchdays survived, user id, position) of the last row shown, or None"""
+    try:
+        survived, user_id, position = (int(part) for part in cursor.split('.'))
+    except (AttributeError, ValueError):
+        return None
+    return survived, user_id, position
+
+
+def leaderboard_page(after=None, size=PAGE_SIZE):
+    """
+    Return (rows, next cursor) for the page after `after`.
+
+    Each row gets a `position`; the cursor carries the last one shown, so
+    positions stay right without counting the rows before the page.
+    """
+    rows = LeaderboardEntry.objects.select_related('user').order_by('-matchdays_survived', 'user_id')
+    position = 0
+    cursor = decode_cursor(after) if after else None
+    if cursor:
+        survived, user_id, position = cursor
+        rows = rows.filter(
+            Q(matchdays_survived__lt=survived) | Q(matchdays_survived=survived, user_id__gt=user_id)
+        )
+    rows = list(rows[:size + 1])
+    has_more = len(rows) > size
+    rows = rows[:size]
+    for row in rows:
+        position += 1
+        row.position = position
+    next_cursor = encode_cursor(rows[-1], position) if has_more else None
+    return rows, next_cursor
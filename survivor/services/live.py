@@ -0,0 +1,192 @@
+# survivor/services/live.py
+"""
+Live score updates and eliminations.
+
+sync_fixtures and process_results write LiveEvent rows as they change
+matches and entries. Every web process runs one LiveEventBroker: while
+anyone is listening it polls for rows with a higher id than the last one
+seen (a primary key range scan, usually empty) and copies each event into
+the queues of the streams it belongs to. An idle listener is one queue,
+so thousands of open streams cost one query per poll interval per process.
+
+Ids are handed out on insert, not on commit, so when two commands publish
+at once a row can become visible after one with a higher id. Each poll
+also looks again at the rows created in the last LIVE_EVENTS_RESCAN
+seconds and sends the ones it has not sent yet.
+
+Streams are named 'pool:<id>', 'matchday:<id>' and 'season:<id>'; pool
+events only go to their pool, match events to their matchday and season.
+"""
+import asyncio
+import json
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from survivor.models import LiveEvent
+
+# Most events a single poll hands out; the rest come with the next one
+POLL_BATCH = 500
+# Queued events per listener before a slow one starts missing them
+QUEUE_SIZE = 100
+
+
+def score_event(match):
+    return LiveEvent(
+        kind='score',
+        season_id=match.matchday.season_id,
+        matchday=match.matchday,
+        payload={
+            'match': match.id,
+            'home_team': match.home_team.short_name,
+            'away_team': match.away_team.short_name,
+            'home_score': match.home_score,
+            'away_score': match.away_score,
+            'result': match.result,
+        },
+    )
+
+
+def elimination_event(matchday, pool_id, eliminated, alive):
+    return LiveEvent(
+        kind='elimination',
+        season_id=matchday.season_id,
+        matchday=matchday,
+        pool_id=pool_id,
+        payload={'matchday': matchday.number, 'eliminated': sorted(eliminated), 'alive': alive},
+    )
+
+
+def matchday_complete_event(matchday):
+    return LiveEvent(
+        kind='matchday_complete',
+        season_id=matchday.season_id,
+        matchday=matchday,
+        payload={'matchday': matchday.number},
+    )
+
+
+def publish(events):
+    """Write events for the brokers to pick up; returns how many"""
+    LiveEvent.objects.bulk_create(events, batch_size=500)
+    return len(events)
+
+
+def prune_live_events(now=None):
+    """Delete events older than LIVE_EVENTS_RETENTION; listeners only need recent ones"""
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.LIVE_EVENTS_RETENTION)
+    deleted, _ = LiveEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def event_streams(event):
+    if event.pool_id:
+        return [f'pool:{event.pool_id}']
+    return [f'matchday:{event.matchday_id}', f'season:{event.season_id}']
+
+
+def stream_filter(stream):
+    """Q matching the events of one stream, for replays"""
+    kind, pk = stream.split(':')
+    if kind == 'pool':
+        return Q(pool_id=int(pk))
+    return Q(pool__isnull=True, **{f'{kind}_id': int(pk)})
+
+
+def format_event(event):
+    """The event in text/event-stream format"""
+    return f'id: {event.id}\nevent: {event.kind}\ndata: {json.dumps(event.payload)}\n\n'
+
+
+def latest_event_id():
+    close_old_connections()
+    return LiveEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def events_after(last_id, streams=None):
+    """Events with an id above last_id, oldest first, optionally of some streams only"""
+    close_old_connections()
+    events = LiveEvent.objects.filter(id__gt=last_id)
+    if streams:
+        condition = Q()
+        for stream in streams:
+            condition |= stream_filter(stream)
+        events = events.filter(condition)
+    return list(events.order_by('id')[:POLL_BATCH])
+
+
+def unsent_events(last_id, since, sent):
+    """Events above last_id, and those created at `since` or later that are not in `sent`, oldest first"""
+    close_old_connections()
+    events = LiveEvent.objects.filter(Q(id__gt=last_id) | Q(created_at__gte=since)).exclude(id__in=sent)
+    return list(events.order_by('id')[:POLL_BATCH])
+
+
+def recent_events(since, last_id):
+    """{id: created_at} of the events up to last_id created at `since` or later"""
+    close_old_connections()
+    events = LiveEvent.objects.filter(id__lte=last_id, created_at__gte=since)
+    return dict(events.values_list('id', 'created_at'))
+
+
+def rescan_since():
+    return timezone.now() - timedelta(seconds=settings.LIVE_EVENTS_RESCAN)
+
+
+class LiveEventBroker:
+    """Polls for new events while anyone listens and fans them out to queues"""
+
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval
+        self.queues = defaultdict(set)  # stream -> listener queues
+        self.last_id = 0
+        # id -> created_at of the events sent that a rescan still covers
+        self.sent = {}
+        self.task = None
+
+    def subscribe(self, streams):
+        queue = asyncio.Queue(QUEUE_SIZE)
+        for stream in streams:
+            self.queues[stream].add(queue)
+        if self.task is None or self.task.done() or self.task.get_loop() is not asyncio.get_running_loop():
+            self.task = asyncio.ensure_future(self._poll())
+        return queue
+
+    def unsubscribe(self, queue, streams):
+        for stream in streams:
+            listeners = self.queues.get(stream)
+            if listeners is not None:
+                listeners.discard(queue)
+                if not listeners:
+                    del self.queues[stream]
+
+    def dispatch(self, events):
+        for event in events:
+            self.last_id = max(self.last_id, event.id)
+            self.sent[event.id] = event.created_at
+            for stream in event_streams(event):
+                for queue in self.queues.get(stream, ()):
+                    try:
+                        queue.put_nowait(event)
+                    except asyncio.QueueFull:
+                        pass
+
+    async def _poll(self):
+        # Start from the newest event; listeners replay older ones themselves
+        # from their Last-Event-ID
+        self.last_id = await sync_to_async(latest_event_id)()
+        self.sent = await sync_to_async(recent_events)(rescan_since(), self.last_id)
+        interval = self.poll_interval or settings.LIVE_EVENTS_POLL_INTERVAL
+        while self.queues:
+            since = rescan_since()
+            self.sent = {pk: created_at for pk, created_at in self.sent.items() if created_at >= since}
+            self.dispatch(await sync_to_async(unsent_events)(self.last_id, since, list(self.sent)))
+            await asyncio.sleep(interval)
+
+
+broker = LiveEventBroker()
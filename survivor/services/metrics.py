@@ -0,0 +1,415 @@
+# survivor/services/metrics.py
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Every process (gunicorn worker or management command) keeps its counters and
+histograms in memory and periodically writes a snapshot to METRICS_DIR, one
+JSON file per process. The /metrics endpoint merges all snapshots so the numbers
+cover every worker, plus the batch jobs started from cron or the admin dashboard.
+
+A process that exits folds its snapshot into metrics-retired.json, and the
+files of processes that died without doing so are folded in when /metrics is
+scraped, so the directory holds one file per live process and the totals
+never go backwards. File names carry the process start time as well as the
+pid, so a new process that gets an old pid starts a file of its own.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import locks
+
+RETIRED_FILE = 'metrics-retired.json'
+LOCK_FILE = 'metrics.lock'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _label_key(labelnames, labels):
+    """Order label values by the metric's declared label names"""
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels"""
+
+    type = 'counter'
+
+    def __init__(self, registry, name, help_text, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+            self.registry.dirty = True
+
+    def snapshot(self):
+        return [[list(key), value] for key, value in self.values.items()]
+
+
+class Histogram:
+    """Cumulative histogram of observed values, optionally split by labels"""
+
+    type = 'histogram'
+
+    def __init__(self, registry, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self.registry.lock:
+            state = self.values.get(key)
+            if state is None:
+                # One slot per bucket plus +Inf, then sum
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+            self.registry.dirty = True
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self):
+        return [[list(key), list(state)] for key, state in self.values.items()]
+
+
+class MetricsRegistry:
+    """Holds this process's metrics and merges snapshots from other processes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.dirty = False
+        self.last_flush = 0.0
+        self.started = time.time_ns()
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def reset(self):
+        """Drop all recorded values (used by tests)"""
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.values.clear()
+            self.dirty = False
+
+    # Cross-process aggregation
+
+    def _directory(self):
+        return getattr(settings, 'METRICS_DIR', None) or os.path.join(
+            tempfile.gettempdir(), 'survivor_metrics'
+        )
+
+    def _snapshot(self):
+        with self.lock:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def _own_file(self):
+        return f'metrics-{os.getpid()}-{self.started}.json'
+
+    @contextmanager
+    def _directory_lock(self, directory):
+        """Keep other processes from folding files while this one reads or folds them"""
+        with open(os.path.join(directory, LOCK_FILE), 'a') as f:
+            locks.lock(f, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(f)
+
+    def flush(self, force=False):
+        """Write this process's snapshot if it changed and the flush interval elapsed"""
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        now = time.monotonic()
+        if not self.dirty or (not force and now - self.last_flush < interval):
+            return
+        self.dirty = False
+        self.last_flush = now
+
+        directory = self._directory()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            _write_json(os.path.join(directory, self._own_file()), self._snapshot())
+        except OSError:
+            # Metrics must never take a request down with them
+            self.dirty = True
+
+    def retire(self):
+        """Fold this process's numbers into the retired totals as it exits"""
+        directory = self._directory()
+        path = os.path.join(directory, self._own_file())
+        if not self.dirty and not os.path.exists(path):
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with self._directory_lock(directory):
+                retired = _read_json(os.path.join(directory, RETIRED_FILE)) or {}
+                _write_json(
+                    os.path.join(directory, RETIRED_FILE),
+                    _as_snapshot(_merge([retired, self._snapshot()])),
+                )
+                if os.path.exists(path):
+                    os.remove(path)
+            self.dirty = False
+        except OSError:
+            pass
+
+    def collect(self):
+        """Merge the live snapshot of this process with the files of all others"""
+        directory = self._directory()
+        snapshots = [self._snapshot()]
+        try:
+            with self._directory_lock(directory):
+                snapshots += self._read_directory(directory)
+        except OSError:
+            pass
+
+        merged = _merge(snapshots)
+        return {name: merged.get(name, {}) for name in self.metrics}
+
+    def _read_directory(self, directory):
+        """Snapshots of the other processes, after folding those of dead ones into the retired totals"""
+        live, dead = [], []
+        for filename in os.listdir(directory):
+            pid = _file_pid(filename)
+            if pid is None or filename == self._own_file():
+                continue
+            (live if _is_running(pid) else dead).append(filename)
+
+        retired = _read_json(os.path.join(directory, RETIRED_FILE)) or {}
+        if dead:
+            snapshots = [retired] + [_read_json(os.path.join(directory, filename)) or {} for filename in dead]
+            retired = _as_snapshot(_merge(snapshots))
+            _write_json(os.path.join(directory, RETIRED_FILE), retired)
+            for filename in dead:
+                os.remove(os.path.join(directory, filename))
+
+        snapshots = [retired]
+        for filename in live:
+            snapshot = _read_json(os.path.join(directory, filename))
+            if snapshot is not None:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, samples in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for key in sorted(samples):
+                value = samples[key]
+                labels = list(zip(metric.labelnames, key))
+                if metric.type == 'counter':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float('inf'),), value[:-1]):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else _format_value(bound)
+                    lines.append(
+                        f'{name}_bucket{_format_labels(labels + [("le", le)])} {cumulative}'
+                    )
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _merge(snapshots):
+    """Add up snapshots into {metric name: {label values: value}}"""
+    merged = {}
+    for snapshot in snapshots:
+        for name, samples in snapshot.items():
+            target = merged.setdefault(name, {})
+            for key, value in samples:
+                key = tuple(key)
+                if isinstance(value, list):
+                    current = target.setdefault(key, [0] * len(value))
+                    target[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target[key] = target.get(key, 0) + value
+    return merged
+
+
+def _as_snapshot(merged):
+    return {name: [[list(key), value] for key, value in samples.items()] for name, samples in merged.items()}
+
+
+def _file_pid(filename):
+    """The pid in a snapshot file name (metrics-<pid>-<start>.json), or None for other files"""
+    if not filename.startswith('metrics-') or not filename.endswith('.json'):
+        return None
+    pid = filename[len('metrics-'):-len('.json')].split('-')[0]
+    return int(pid) if pid.isdecimal() else None
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running under another user
+        return True
+    return True
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+registry = MetricsRegistry()
+atexit.register(registry.retire)
+
+# Web requests
+VIEW_LATENCY = registry.histogram(
+    'survivor_view_duration_seconds',
+    'Time spent handling a request, by resolved view',
+    ['view', 'method', 'status'],
+)
+
+# Shared cache
+CACHE_LOOKUPS = registry.counter(
+    'survivor_cache_lookups_total',
+    'get_or_compute lookups: hit, early (refreshed before expiry), miss, '
+    'or shared (served while another request recomputed)',
+    ['outcome'],
+)
+
+# Degradation (services/degradation.py)
+STALE_PAGES = registry.counter(
+    'survivor_stale_pages_total',
+    'Last good renders served because the database was slow or failing',
+    ['view', 'reason'],
+)
+PAGE_REVALIDATIONS = registry.counter(
+    'survivor_page_revalidations_total',
+    'Background renders of pages served stale, by outcome',
+    ['view', 'outcome'],
+)
+
+# football-data.org client
+API_REQUESTS = registry.counter(
+    'survivor_api_requests_total',
+    'Requests made to football-data.org, by endpoint and HTTP status',
+    ['endpoint', 'status'],
+)
+API_LATENCY = registry.histogram(
+    'survivor_api_request_duration_seconds',
+    'Latency of football-data.org requests',
+    ['endpoint'],
+)
+API_RATE_LIMITED = registry.counter(
+    'survivor_api_rate_limited_total',
+    'HTTP 429 responses returned by football-data.org',
+    ['endpoint'],
+)
+RATE_LIMIT_WAITS = registry.counter(
+    'survivor_api_rate_limit_waits_total',
+    'Times the API client slept because of rate limiting',
+    ['reason'],
+)
+RATE_LIMIT_WAIT_SECONDS = registry.counter(
+    'survivor_api_rate_limit_wait_seconds_total',
+    'Seconds the API client spent sleeping because of rate limiting',
+    ['reason'],
+)
+TEAM_MAPPING_MISSES = registry.counter(
+    'survivor_team_mapping_misses_total',
+    'API team names that matched no alias or team',
+)
+
+# Batch jobs
+COMMAND_DURATION = registry.histogram(
+    'survivor_command_duration_seconds',
+    'Wall time of management commands',
+    ['command'],
+)
+COMMAND_ROWS = registry.counter(
+    'survivor_command_rows_total',
+    'Rows touched by management commands, by operation',
+    ['command', 'operation'],
+)
+
+
+class CommandTracker:
+    """Collects row counts for one management command run"""
+
+    def __init__(self, command):
+        self.command = command
+
+    def rows(self, operation, count=1):
+        if count:
+            COMMAND_ROWS.inc(count, command=self.command, operation=operation)
+
+
+@contextmanager
+def track_command(command):
+    """Time a management command and flush its metrics when it finishes"""
+    tracker = CommandTracker(command)
+    try:
+        with COMMAND_DURATION.time(command=command):
+            yield tracker
+    finally:
+        registry.flush(force=True)
@@ -0,0 +1,171 @@
+# survivor/services/pick_cube.py
+"""
+Season-wide pick counts as a (pool x matchday x team) cube.
+
+Each matchday's slice is copied from PickDistribution when its picks lock
+(rebuild_pick_distribution marks it final), so the cube grows one matchday
+at a time and never reads Pick. It is stored as a compressed NPZ blob on
+PickCube and kept decoded in each process until the 'pick_cube' version
+changes. Slices such as one team across the season or one pool's heatmap
+are plain array indexing.
+"""
+import io
+
+import numpy as np
+from django.db import transaction
+
+from survivor.models import PickCube, PickDistribution
+from survivor.services.versions import VersionedSnapshot
+
+
+class SeasonCube:
+    """Locked pick counts; matchday N is index N - 1 of the middle axis"""
+
+    def __init__(self, counts, pool_ids, team_ids, final):
+        self.counts = counts
+        self.pool_ids = [int(pool_id) for pool_id in pool_ids]
+        self.team_ids = [int(team_id) for team_id in team_ids]
+        self.final = final
+        self.pool_index = {pool_id: i for i, pool_id in enumerate(self.pool_ids)}
+        self.team_index = {team_id: i for i, team_id in enumerate(self.team_ids)}
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 0, 0), dtype=np.int32), [], [], np.zeros(0, dtype=bool))
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(bytes(data))) as arrays:
+            return cls(arrays['counts'], arrays['pool_ids'], arrays['team_ids'], arrays['final'])
+
+    def to_bytes(self, pool_id=None):
+        """NPZ of the cube, or of a single pool's slice of it"""
+        counts, pool_ids = self.counts, self.pool_ids
+        if pool_id is not None:
+            counts, pool_ids = self.heatmap(pool_id)[None], [pool_id]
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            counts=counts,
+            pool_ids=np.array(pool_ids, dtype=np.int64),
+            team_ids=np.array(self.team_ids, dtype=np.int64),
+            final=self.final,
+        )
+        return buffer.getvalue()
+
+    @property
+    def matchday_numbers(self):
+        """Numbers of the matchdays whose picks are in the cube"""
+        return [int(i) + 1 for i in np.flatnonzero(self.final)]
+
+    def _grow(self, pool_ids=(), team_ids=(), matchdays=0):
+        new_pools = [pool_id for pool_id in dict.fromkeys(pool_ids) if pool_id not in self.pool_index]
+        new_teams = [team_id for team_id in dict.fromkeys(team_ids) if team_id not in self.team_index]
+        extra_days = max(0, matchdays - self.counts.shape[1])
+        if not (new_pools or new_teams or extra_days):
+            return
+        self.counts = np.pad(self.counts, ((0, len(new_pools)), (0, extra_days), (0, len(new_teams))))
+        self.final = np.pad(self.final, (0, extra_days))
+        for pool_id in new_pools:
+            self.pool_index[pool_id] = len(self.pool_ids)
+            self.pool_ids.append(pool_id)
+        for team_id in new_teams:
+            self.team_index[team_id] = len(self.team_ids)
+            self.team_ids.append(team_id)
+
+    def set_matchday(self, number, rows):
+        """Replace matchday `number` with (pool id, team id, count) rows"""
+        rows = list(rows)
+        self._grow([row[0] for row in rows], [row[1] for row in rows], number)
+        day = number - 1
+        self.counts[:, day, :] = 0
+        for pool_id, team_id, count in rows:
+            self.counts[self.pool_index[pool_id], day, self.team_index[team_id]] = count
+        self.final[day] = True
+
+    def heatmap(self, pool_id=None):
+        """(matchday x team) counts for one pool, or summed over all pools"""
+        if pool_id is None:
+            return self.counts.sum(axis=0)
+        if pool_id not in self.pool_index:
+            return np.zeros(self.counts.shape[1:], dtype=self.counts.dtype)
+        return self.counts[self.pool_index[pool_id]]
+
+    def team_series(self, team_id, pool_id=None):
+        """Counts of a team's picks per matchday, for one pool or all of them"""
+        if team_id not in self.team_index:
+            return np.zeros(self.counts.shape[1], dtype=self.counts.dtype)
+        return self.heatmap(pool_id)[:, self.team_index[team_id]]
+
+    def cells(self, pool_id=None):
+        """(pool id, matchday number, team id, count) for every non-zero cell"""
+        counts = self.counts if pool_id is None else self.heatmap(pool_id)[None]
+        pool_ids = self.pool_ids if pool_id is None else [pool_id]
+        for p, d, t in zip(*np.nonzero(counts)):
+            yield pool_ids[p], int(d) + 1, self.team_ids[t], int(counts[p, d, t])
+
+
+def _distribution_rows(matchday_ids):
+    return PickDistribution.objects.filter(
+        matchday_id__in=matchday_ids, pool__isnull=False
+    ).values_list('matchday__number', 'pool_id', 'team_id', 'count')
+
+
+def _save(season_id, cube):
+    PickCube.objects.update_or_create(season_id=season_id, defaults={'data': cube.to_bytes()})
+    # Other processes must not reload the cube before it is committed
+    transaction.on_commit(_cubes.invalidate)
+
+
+def _load(season_id, for_update=False):
+    cubes = PickCube.objects.filter(season_id=season_id)
+    if for_update:
+        cubes = cubes.select_for_update()
+    stored = cubes.values_list('data', flat=True).first()
+    return SeasonCube.from_bytes(stored) if stored is not None else SeasonCube.empty()
+
+
+def update_pick_cube(matchday):
+    """
+    Copy a locked matchday's distribution into its season's cube.
+
+    The cube row is locked while its blob is read, changed and written back,
+    so concurrent updates (from process_results and from a page view
+    finalizing a distribution) each see the other's slice.
+    """
+    with transaction.atomic():
+        # Make sure there is a row to lock
+        PickCube.objects.get_or_create(
+            season_id=matchday.season_id, defaults={'data': SeasonCube.empty().to_bytes()}
+        )
+        cube = _load(matchday.season_id, for_update=True)
+        rows = [(pool_id, team_id, count) for _, pool_id, team_id, count in _distribution_rows([matchday.id])]
+        cube.set_matchday(matchday.number, rows)
+        _save(matchday.season_id, cube)
+    return cube
+
+
+def rebuild_pick_cube(season):
+    """Rebuild a season's cube from every final matchday distribution"""
+    matchdays = list(season.matchdays.filter(pick_distribution_final=True).values_list('id', 'number'))
+    rows_by_number = {number: [] for _, number in matchdays}
+    for number, pool_id, team_id, count in _distribution_rows([matchday_id for matchday_id, _ in matchdays]):
+        rows_by_number[number].append((pool_id, team_id, count))
+
+    cube = SeasonCube.empty()
+    for number in sorted(rows_by_number):
+        cube.set_matchday(number, rows_by_number[number])
+    _save(season.id, cube)
+    return cube
+
+
+# {season id: SeasonCube}, filled on first use and dropped when a cube changes
+_cubes = VersionedSnapshot('pick_cube', dict)
+
+
+def get_pick_cube(season):
+    cubes = _cubes.get()
+    cube = cubes.get(season.id)
+    if cube is None:
+        cube = cubes[season.id] = _load(season.id)
+    return cube
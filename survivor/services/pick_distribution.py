@@ -0,0 +1,59 @@
+# survivor/services/pick_distribution.py
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from survivor.models import Matchday, Pick, PickDistribution
+from survivor.services.pick_cube import update_pick_cube
+
+
+def rebuild_pick_distribution(matchday):
+    """
+    Recount a matchday's distribution from Pick.
+
+    Once the matchday has started the picks are locked, so the recount is
+    marked final and never repeated.
+    """
+    rows = Pick.objects.filter(matchday=matchday).values(
+        'player_entry__pool', 'team'
+    ).annotate(count=Count('id'))
+
+    distribution = []
+    totals = defaultdict(int)
+    for row in rows:
+        distribution.append(PickDistribution(
+            matchday=matchday,
+            pool_id=row['player_entry__pool'],
+            team_id=row['team'],
+            count=row['count']
+        ))
+        totals[row['team']] += row['count']
+    distribution.extend(
+        PickDistribution(matchday=matchday, pool=None, team_id=team_id, count=count)
+        for team_id, count in totals.items()
+    )
+
+    with transaction.atomic():
+        PickDistribution.objects.filter(matchday=matchday).delete()
+        PickDistribution.objects.bulk_create(distribution, batch_size=1000)
+        if matchday.has_started:
+            Matchday.objects.filter(pk=matchday.pk).update(pick_distribution_final=True)
+            matchday.pick_distribution_final = True
+            # The season cube gains this matchday's locked slice
+            update_pick_cube(matchday)
+
+    return len(distribution)
+
+
+def get_pick_counts(matchday, pool=None):
+    """Return {team_id: pick count} for a matchday, across all pools or for one pool"""
+    if matchday.has_started and not matchday.pick_distribution_final:
+        rebuild_pick_distribution(matchday)
+
+    return dict(
+        PickDistribution.objects.filter(
+            matchday=matchday,
+            pool=pool
+        ).values_list('team_id', 'count')
+    )
@@ -0,0 +1,188 @@
+# survivor/services/planner.py
+"""
+Remaining-season pick planner.
+
+Surviving every remaining matchday means multiplying the chances of each
+pick not losing, so the best plan minimises the sum of -log(chance) over
+the matchdays. Every team can be picked twice, which makes this an
+assignment problem: matchdays on one side, two "slots" per team (minus the
+picks already used) on the other. It is solved exactly with the Hungarian
+algorithm in O(matchdays^2 x slots), a few milliseconds for a whole season.
+"""
+import hashlib
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from survivor.models import MAX_PICKS_PER_TEAM, Match
+from survivor.services.calendar import get_season_calendar
+from survivor.services.simulation import match_probabilities
+from survivor.services.teams import get_team_registry
+from survivor.services.versions import get_version
+
+# Chances are clamped so picking a team without a match is very costly but finite
+MIN_PROBABILITY = 1e-12
+
+
+def solve_assignment(cost):
+    """
+    Minimum-cost assignment of every row of `cost` to a distinct column.
+
+    Needs no more rows than columns. Returns the column chosen for each row.
+    Shortest augmenting path Hungarian algorithm, vectorised over columns.
+    """
+    cost = np.asarray(cost, dtype=float)
+    rows, cols = cost.shape
+    if rows > cols:
+        raise ValueError('More rows than columns')
+
+    # Potentials and matching are 1-indexed; column 0 is the virtual start
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    row_of = np.zeros(cols + 1, dtype=np.intp)
+    way = np.zeros(cols + 1, dtype=np.intp)
+
+    for i in range(1, rows + 1):
+        row_of[0] = i
+        j0 = 0
+        minv = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[row_of[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+
+    assignment = np.empty(rows, dtype=np.intp)
+    for j in range(1, cols + 1):
+        if row_of[j]:
+            assignment[row_of[j] - 1] = j - 1
+    return assignment
+
+
+def plan_picks(entry, team_ids, matchdays, picks, probabilities, now=None):
+    """
+    Best-survival plan for an entry's remaining matchdays.
+
+    `matchdays` are the unfinished Matchday objects, `picks` the entry's
+    (matchday_id, team_id) picks and `probabilities` maps a matchday id to
+    {team_id: (chance of not losing, opponent id, is home)}. Picks on
+    started matchdays are locked; picks on the others can still change, so
+    they are planned again and reported as the current pick.
+    """
+    now = now or timezone.now()
+    picked = dict(picks)
+    open_ids = {matchday.id for matchday in matchdays if matchday.start_date > now}
+
+    usage = {team_id: 0 for team_id in team_ids}
+    for matchday_id, team_id in picks:
+        if matchday_id not in open_ids and team_id in usage:
+            usage[team_id] += 1
+
+    rows = []
+    survival = 1.0
+    for matchday in matchdays:
+        if matchday.id in open_ids or matchday.id not in picked:
+            continue
+        team_id = picked[matchday.id]
+        chance, opponent_id, is_home = probabilities.get(matchday.id, {}).get(team_id, (0.0, None, None))
+        survival *= chance
+        rows.append(_plan_row(matchday, team_id, chance, opponent_id, is_home, team_id, locked=True))
+
+    planned = [matchday for matchday in matchdays if matchday.id in open_ids]
+    # One column per remaining pick of each team, plus "no pick" columns if
+    # there are more matchdays than picks left
+    slots = [team_id for team_id in team_ids for _ in range(MAX_PICKS_PER_TEAM - usage[team_id])]
+    slots += [None] * max(0, len(planned) - len(slots))
+
+    if planned:
+        chances = np.zeros((len(planned), len(slots)))
+        for d, matchday in enumerate(planned):
+            day = probabilities.get(matchday.id, {})
+            chances[d] = [day[team_id][0] if team_id in day else 0.0 for team_id in slots]
+        assignment = solve_assignment(-np.log(np.maximum(chances, MIN_PROBABILITY)))
+
+        for d, matchday in enumerate(planned):
+            team_id = slots[assignment[d]]
+            chance, opponent_id, is_home = probabilities.get(matchday.id, {}).get(team_id, (0.0, None, None))
+            survival *= chance
+            rows.append(_plan_row(
+                matchday, team_id, chance, opponent_id, is_home, picked.get(matchday.id), locked=False
+            ))
+
+    rows.sort(key=lambda row: row['number'])
+    return {'entry_id': entry.id, 'survival': survival, 'matchdays': rows}
+
+
+def _plan_row(matchday, team_id, chance, opponent_id, is_home, current_team_id, locked):
+    return {
+        'matchday_id': matchday.id,
+        'number': matchday.number,
+        'team_id': team_id,
+        'opponent_id': opponent_id,
+        'is_home': is_home,
+        'probability': chance,
+        'current_team_id': current_team_id,
+        'locked': locked,
+    }
+
+
+def team_probabilities(season, matchday_ids, probabilities=None):
+    """{matchday id: {team id: (chance of not losing, opponent id, is home)}}"""
+    if probabilities is None:
+        probabilities = match_probabilities(season)
+    by_matchday = {matchday_id: {} for matchday_id in matchday_ids}
+    for match in Match.objects.filter(matchday_id__in=matchday_ids).values(
+        'id', 'matchday_id', 'home_team_id', 'away_team_id'
+    ):
+        home_win, draw, away_win = probabilities[match['id']]
+        day = by_matchday[match['matchday_id']]
+        day[match['home_team_id']] = (home_win + draw, match['away_team_id'], True)
+        day[match['away_team_id']] = (away_win + draw, match['home_team_id'], False)
+    return by_matchday
+
+
+def plan_cache_key(entry, picks, version, next_matchday):
+    """Changes with the calendar version, the next deadline and the entry's picks"""
+    state = hashlib.sha1(repr(sorted(picks)).encode()).hexdigest()[:16]
+    next_id = next_matchday.id if next_matchday else 0
+    return f'planner:entry:{entry.id}:v{version}:{next_id}:{state}'
+
+
+def get_pick_plan(entry):
+    """The entry's plan, cached until the next sync or a change to its picks"""
+    season = entry.pool.season
+    calendar = get_season_calendar(season.id)
+    picks = list(entry.picks.values_list('matchday_id', 'team_id'))
+    key = plan_cache_key(entry, picks, get_version('calendar'), calendar.next())
+    plan = cache.get(key)
+    if plan is None:
+        matchdays = [matchday for matchday in calendar.matchdays if not matchday.is_complete]
+        probabilities = team_probabilities(season, [matchday.id for matchday in matchdays])
+        team_ids = [team.id for team in get_team_registry()]
+        plan = plan_picks(entry, team_ids, matchdays, picks, probabilities)
+        cache.set(key, plan, settings.PICK_PLAN_CACHE_TIMEOUT)
+    return plan
+
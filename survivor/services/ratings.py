@@ -0,0 +1,175 @@
+# survivor/services/ratings.py
+"""
+Elo team-strength ratings.
+
+Each finished match moves the two teams' ratings by K x (result - expected),
+scaled up for wide goal margins, so processing a match is O(1) and never
+looks at older results. Team.rating holds the current rating and
+TeamRating keeps its value after every matchday.
+
+Outcome probabilities use the Davidson extension of the Elo/Bradley-Terry
+model, which gives draws a share that is largest between equal teams. They
+are stored on every unplayed Match whenever ratings change, so the pick
+grid, the simulator and the planner read them instead of recomputing them.
+"""
+import math
+
+from survivor.models import Match, Team, TeamRating
+from survivor.services.football_api import TeamMapper
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+# Rating points added to the home team
+HOME_ADVANTAGE = 65.0
+# Davidson draw parameter: about 27% draws between equal teams
+DRAW_FACTOR = 0.75
+# Rating points per point-per-game above the league average, when seeding
+# ratings from a league table
+STANDINGS_SPREAD = 250.0
+
+
+def goal_multiplier(goal_difference):
+    """Wider wins move ratings further (the World Football Elo weighting)"""
+    goal_difference = abs(goal_difference)
+    if goal_difference <= 1:
+        return 1.0
+    if goal_difference == 2:
+        return 1.5
+    return (11 + goal_difference) / 8
+
+
+def expected_home_score(home_rating, away_rating, home_advantage=HOME_ADVANTAGE):
+    """Expected points share of the home team, a draw counting as half"""
+    return 1 / (1 + 10 ** ((away_rating - home_rating - home_advantage) / 400))
+
+
+def outcome_probabilities(home_rating, away_rating, home_advantage=HOME_ADVANTAGE, draw_factor=DRAW_FACTOR):
+    """(home win, draw, away win) probabilities for a fixture"""
+    home = 10 ** ((home_rating + home_advantage) / 400)
+    away = 10 ** (away_rating / 400)
+    draw = draw_factor * math.sqrt(home * away)
+    total = home + away + draw
+    return home / total, draw / total, away / total
+
+
+def rate_match(home_rating, away_rating, home_score, away_score, k_factor=K_FACTOR):
+    """New (home, away) ratings after a finished match"""
+    actual = 1.0 if home_score > away_score else 0.5 if home_score == away_score else 0.0
+    change = (
+        k_factor * goal_multiplier(home_score - away_score)
+        * (actual - expected_home_score(home_rating, away_rating))
+    )
+    return home_rating + change, away_rating - change
+
+
+class RatingEngine:
+    """
+    Current ratings of every team, updated one match at a time.
+
+    `save()` writes the changed Team.rating values and one TeamRating row per
+    team and matchday touched since the last save.
+    """
+
+    def __init__(self, ratings=None):
+        if ratings is None:
+            ratings = dict(Team.objects.values_list('id', 'rating'))
+        self.ratings = ratings
+        self._touched = {}
+
+    def rating(self, team_id):
+        return self.ratings.get(team_id, INITIAL_RATING)
+
+    def apply(self, match):
+        """Update ratings with a finished match"""
+        home_score, away_score = match.home_score, match.away_score
+        if home_score is None or away_score is None:
+            # Result entered without a score: count it as a one-goal margin
+            home_score, away_score = {'HOME': (1, 0), 'DRAW': (0, 0), 'AWAY': (0, 1)}[match.result]
+        home, away = rate_match(
+            self.rating(match.home_team_id), self.rating(match.away_team_id), home_score, away_score
+        )
+        self.ratings[match.home_team_id] = home
+        self.ratings[match.away_team_id] = away
+        self._touched[(match.home_team_id, match.matchday_id)] = home
+        self._touched[(match.away_team_id, match.matchday_id)] = away
+
+    def save(self):
+        """Persist the ratings changed since the last save; returns the history rows written"""
+        if not self._touched:
+            return 0
+        latest = {team_id: rating for (team_id, _), rating in self._touched.items()}
+        teams = [Team(id=team_id, rating=rating) for team_id, rating in latest.items()]
+        Team.objects.bulk_update(teams, ['rating'])
+        history = [
+            TeamRating(team_id=team_id, matchday_id=matchday_id, rating=rating)
+            for (team_id, matchday_id), rating in self._touched.items()
+        ]
+        TeamRating.objects.bulk_create(
+            history, update_conflicts=True, unique_fields=['team', 'matchday'], update_fields=['rating']
+        )
+        self._touched = {}
+        return len(history)
+
+    def update_match_probabilities(self, season):
+        """Store outcome probabilities on the season's unplayed matches; returns the count"""
+        matches = list(Match.objects.filter(matchday__season=season, result__isnull=True).only(
+            'id', 'home_team_id', 'away_team_id'
+        ))
+        for match in matches:
+            (match.home_win_probability,
+             match.draw_probability,
+             match.away_win_probability) = outcome_probabilities(
+                self.rating(match.home_team_id), self.rating(match.away_team_id)
+            )
+        Match.objects.bulk_update(
+            matches, ['home_win_probability', 'draw_probability', 'away_win_probability'], batch_size=500
+        )
+        return len(matches)
+
+
+def ratings_from_standings(standings):
+    """
+    Ratings derived from a football-data.org league table (FootballDataAPI.
+    get_standings): the league average points per game maps to INITIAL_RATING.
+    Teams missing from the table are left out.
+    """
+    table = next((group['table'] for group in standings if group.get('type') == 'TOTAL'), [])
+    points_per_game = {}
+    for row in table:
+        if row.get('playedGames'):
+            points_per_game[TeamMapper.get_team_name(row['team']['name'])] = row['points'] / row['playedGames']
+    if not points_per_game:
+        return {}
+    average = sum(points_per_game.values()) / len(points_per_game)
+    teams = dict(Team.objects.filter(name__in=points_per_game).values_list('name', 'id'))
+    return {
+        teams[name]: INITIAL_RATING + STANDINGS_SPREAD * (ppg - average)
+        for name, ppg in points_per_game.items() if name in teams
+    }
+
+
+def rebuild_ratings(season, initial=None):
+    """
+    Replay every finished match of a season in kickoff order, starting from
+    `initial` ratings ({team id: rating}, INITIAL_RATING for the rest), and
+    rewrite the season's rating history and match probabilities.
+    """
+    ratings = {team_id: INITIAL_RATING for team_id in Team.objects.values_list('id', flat=True)}
+    ratings.update(initial or {})
+    engine = RatingEngine(ratings)
+    TeamRating.objects.filter(matchday__season=season).delete()
+
+    matches = Match.objects.filter(matchday__season=season, result__isnull=False).only(
+        'id', 'matchday_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'result'
+    ).order_by('kickoff', 'id')
+    played = 0
+    for match in matches.iterator(chunk_size=1000):
+        engine.apply(match)
+        played += 1
+    # Teams that have not played keep their starting rating
+    Team.objects.bulk_update(
+        [Team(id=team_id, rating=rating) for team_id, rating in engine.ratings.items()], ['rating']
+    )
+    history = engine.save()
+    engine.update_match_probabilities(season)
+    return engine, played, history
@@ -0,0 +1,280 @@
+# survivor/services/simulation.py
+"""
+Monte Carlo survival odds for a pool.
+
+Every live entry is assumed to keep picking greedily: in each remaining
+matchday it takes the available team (picked fewer than twice) with the best
+chance of not losing. Entries with the same team usage follow the same path,
+so paths are computed once per distinct state. Match outcomes are then
+sampled for all trials at once with NumPy, and each path's survival is
+evaluated as a (trials x paths) array, a chunk of trials at a time.
+"""
+import math
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+from survivor.models import MAX_PICKS_PER_TEAM, Match, Matchday, Pick, PlayerEntry, SurvivalForecast
+from survivor.services.caching import get_or_compute
+from survivor.services.teams import get_team_registry
+
+HOME_ADVANTAGE = 0.3
+# Points per game each team starts from before any results, in games
+PRIOR_GAMES = 5
+PRIOR_POINTS_PER_GAME = 1.35
+# How sharply a points-per-game difference turns into a win probability
+STRENGTH_SCALE = 1.5
+DEFAULT_DRAW_RATE = 0.25
+
+TOP_FORECASTS = 5
+
+
+def match_probabilities(season, draw_rate=None, home_advantage=HOME_ADVANTAGE):
+    """
+    Return {match_id: (home win, draw, away win)} for a season's matches.
+
+    Played matches get their actual outcome, and unplayed ones the
+    probabilities stored from the team ratings. Matches not rated yet are
+    estimated from the season's results so far: each team's points per game
+    (shrunk towards a prior for early-season stability) plus a home
+    advantage gives the share of decisive results, and the draw rate is the
+    season's own.
+    """
+    matches = list(Match.objects.filter(matchday__season=season).values(
+        'id', 'home_team_id', 'away_team_id', 'result',
+        'home_win_probability', 'draw_probability', 'away_win_probability',
+    ))
+
+    points, games = {}, {}
+    draws = played = 0
+    for match in matches:
+        if match['result'] is None:
+            continue
+        played += 1
+        draws += match['result'] == 'DRAW'
+        home_points, away_points = {'HOME': (3, 0), 'DRAW': (1, 1), 'AWAY': (0, 3)}[match['result']]
+        for team_id, team_points in ((match['home_team_id'], home_points),
+                                     (match['away_team_id'], away_points)):
+            points[team_id] = points.get(team_id, 0) + team_points
+            games[team_id] = games.get(team_id, 0) + 1
+
+    if draw_rate is None:
+        draw_rate = (draws + DEFAULT_DRAW_RATE * PRIOR_GAMES) / (played + PRIOR_GAMES)
+
+    def strength(team_id):
+        return (
+            (points.get(team_id, 0) + PRIOR_POINTS_PER_GAME * PRIOR_GAMES)
+            / (games.get(team_id, 0) + PRIOR_GAMES)
+        )
+
+    probabilities = {}
+    for match in matches:
+        if match['result'] is not None:
+            probabilities[match['id']] = (
+                float(match['result'] == 'HOME'),
+                float(match['result'] == 'DRAW'),
+                float(match['result'] == 'AWAY'),
+            )
+            continue
+        if match['draw_probability'] is not None:
+            probabilities[match['id']] = (
+                match['home_win_probability'], match['draw_probability'], match['away_win_probability']
+            )
+            continue
+        diff = strength(match['home_team_id']) - strength(match['away_team_id']) + home_advantage
+        home_share = 1 / (1 + math.exp(-STRENGTH_SCALE * diff))
+        probabilities[match['id']] = (
+            (1 - draw_rate) * home_share,
+            draw_rate,
+            (1 - draw_rate) * (1 - home_share),
+        )
+    return probabilities
+
+
+class PoolModel:
+    """
+    Array-backed state of a pool's live entries over the remaining matchdays.
+
+    Team columns are the registry's teams, followed by two pseudo-teams:
+    NO_PICK (nothing left to pick: always loses) and SAFE (a pick that
+    already succeeded, or a started matchday without a pick: always survives).
+    """
+
+    def __init__(self, pool, probabilities=None):
+        self.pool = pool
+        teams = list(get_team_registry())
+        self.team_index = {team.id: i for i, team in enumerate(teams)}
+        self.no_pick = len(teams)
+        self.safe = len(teams) + 1
+
+        # Unfinished matchdays that have fixtures
+        self.matchdays = list(
+            Matchday.objects.filter(
+                season_id=pool.season_id, is_complete=False, matches__isnull=False
+            ).distinct().order_by('number')
+        )
+        day_index = {matchday.id: d for d, matchday in enumerate(self.matchdays)}
+        if probabilities is None:
+            probabilities = match_probabilities(pool.season)
+
+        matches = [
+            match for match in Match.objects.filter(matchday_id__in=day_index).values(
+                'id', 'matchday_id', 'home_team_id', 'away_team_id'
+            )
+            if match['home_team_id'] in self.team_index and match['away_team_id'] in self.team_index
+        ]
+        self.match_day = np.array([day_index[m['matchday_id']] for m in matches], dtype=np.intp)
+        self.match_home = np.array([self.team_index[m['home_team_id']] for m in matches], dtype=np.intp)
+        self.match_away = np.array([self.team_index[m['away_team_id']] for m in matches], dtype=np.intp)
+        probs = np.array([probabilities[m['id']] for m in matches], dtype=float).reshape(-1, 3)
+        self.home_win = probs[:, 0]
+        self.home_not_lose = probs[:, 0] + probs[:, 1]
+
+        # Chance of each team not losing in each remaining matchday; teams
+        # without a match that day can't be picked usefully
+        self.not_lose = np.zeros((len(self.matchdays), len(teams)))
+        self.not_lose[self.match_day, self.match_home] = self.home_not_lose
+        self.not_lose[self.match_day, self.match_away] = 1 - self.home_win
+
+        self._load_entries(day_index)
+
+    def _load_entries(self, day_index):
+        started = {d for d, matchday in enumerate(self.matchdays) if matchday.has_started}
+        entries = list(
+            PlayerEntry.objects.filter(pool=self.pool, is_eliminated=False).values_list('id', flat=True)
+        )
+        usage = {entry_id: [0] * self.no_pick for entry_id in entries}
+        locked = {entry_id: {d: self.safe for d in started} for entry_id in entries}
+        for entry_id, matchday_id, team_id, success in Pick.objects.filter(
+            player_entry_id__in=entries
+        ).values_list('player_entry_id', 'matchday_id', 'team_id', 'is_successful'):
+            team = self.team_index.get(team_id)
+            if team is not None:
+                usage[entry_id][team] += 1
+            d = day_index.get(matchday_id)
+            if d is not None:
+                locked[entry_id][d] = self.safe if success or team is None else team
+
+        # One greedy path per distinct (usage, locked picks) state
+        paths = {}
+        self.entry_ids = entries
+        self.entry_path = np.empty(len(entries), dtype=np.intp)
+        for i, entry_id in enumerate(entries):
+            state = (tuple(usage[entry_id]), tuple(sorted(locked[entry_id].items())))
+            if state not in paths:
+                paths[state] = len(paths)
+            self.entry_path[i] = paths[state]
+
+        self.paths = np.empty((len(paths), len(self.matchdays)), dtype=np.intp)
+        for (used, locks), p in paths.items():
+            self.paths[p] = self._greedy_path(list(used), dict(locks))
+        self.path_counts = np.bincount(self.entry_path, minlength=len(paths))
+
+    def _greedy_path(self, used, locked):
+        path = []
+        used = np.array(used)
+        for d in range(len(self.matchdays)):
+            if d in locked:
+                path.append(locked[d])
+                continue
+            chances = np.where(used < MAX_PICKS_PER_TEAM, self.not_lose[d], -1.0)
+            team = int(np.argmax(chances))
+            if chances[team] <= 0:
+                path.append(self.no_pick)
+                continue
+            used[team] += 1
+            path.append(team)
+        return path
+
+    def simulate(self, trials=10000, seed=None, chunk_size=1000):
+        """
+        Return arrays over entries: survive_next, survive_season, win.
+
+        Lifetimes (matchdays survived) are computed per trial and path; the
+        winners of a trial are the entries with the longest lifetime.
+        """
+        days = len(self.matchdays)
+        paths = len(self.path_counts)
+        rng = np.random.default_rng(seed)
+        survive_next = np.zeros(paths)
+        survive_season = np.zeros(paths)
+        wins = np.zeros(paths)
+
+        for start in range(0, trials, chunk_size):
+            n = min(chunk_size, trials - start)
+            # not_lose[trial, day, team], with the NO_PICK and SAFE columns
+            not_lose = np.zeros((n, days, self.safe + 1), dtype=bool)
+            not_lose[:, :, self.safe] = True
+            u = rng.random((n, len(self.match_day)))
+            not_lose[:, self.match_day, self.match_home] = u < self.home_not_lose
+            not_lose[:, self.match_day, self.match_away] = u >= self.home_win
+
+            alive = np.ones((n, paths), dtype=bool)
+            lifetime = np.zeros((n, paths), dtype=np.int16)
+            for d in range(days):
+                alive &= not_lose[:, d, self.paths[:, d]]
+                lifetime += alive
+                if d == 0:
+                    survive_next += alive.sum(axis=0)
+            survive_season += alive.sum(axis=0)
+
+            winners = lifetime == lifetime.max(axis=1, keepdims=True)
+            winner_count = winners @ self.path_counts
+            wins += (winners / winner_count[:, None]).sum(axis=0)
+
+        if not days:
+            survive_next[:] = trials
+        per_entry = self.entry_path
+        return {
+            'survive_next': survive_next[per_entry] / trials,
+            'survive_season': survive_season[per_entry] / trials,
+            'win': wins[per_entry] / trials,
+        }
+
+
+def forecast_cache_key(pool):
+    return f'simulation:pool:{pool.id}'
+
+
+def simulate_pool(pool, trials=10000, seed=None, probabilities=None):
+    """Run the simulation for a pool and store one SurvivalForecast per live entry"""
+    model = PoolModel(pool, probabilities)
+    results = model.simulate(trials=trials, seed=seed) if model.entry_ids else None
+
+    forecasts = [
+        SurvivalForecast(
+            player_entry_id=entry_id,
+            survive_next=float(results['survive_next'][i]),
+            survive_season=float(results['survive_season'][i]),
+            win_probability=float(results['win'][i]),
+            trials=trials,
+        )
+        for i, entry_id in enumerate(model.entry_ids)
+    ]
+    with transaction.atomic():
+        SurvivalForecast.objects.filter(player_entry__pool=pool).delete()
+        SurvivalForecast.objects.bulk_create(forecasts, batch_size=1000)
+    cache.delete(forecast_cache_key(pool))
+    return model, forecasts
+
+
+def get_pool_forecast(pool):
+    """The pool's favourites, cached until the next simulation run"""
+    def compute():
+        rows = list(SurvivalForecast.objects.filter(player_entry__pool=pool).select_related(
+            'player_entry__user'
+        ).order_by('-win_probability', 'player_entry__user__username')[:TOP_FORECASTS])
+        return {
+            'favourites': [
+                {
+                    'username': row.player_entry.user.username,
+                    'win_pct': row.win_probability * 100,
+                    'survive_season_pct': row.survive_season * 100,
+                }
+                for row in rows
+            ],
+            'computed_at': rows[0].computed_at if rows else None,
+        }
+
+    return get_or_compute(forecast_cache_key(pool), compute, None)
@@ -0,0 +1,159 @@
+# survivor/services/standings.py
+"""
+Pool standings, a page at a time.
+
+Entries are ordered by (is_eliminated, -eliminated_number, username): the
+players still alive first, then everyone else by how long they lasted.
+Both sort fields are copied onto PlayerEntry, so a page is one range scan
+of the entry_standings_idx index starting after the last row shown (a
+keyset cursor), however deep into a large pool it is. A username prefix
+search walks the same order.
+"""
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from survivor.models import PlayerEntry
+from survivor.services.caching import aget_or_compute, get_or_compute
+
+STANDINGS_ORDER = ('is_eliminated', '-eliminated_number', 'username')
+
+
+def standings_cache_key(pool):
+    return f'pool:{pool.pk}:standings:page1:v{pool.standings_version}'
+
+
+def encode_cursor(entry, position):
+    # Usernames may contain dots, so the username goes last
+    return f'{int(entry.is_eliminated)}.{entry.eliminated_number}.{position or 0}.{entry.username}'
+
+
+def decode_cursor(cursor):
+    """(is_eliminated, eliminated_number, position, username) of the last row shown, or None"""
+    try:
+        is_eliminated, number, position, username = cursor.split('.', 3)
+        return bool(int(is_eliminated)), int(number), int(position), username
+    except (AttributeError, ValueError):
+        return None
+
+
+def _page_query(pool, after, prefix, size):
+    """(queryset of up to size + 1 entries, position of the row before them)"""
+    entries = (
+        PlayerEntry.objects.filter(pool=pool)
+        .only('id', 'user_id', 'is_eliminated', 'eliminated_number', 'username')
+        .order_by(*STANDINGS_ORDER)
+    )
+    if prefix:
+        entries = entries.filter(username__startswith=prefix)
+
+    position = 0
+    cursor = decode_cursor(after) if after else None
+    if cursor:
+        is_eliminated, number, position, username = cursor
+        later = (
+            Q(is_eliminated=is_eliminated, eliminated_number=number, username__gt=username)
+            | Q(is_eliminated=is_eliminated, eliminated_number__lt=number)
+        )
+        if not is_eliminated:
+            later |= Q(is_eliminated=True)
+        entries = entries.filter(later)
+    return entries[:size + 1], position
+
+
+def _number_page(entries, position, prefix, size):
+    has_more = len(entries) > size
+    entries = entries[:size]
+    for entry in entries:
+        position += 1
+        entry.position = None if prefix else position
+    next_cursor = encode_cursor(entries[-1], position) if has_more else None
+    return entries, next_cursor
+
+
+def standings_page(pool, after=None, prefix='', size=None):
+    """
+    Return (entries, next cursor) for the page of the pool's standings after `after`.
+
+    Entries get a `position` in the full standings; it is carried in the
+    cursor rather than counted, and left as None in search results.
+    """
+    size = size or settings.STANDINGS_PAGE_SIZE
+    entries, position = _page_query(pool, after, prefix, size)
+    return _number_page(list(entries), position, prefix, size)
+
+
+async def astandings_page(pool, after=None, prefix='', size=None):
+    """standings_page on the async ORM"""
+    size = size or settings.STANDINGS_PAGE_SIZE
+    entries, position = _page_query(pool, after, prefix, size)
+    return _number_page([entry async for entry in entries], position, prefix, size)
+
+
+def _rows_html(pool, entries, next_cursor, after, prefix):
+    next_url = None
+    if next_cursor:
+        query = {'after': next_cursor}
+        if prefix:
+            query['q'] = prefix
+        next_url = f"{reverse('survivor:pool_standings_rows', args=[pool.pk])}?{urlencode(query)}"
+    return render_to_string('partials/pool_standings_rows.html', {
+        'entries': entries,
+        'next_url': next_url,
+        'searching': bool(prefix),
+        'first_page': not after,
+    })
+
+
+def render_standings_rows(pool, after=None, prefix=''):
+    """The <tr> rows of one standings page, ending in a loader for the next"""
+    return _rows_html(pool, *standings_page(pool, after, prefix), after, prefix)
+
+
+async def arender_standings_rows(pool, after=None, prefix=''):
+    return _rows_html(pool, *await astandings_page(pool, after, prefix), after, prefix)
+
+
+def _counts_query(pool):
+    return PlayerEntry.objects.filter(pool=pool), {
+        'total': Count('id'), 'active': Count('id', filter=Q(is_eliminated=False)),
+    }
+
+
+def _standings(pool, counts, rows):
+    return {
+        'html': render_to_string('partials/pool_standings.html', {'pool': pool, 'rows': rows}),
+        'rows': rows,
+        'active_count': counts['active'],
+        'total_count': counts['total'],
+    }
+
+
+def get_pool_standings(pool):
+    """
+    Return the first page of the standings table and player counts for a pool.
+
+    The cache key contains the pool's standings version, which is bumped
+    whenever an entry joins or is eliminated, so a hit is never stale and
+    PlayerEntry is only queried once per change, by one request at a time.
+    Only the first page is rendered; the counts come from the
+    (pool, is_eliminated) index.
+    """
+    def compute():
+        entries, aggregates = _counts_query(pool)
+        return _standings(pool, entries.aggregate(**aggregates), render_standings_rows(pool))
+
+    return get_or_compute(standings_cache_key(pool), compute, settings.STANDINGS_CACHE_TIMEOUT)
+
+
+async def aget_pool_standings(pool):
+    """get_pool_standings on the async ORM and cache API"""
+    async def compute():
+        entries, aggregates = _counts_query(pool)
+        counts = await entries.aaggregate(**aggregates)
+        return _standings(pool, counts, await arender_standings_rows(pool))
+
+    return await aget_or_compute(standings_cache_key(pool), compute, settings.STANDINGS_CACHE_TIMEOUT)
@@ -0,0 +1,250 @@
+# survivor/services/synthetic.py
+"""
+Deterministic synthetic dataset for load testing.
+
+Builds a full season (double round robin, simulated results), thousands of
+pools and their entries and picks with bulk_create, skipping the per-row
+validation in the model save methods. The same seed always produces the
+same rows. Picks follow the game rules: no entry picks a team more than
+twice, and an entry stops picking after the matchday it was eliminated.
+"""
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from survivor.models import (
+    MAX_PICKS_PER_TEAM, GamePool, Match, Matchday, Pick, PlayerEntry, Season, Team,
+)
+from survivor.services.calendar import invalidate_calendar
+from survivor.services.pick_distribution import rebuild_pick_distribution
+
+MATCHDAYS = 34
+TEAMS = 18
+HOME_ADVANTAGE = 0.25
+# How strongly pickers favour stronger teams
+PICK_BIAS = 3.0
+# Share of surviving entries that forget to pick in a matchday
+SKIP_RATE = 0.03
+
+
+def round_robin(teams):
+    """Double round robin schedule: a list of (home, away) pairs per matchday"""
+    teams = list(teams)
+    rounds = []
+    for r in range(len(teams) - 1):
+        pairs = []
+        for i in range(len(teams) // 2):
+            home, away = teams[i], teams[-1 - i]
+            pairs.append((home, away) if (r + i) % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        # Circle method: keep the first team fixed and rotate the rest
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+def _poisson(rng, lam):
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+class ScaleDataGenerator:
+    """
+    Generates one synthetic season.
+
+    `played` matchdays lie in the past with results and processed picks;
+    the next one is in progress with open picks from every surviving entry.
+    """
+
+    def __init__(self, pools, entries_per_pool, users=None, played=10,
+                 seed=42, batch_size=5000, season_year='2030-31', stdout=None):
+        self.pool_count = pools
+        self.entries_per_pool = entries_per_pool
+        self.user_count = users or max(entries_per_pool, pools * entries_per_pool // 2)
+        self.played = min(played, MATCHDAYS - 1)
+        self.batch_size = batch_size
+        self.season_year = season_year
+        self.rng = random.Random(seed)
+        self.stdout = stdout
+        # Rows written and seconds spent, per model
+        self.stats = {}
+
+    def _log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def _bulk_create(self, model, objs):
+        started = time.perf_counter()
+        created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        rows, seconds = self.stats.get(model.__name__, (0, 0.0))
+        self.stats[model.__name__] = (rows + len(created), seconds + time.perf_counter() - started)
+        return created
+
+    def generate(self):
+        teams = list(Team.objects.order_by('name'))
+        if len(teams) < TEAMS:
+            raise ValueError('Not enough teams; run load_teams first')
+        if Season.objects.filter(year=self.season_year).exists():
+            raise ValueError(f'Season {self.season_year} already exists')
+
+        self.teams = teams[:TEAMS]
+        # Hidden strength per team drives results and pick popularity
+        self.strength = {team.id: self.rng.gauss(0, 0.5) for team in self.teams}
+
+        with transaction.atomic():
+            self._create_season()
+            self._create_users()
+        invalidate_calendar()
+
+        for first in range(0, self.pool_count, max(1, self.batch_size // self.entries_per_pool)):
+            last = min(self.pool_count, first + max(1, self.batch_size // self.entries_per_pool))
+            with transaction.atomic():
+                self._create_pools(first, last)
+            self._log(f'  → Pools {last}/{self.pool_count}')
+
+        # bulk_create skipped Pick.save, so count the distribution from scratch
+        started = time.perf_counter()
+        rows = sum(
+            rebuild_pick_distribution(matchday) for matchday in self.matchdays[:self.played + 1]
+        )
+        self.stats['PickDistribution'] = (rows, time.perf_counter() - started)
+        return self.stats
+
+    def _create_season(self):
+        # Matchdays are weekly; `played` of them have ended by now
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        start = now - timedelta(weeks=self.played, days=1)
+        self.season = Season.objects.create(
+            year=self.season_year,
+            is_active=not Season.objects.filter(is_active=True).exists(),
+            start_date=start.date(),
+            end_date=(start + timedelta(weeks=MATCHDAYS)).date(),
+        )
+        self.matchdays = self._bulk_create(Matchday, [
+            Matchday(
+                season=self.season,
+                number=n + 1,
+                start_date=start + timedelta(weeks=n),
+                end_date=start + timedelta(weeks=n, days=3),
+                is_complete=n < self.played,
+            )
+            for n in range(MATCHDAYS)
+        ])
+
+        # results[matchday index][team id] = True if the team did not lose
+        self.results = []
+        matches = []
+        for n, pairs in enumerate(round_robin(self.teams)):
+            matchday = self.matchdays[n]
+            outcome = {}
+            for i, (home, away) in enumerate(pairs):
+                match = Match(
+                    matchday=matchday, home_team=home, away_team=away,
+                    kickoff=matchday.start_date + timedelta(days=i // 4, hours=15 + i % 4),
+                )
+                if n < self.played:
+                    diff = self.strength[home.id] - self.strength[away.id]
+                    match.home_score = _poisson(self.rng, 1.4 * math.exp(diff / 2 + HOME_ADVANTAGE / 2))
+                    match.away_score = _poisson(self.rng, 1.4 * math.exp(-diff / 2 - HOME_ADVANTAGE / 2))
+                    match.result = (
+                        'HOME' if match.home_score > match.away_score
+                        else 'AWAY' if match.away_score > match.home_score
+                        else 'DRAW'
+                    )
+                    match.is_processed = True
+                    outcome[home.id] = match.result != 'AWAY'
+                    outcome[away.id] = match.result != 'HOME'
+                matches.append(match)
+            self.results.append(outcome)
+        self._bulk_create(Match, matches)
+
+        # Pick popularity: favourites are picked far more often
+        self.pick_weights = {
+            team.id: math.exp(PICK_BIAS * self.strength[team.id]) for team in self.teams
+        }
+
+    def _create_users(self):
+        # Hashing once keeps user creation from dominating the run
+        password = make_password('testpass123')
+        prefix = f'load{self.season_year[:4]}_'
+        self.users = self._bulk_create(User, [
+            User(username=f'{prefix}{i:06d}', password=password)
+            for i in range(self.user_count)
+        ])
+
+    def _create_pools(self, first, last):
+        pools = self._bulk_create(GamePool, [
+            GamePool(
+                name=f'Load Pool {i + 1}',
+                season=self.season,
+                created_by=self.users[i % len(self.users)],
+            )
+            for i in range(first, last)
+        ])
+
+        entries = []
+        histories = []
+        per_pool = min(self.entries_per_pool, len(self.users))
+        for pool in pools:
+            for user_index in self.rng.sample(range(len(self.users)), per_pool):
+                history, eliminated_at = self._simulate_entry()
+                entries.append(PlayerEntry(
+                    user=self.users[user_index],
+                    pool=pool,
+                    is_eliminated=eliminated_at is not None,
+                    eliminated_matchday=(
+                        self.matchdays[eliminated_at] if eliminated_at is not None else None
+                    ),
+                    eliminated_number=self.matchdays[eliminated_at].number if eliminated_at is not None else 0,
+                    username=self.users[user_index].username,
+                ))
+                histories.append(history)
+        entries = self._bulk_create(PlayerEntry, entries)
+
+        self._bulk_create(Pick, [
+            Pick(
+                player_entry=entry,
+                matchday=self.matchdays[n],
+                team_id=team_id,
+                is_successful=success,
+            )
+            for entry, history in zip(entries, histories)
+            for n, team_id, success in history
+        ])
+
+    def _simulate_entry(self):
+        """Return ([(matchday index, team id, success)], elimination matchday index)"""
+        used = {}
+        history = []
+        for n in range(self.played + 1):
+            if n < self.played and self.rng.random() < SKIP_RATE:
+                continue
+            available = [
+                team_id for team_id in self.pick_weights
+                if used.get(team_id, 0) < MAX_PICKS_PER_TEAM
+            ]
+            if not available:
+                break
+            team_id = self.rng.choices(
+                available, weights=[self.pick_weights[t] for t in available]
+            )[0]
+            used[team_id] = used.get(team_id, 0) + 1
+
+            if n == self.played:
+                # Current matchday: pick made, not processed yet
+                history.append((n, team_id, None))
+                break
+            success = self.results[n][team_id]
+            history.append((n, team_id, success))
+            if not success:
+                return history, n
+        return history, None
@@ -0,0 +1,60 @@
+# survivor/services/teams.py
+"""
+Process-wide Team registry.
+
+The team table holds a handful of rows and only changes when sync_teams or
+load_teams runs, so each process keeps an immutable copy indexed by id,
+name, short name and API name. The commands bump the 'teams' version key
+to make every process reload it.
+"""
+from types import MappingProxyType
+
+from django.conf import settings
+
+from survivor.models import Team
+from survivor.services.football_api import TeamMapper
+from survivor.services.versions import VersionedSnapshot
+
+
+class TeamRegistry:
+    """Immutable snapshot of all teams; treat the Team instances as read-only"""
+
+    def __init__(self, teams):
+        self.teams = tuple(sorted(teams, key=lambda team: team.name))
+        self.by_id = MappingProxyType({team.id: team for team in self.teams})
+        self.by_name = MappingProxyType({team.name: team for team in self.teams})
+        self.by_short_name = MappingProxyType({team.short_name: team for team in self.teams})
+        self.by_api_name = MappingProxyType({
+            TeamMapper.get_api_name(team.name): team for team in self.teams
+        })
+
+    def __iter__(self):
+        return iter(self.teams)
+
+    def __len__(self):
+        return len(self.teams)
+
+    def get(self, team_id):
+        return self.by_id.get(team_id)
+
+
+def _load_teams():
+    return TeamRegistry(Team.objects.all())
+
+
+_teams = VersionedSnapshot(
+    'teams',
+    _load_teams,
+    max_age=getattr(settings, 'TEAM_REGISTRY_MAX_AGE', 600),
+)
+
+
+def get_team_registry():
+    return _teams.get()
+
+
+def invalidate_team_registry():
+    """Called by sync_teams and load_teams after the team table changes"""
+    _teams.invalidate()
+    # The alias index shares the 'teams' version; drop our copy right away
+    TeamMapper.clear()
@@ -0,0 +1,88 @@
+# survivor/services/versions.py
+"""
+Version keys for process-local caches.
+
+Data that changes only when a sync command runs (the season calendar, the
+team list) is loaded once per process and kept in memory. The commands bump
+a version key in the shared cache; every process compares it to the version
+it loaded and reloads on a mismatch.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'survivor:version:'
+
+
+def get_version(name):
+    """Return the current version number for a named dataset"""
+    key = VERSION_KEY_PREFIX + name
+    version = cache.get(key)
+    if version is None:
+        # Start from a fresh number so a cleared or evicted key never matches
+        # a version some process loaded before
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Tell every process that a named dataset changed"""
+    key = VERSION_KEY_PREFIX + name
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key was never set or got evicted; any value other than the old one works
+        cache.set(key, time.time_ns(), None)
+        return cache.get(key)
+
+
+class VersionedSnapshot:
+    """
+    A process-local value rebuilt by `loader` whenever its version changes.
+
+    The version key is checked at most once per `check_interval` seconds, and
+    the value is reloaded after `max_age` seconds regardless, as a safety net
+    for edits that bypass the sync commands (e.g. the Django admin).
+    """
+
+    def __init__(self, name, loader, check_interval=1.0, max_age=600):
+        self.name = name
+        self.loader = loader
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self._value is not None and now - self._checked_at < self.check_interval:
+            return self._value
+
+        version = get_version(self.name)
+        with self._lock:
+            stale = (
+                self._value is None
+                or version != self._version
+                or now - self._loaded_at > self.max_age
+            )
+            if stale:
+                self._value = self.loader()
+                self._version = version
+                self._loaded_at = now
+            self._checked_at = now
+            return self._value
+
+    def invalidate(self):
+        """Bump the shared version and drop this process's copy"""
+        bump_version(self.name)
+        self.clear()
+
+    def clear(self):
+        """Drop this process's copy so the next access reloads it"""
+        with self._lock:
+            self._value = None
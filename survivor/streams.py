@@ -0,0 +1,123 @@
+# survivor/streams.py
+"""
+Server-sent event streams of live scores and eliminations.
+
+A plain ASGI app mounted in football_survivor_game/asgi.py next to
+Django, so an open stream never holds a worker thread or a database
+connection: after the session check it waits on its queue from the
+process's LiveEventBroker (services/live.py), sending a comment line
+every LIVE_EVENTS_HEARTBEAT seconds to keep proxies from closing it.
+
+    /survivor/live/pool/<id>/       eliminations in the pool, scores of its season
+    /survivor/live/matchday/<id>/   scores of the matchday's matches
+"""
+import asyncio
+import re
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.db import close_old_connections
+from django.http.cookie import parse_cookie
+
+from survivor.models import GamePool, Matchday
+from survivor.services.live import broker, events_after, format_event
+
+PREFIX = '/survivor/live/'
+PATH = re.compile(r'^/survivor/live/(?P<kind>pool|matchday)/(?P<pk>\d+)/$')
+
+
+def _is_logged_in(cookie_header):
+    session_key = parse_cookie(cookie_header).get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return False
+    close_old_connections()
+    engine = import_module(settings.SESSION_ENGINE)
+    return engine.SessionStore(session_key).get(SESSION_KEY) is not None
+
+
+def _streams(kind, pk):
+    """The broker streams behind a URL, or None if the pool or matchday does not exist"""
+    if kind == 'pool':
+        season_id = GamePool.objects.filter(pk=pk).values_list('season_id', flat=True).first()
+        return None if season_id is None else [f'pool:{pk}', f'season:{season_id}']
+    return [f'matchday:{pk}'] if Matchday.objects.filter(pk=pk).exists() else None
+
+
+@sync_to_async
+def _authorize(cookie_header, kind, pk):
+    """(status, streams) for a stream request"""
+    if not _is_logged_in(cookie_header):
+        return 403, None
+    streams = _streams(kind, pk)
+    return (404, None) if streams is None else (200, streams)
+
+
+async def _respond(send, status, body):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _disconnect(receive):
+    # The request body comes first; a GET has nothing else to send
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def live_events(scope, receive, send):
+    match = PATH.match(scope['path'])
+    if match is None or scope['method'] != 'GET':
+        await _respond(send, 404, b'Not found')
+        return
+
+    headers = dict(scope['headers'])
+    status, streams = await _authorize(
+        headers.get(b'cookie', b'').decode('latin-1'), match['kind'], int(match['pk'])
+    )
+    if status != 200:
+        await _respond(send, status, b'Forbidden' if status == 403 else b'Not found')
+        return
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream'),
+        (b'cache-control', b'no-cache'),
+        # Stop nginx-style proxies from buffering the stream
+        (b'x-accel-buffering', b'no'),
+    ]})
+    queue = broker.subscribe(streams)
+    disconnected = asyncio.ensure_future(_disconnect(receive))
+    try:
+        await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+
+        # A reconnecting browser sends the id of the last event it got
+        replayed = set()
+        last_event_id = headers.get(b'last-event-id', b'').decode('latin-1')
+        if last_event_id.isdigit():
+            for event in await sync_to_async(events_after)(int(last_event_id), streams):
+                await send({'type': 'http.response.body', 'body': format_event(event).encode(), 'more_body': True})
+                replayed.add(event.id)
+
+        while True:
+            next_event = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected},
+                timeout=settings.LIVE_EVENTS_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                next_event.cancel()
+                break
+            if next_event in done:
+                event = next_event.result()
+                if event.id in replayed:
+                    continue  # Already sent in the replay
+                body = format_event(event)
+            else:
+                next_event.cancel()
+                body = ': ping\n\n'
+            await send({'type': 'http.response.body', 'body': body.encode(), 'more_body': True})
+    finally:
+        broker.unsubscribe(queue, streams)
+        disconnected.cancel()
@@ -1,3 +1,1493 @@
-from django.test import TestCase
+import asyncio
+import io
+import itertools
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import Count, Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .models import (
+    GamePool, LeaderboardEntry, LiveEvent, Match, Matchday, Pick, PickDistribution, PlayerEntry, Season,
+    StandingsSnapshot, SurvivalForecast, Team, TeamAlias, TeamRating,
+)
+from football_survivor_game import cache_url
+from .services import benchmark, caching, degradation, metrics
+from .services.analytics import get_pool_analytics
+from .services.football_api import FootballDataAPI, TeamMapper
+from .services.leaderboard import leaderboard_page, rebuild_leaderboard
+from .services.live import elimination_event, publish
+from .streams import live_events
+from .services.calendar import SeasonCalendar, get_season_calendar, invalidate_calendar
+from .services.fixtures import get_fixture_grid
+from .services.pick_cube import get_pick_cube, rebuild_pick_cube, update_pick_cube
+from .services.pick_distribution import get_pick_counts
+from .services.planner import get_pick_plan, solve_assignment
+from .services.ratings import outcome_probabilities, rate_match
+from .services.simulation import simulate_pool
+from .services.snapshots import decode_ids, encode_ids, write_matchday_snapshots
+from .services.standings import get_pool_standings, standings_page
+from .services.synthetic import ScaleDataGenerator
+from .services.teams import get_team_registry, invalidate_team_registry
+from .services.versions import get_version
+
+
+class MetricsEndpointTests(TestCase):
+    """Scrape /metrics locally and check what the registry exposes"""
+
+    def setUp(self):
+        self.metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.metrics_dir.cleanup)
+        override = override_settings(METRICS_DIR=self.metrics_dir.name, METRICS_TOKEN=None)
+        override.enable()
+        self.addCleanup(override.disable)
+        metrics.registry.reset()
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_view_latency_is_recorded(self):
+        self.client.get(reverse('home'))
+        body = self.scrape()
+
+        self.assertIn('# TYPE survivor_view_duration_seconds histogram', body)
+        self.assertIn(
+            'survivor_view_duration_seconds_count{view="home",method="GET",status="200"} 1',
+            body
+        )
+        self.assertIn(
+            'survivor_view_duration_seconds_bucket{view="home",method="GET",status="200",le="+Inf"} 1',
+            body
+        )
+
+    def test_snapshots_from_other_workers_are_merged(self):
+        metrics.COMMAND_ROWS.inc(3, command='process_results', operation='picks_updated')
+        other_worker = {
+            'survivor_command_rows_total': [[['process_results', 'picks_updated'], 4]],
+        }
+        with open(os.path.join(self.metrics_dir.name, 'metrics-999999.json'), 'w') as f:
+            json.dump(other_worker, f)
+
+        body = self.scrape()
+        self.assertIn(
+            'survivor_command_rows_total{command="process_results",operation="picks_updated"} 7',
+            body
+        )
+
+    def test_flush_writes_snapshot_for_this_process(self):
+        metrics.COMMAND_DURATION.observe(1.5, command='sync_fixtures')
+        metrics.registry.flush(force=True)
+
+        path = os.path.join(self.metrics_dir.name, metrics.registry._own_file())
+        with open(path) as f:
+            snapshot = json.load(f)
+        [[labels, state]] = snapshot['survivor_command_duration_seconds']
+        self.assertEqual(labels, ['sync_fixtures'])
+        self.assertEqual(state[-1], 1.5)
+
+    def test_files_of_exited_processes_are_folded_into_the_retired_totals(self):
+        metrics.COMMAND_ROWS.inc(2, command='sync_fixtures', operation='matches_updated')
+        metrics.registry.flush(force=True)
+        exited = {'survivor_command_rows_total': [[['sync_fixtures', 'matches_updated'], 5]]}
+        with open(os.path.join(self.metrics_dir.name, 'metrics-999999-1.json'), 'w') as f:
+            json.dump(exited, f)
+        with open(os.path.join(self.metrics_dir.name, f'metrics-{os.getppid()}-1.json'), 'w') as f:
+            json.dump(exited, f)
+
+        expected = 'survivor_command_rows_total{command="sync_fixtures",operation="matches_updated"} 12'
+        self.assertIn(expected, self.scrape())
+        self.assertEqual(
+            sorted(name for name in os.listdir(self.metrics_dir.name) if name.endswith('.json')),
+            sorted([metrics.RETIRED_FILE, metrics.registry._own_file(), f'metrics-{os.getppid()}-1.json']),
+        )
+
+        # This process exits: its numbers move to the retired totals too
+        metrics.registry.retire()
+        self.assertFalse(os.path.exists(os.path.join(self.metrics_dir.name, metrics.registry._own_file())))
+        metrics.registry.reset()
+        self.assertIn(expected, self.scrape())
+
+    def test_api_client_counts_requests_and_rate_limits(self):
+        rate_limited = mock.Mock(status_code=429, text='Too Many Requests')
+        ok = mock.Mock(status_code=200)
+        ok.json.return_value = {'teams': []}
+
+        with mock.patch('survivor.services.football_api.requests.get', side_effect=[rate_limited, ok]), \
+                mock.patch('survivor.services.football_api.time.sleep') as sleep:
+            FootballDataAPI().get_teams()
+
+        sleep.assert_called_once_with(60)
+        body = self.scrape()
+        self.assertIn(
+            'survivor_api_requests_total{endpoint="competitions/{id}/teams",status="429"} 1',
+            body
+        )
+        self.assertIn(
+            'survivor_api_requests_total{endpoint="competitions/{id}/teams",status="200"} 1',
+            body
+        )
+        self.assertIn('survivor_api_rate_limited_total{endpoint="competitions/{id}/teams"} 1', body)
+        self.assertIn('survivor_api_rate_limit_waits_total{reason="http_429"} 1', body)
+        self.assertIn('survivor_api_rate_limit_wait_seconds_total{reason="http_429"} 60', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+
+class PoolStandingsCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.season = Season.objects.create(
+            year='2025-26', is_active=True,
+            start_date=date(2025, 8, 1), end_date=date(2026, 5, 31)
+        )
+        self.owner = User.objects.create_user('owner', password='pass')
+        self.pool = GamePool.objects.create(name='Office', season=self.season, created_by=self.owner)
+        PlayerEntry.objects.create(user=self.owner, pool=self.pool)
+        self.pool.refresh_from_db()
+
+    def test_repeated_reads_do_not_query(self):
+        get_pool_standings(self.pool)
+        with self.assertNumQueries(0):
+            standings = get_pool_standings(self.pool)
+        self.assertEqual(standings['total_count'], 1)
+        self.assertIn('owner', standings['html'])
+
+    def test_joining_bumps_the_version(self):
+        get_pool_standings(self.pool)
+        newcomer = User.objects.create_user('newcomer', password='pass')
+        self.client.force_login(newcomer)
+        self.client.post(reverse('survivor:join_pool', args=[self.pool.id]))
+
+        self.pool.refresh_from_db()
+        standings = get_pool_standings(self.pool)
+        self.assertEqual(standings['total_count'], 2)
+        self.assertIn('newcomer', standings['html'])
+
+    def test_elimination_bumps_the_version(self):
+        rival = PlayerEntry.objects.create(user=User.objects.create_user('zed', password='pass'), pool=self.pool)
+        home = Team.objects.create(name='Bayern Munich', short_name='FCB')
+        away = Team.objects.create(name='Borussia Dortmund', short_name='BVB')
+        kickoff = timezone.now() + timedelta(days=1)
+        matchday = Matchday.objects.create(
+            season=self.season, number=1, start_date=kickoff, end_date=kickoff + timedelta(days=1)
+        )
+        Pick.objects.create(player_entry=PlayerEntry.objects.get(user=self.owner), matchday=matchday, team=home)
+        Pick.objects.create(player_entry=rival, matchday=matchday, team=away)
+        # The match is played: the home team loses
+        kickoff -= timedelta(days=2)
+        Matchday.objects.filter(pk=matchday.pk).update(start_date=kickoff, end_date=kickoff + timedelta(days=1))
+        Match.objects.create(
+            matchday=matchday, home_team=home, away_team=away, kickoff=kickoff, home_score=0, away_score=1
+        )
+        self.pool.refresh_from_db()
+        html = get_pool_standings(self.pool)['html']
+        self.assertLess(html.index('owner'), html.index('zed'))
+        version = self.pool.standings_version
+
+        call_command('process_results', stdout=StringIO())
+
+        self.pool.refresh_from_db()
+        self.assertGreater(self.pool.standings_version, version)
+        standings = get_pool_standings(self.pool)
+        self.assertEqual(standings['active_count'], 1)
+        self.assertLess(standings['html'].index('zed'), standings['html'].index('owner'))
+
+
+@override_settings(STANDINGS_PAGE_SIZE=25)
+class StandingsPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        self.generator = ScaleDataGenerator(pools=1, entries_per_pool=110, played=4, seed=23)
+        self.generator.generate()
+        self.pool = GamePool.objects.get(season=self.generator.season)
+        self.expected = list(
+            PlayerEntry.objects.filter(pool=self.pool)
+            .order_by('is_eliminated', '-eliminated_matchday__number', 'user__username')
+            .values_list('id', flat=True)
+        )
+
+    def test_keyset_pages_walk_the_standings(self):
+        seen, cursor = [], None
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                entries, cursor = standings_page(self.pool, cursor)
+            self.assertEqual(len(queries.captured_queries), 1)
+            seen.extend(entry.id for entry in entries)
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(entries[-1].position, 110)
+
+        username = PlayerEntry.objects.get(id=self.expected[-1]).username
+        matches, _ = standings_page(self.pool, prefix=username[:-1])
+        self.assertIn(self.expected[-1], [entry.id for entry in matches])
+        self.assertTrue(all(entry.username.startswith(username[:-1]) for entry in matches))
+
+    def test_pool_detail_renders_one_page(self):
+        entry = PlayerEntry.objects.select_related('user').get(id=self.expected[0])
+        self.client.force_login(entry.user)
+        response = self.client.get(reverse('survivor:pool_detail', args=[self.pool.id]))
+        self.assertEqual(response.context['total_players_count'], 110)
+        self.assertEqual(response.content.decode().count('<tr data-user-id='), 25)
+
+        rows_url = reverse('survivor:pool_standings_rows', args=[self.pool.id])
+        more = response.content.decode().split('data-next="')[1].split('"')[0].replace('&amp;', '&')
+        self.assertTrue(more.startswith(rows_url))
+        page = self.client.get(more).content.decode()
+        self.assertEqual(page.count('<tr data-user-id='), 25)
+        self.assertIn(f'data-user-id="{PlayerEntry.objects.get(id=self.expected[25]).user_id}"', page)
+
+
+class PickDistributionTests(TestCase):
+
+    def setUp(self):
+        season = Season.objects.create(
+            year='2025-26', is_active=True,
+            start_date=date(2025, 8, 1), end_date=date(2026, 5, 31)
+        )
+        start = timezone.now() + timedelta(days=2)
+        self.matchday = Matchday.objects.create(
+            season=season, number=1, start_date=start, end_date=start + timedelta(days=3)
+        )
+        self.bayern = Team.objects.create(name='Bayern Munich', short_name='FCB')
+        self.dortmund = Team.objects.create(name='Borussia Dortmund', short_name='BVB')
+        owner = User.objects.create_user('owner', password='pass')
+        self.pools = [
+            GamePool.objects.create(name=name, season=season, created_by=owner)
+            for name in ('Office', 'Family')
+        ]
+        self.entries = [PlayerEntry.objects.create(user=owner, pool=pool) for pool in self.pools]
+
+    def test_counts_follow_created_and_changed_picks(self):
+        pick = Pick.objects.create(player_entry=self.entries[0], matchday=self.matchday, team=self.bayern)
+        Pick.objects.create(player_entry=self.entries[1], matchday=self.matchday, team=self.bayern)
+        self.assertEqual(get_pick_counts(self.matchday), {self.bayern.id: 2})
+        self.assertEqual(get_pick_counts(self.matchday, self.pools[0]), {self.bayern.id: 1})
+
+        pick.team = self.dortmund
+        pick.save()
+        self.assertEqual(get_pick_counts(self.matchday), {self.bayern.id: 1, self.dortmund.id: 1})
+        self.assertEqual(get_pick_counts(self.matchday, self.pools[0]), {self.bayern.id: 0, self.dortmund.id: 1})
+
+        # Moving the pick to another matchday moves its count with it
+        later = Matchday.objects.create(
+            season=self.matchday.season, number=2,
+            start_date=self.matchday.start_date + timedelta(days=7),
+            end_date=self.matchday.end_date + timedelta(days=7),
+        )
+        pick.matchday = later
+        pick.save()
+        self.assertEqual(get_pick_counts(self.matchday), {self.bayern.id: 1, self.dortmund.id: 0})
+        self.assertEqual(get_pick_counts(later), {self.dortmund.id: 1})
+
+    def test_distribution_is_recounted_once_picks_lock(self):
+        Pick.objects.create(player_entry=self.entries[0], matchday=self.matchday, team=self.bayern)
+        # Simulate drift, then pass the deadline
+        PickDistribution.objects.all().delete()
+        Matchday.objects.filter(pk=self.matchday.pk).update(start_date=timezone.now() - timedelta(hours=1))
+        self.matchday.refresh_from_db()
+
+        self.assertEqual(get_pick_counts(self.matchday), {self.bayern.id: 1})
+        self.assertTrue(self.matchday.pick_distribution_final)
+        with self.assertNumQueries(1):
+            get_pick_counts(self.matchday)
+
+
+class PickHistoryQueryTests(TestCase):
+    """pick_history must run a fixed number of queries however many picks exist"""
+
+    def setUp(self):
+        season = Season.objects.create(
+            year='2025-26', is_active=True,
+            start_date=date(2025, 8, 1), end_date=date(2026, 5, 31)
+        )
+        self.teams = [
+            Team.objects.create(name=f'Team {i}', short_name=f'T{i:02d}') for i in range(18)
+        ]
+        invalidate_team_registry()
+        get_team_registry()
+        self.matchdays = []
+        kickoff = timezone.now() - timedelta(days=100)
+        for number in range(1, 11):
+            matchday = Matchday.objects.create(
+                season=season, number=number,
+                start_date=kickoff, end_date=kickoff + timedelta(days=2)
+            )
+            for i in range(0, 18, 2):
+                Match.objects.create(
+                    matchday=matchday, home_team=self.teams[i], away_team=self.teams[i + 1],
+                    kickoff=kickoff, home_score=1, away_score=0
+                )
+            self.matchdays.append(matchday)
+            kickoff += timedelta(days=7)
+
+        self.user = User.objects.create_user('player', password='pass')
+        pool = GamePool.objects.create(name='Office', season=season, created_by=self.user)
+        self.entry = PlayerEntry.objects.create(user=self.user, pool=pool)
+        self.url = reverse('survivor:pick_history', args=[pool.id])
+        self.client.force_login(self.user)
+
+    def add_picks(self, count):
+        # Past matchdays cannot be picked through Pick.save, so insert directly
+        Pick.objects.bulk_create(
+            Pick(
+                player_entry=self.entry, matchday=matchday,
+                team=self.teams[(matchday.number * 2) % 18], is_successful=True
+            )
+            for matchday in self.matchdays[len(self.entry.picks.all()):count]
+        )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_is_constant(self):
+        self.add_picks(1)
+        baseline, _ = self.count_queries()
+
+        self.add_picks(10)
+        queries, response = self.count_queries()
+        self.assertEqual(queries, baseline)
+
+        stats = response.context['stats']
+        self.assertEqual(stats['total_picks'], 10)
+        self.assertEqual(stats['successful_picks'], 10)
+        self.assertEqual(stats['unique_teams'], 9)
+        first = response.context['picks_with_matches'][0]
+        self.assertEqual(first['opponent'], self.teams[3])
+        self.assertTrue(first['was_home'])
+
+
+class SeasonCalendarTests(TestCase):
+
+    def setUp(self):
+        self.season = Season.objects.create(
+            year='2025-26', is_active=True,
+            start_date=date(2025, 8, 1), end_date=date(2026, 5, 31)
+        )
+        self.now = timezone.now()
+        self.matchdays = {}
+        # Matchday 3 was moved ahead of matchday 2
+        for number, offset in ((1, -20), (2, 10), (3, -2), (4, 17)):
+            start = self.now + timedelta(days=offset)
+            self.matchdays[number] = Matchday.objects.create(
+                season=self.season, number=number,
+                start_date=start, end_date=start + timedelta(days=3)
+            )
+        invalidate_calendar()
+
+    def test_lookups_follow_numbers_not_dates(self):
+        calendar = SeasonCalendar(self.season, list(self.matchdays.values()))
+
+        self.assertEqual(calendar.current(self.now).number, 3)
+        self.assertEqual(calendar.next(self.now).number, 2)
+        self.assertEqual([md.number for md in calendar.past(self.now)], [1])
+        self.assertEqual([md.number for md in calendar.in_progress(self.now)], [3])
+        self.assertEqual([md.number for md in calendar.future(self.now)], [2, 4])
+
+    def test_cached_calendar_needs_no_queries(self):
+        get_season_calendar(self.season.id)
+        with self.assertNumQueries(0):
+            calendar = get_season_calendar(self.season.id)
+            self.assertEqual(calendar.next().number, 2)
+
+    def test_invalidation_reloads_the_schedule(self):
+        self.assertEqual(get_season_calendar(self.season.id).next().number, 2)
+        Matchday.objects.filter(number=2).update(start_date=self.now - timedelta(days=1))
+        invalidate_calendar()
+        self.assertEqual(get_season_calendar(self.season.id).next().number, 4)
+
+
+class FixtureGridCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        season = Season.objects.create(
+            year='2025-26', is_active=True,
+            start_date=date(2025, 8, 1), end_date=date(2026, 5, 31)
+        )
+        home = Team.objects.create(name='Bayern Munich', short_name='FCB')
+        away = Team.objects.create(name='Borussia Dortmund', short_name='BVB')
+        start = timezone.now() - timedelta(days=7)
+        self.completed = Matchday.objects.create(
+            season=season, number=1, start_date=start, end_date=start + timedelta(days=2),
+            is_complete=True
+        )
+        self.upcoming = Matchday.objects.create(
+            season=season, number=2, start_date=start + timedelta(days=14),
+            end_date=start + timedelta(days=16)
+        )
+        self.result = Match.objects.create(
+            matchday=self.completed, home_team=home, away_team=away,
+            kickoff=start, home_score=2, away_score=1
+        )
+        self.fixture = Match.objects.create(
+            matchday=self.upcoming, home_team=away, away_team=home,
+            kickoff=start + timedelta(days=14)
+        )
+
+    def test_grid_is_served_from_cache(self):
+        with self.assertNumQueries(1):
+            grid = get_fixture_grid([self.completed, self.upcoming])
+        self.assertEqual(grid[0]['matches'][0]['result'], 'HOME')
+        self.assertEqual(grid[1]['matches'][0]['home_team']['short_name'], 'BVB')
+
+        with self.assertNumQueries(0):
+            get_fixture_grid([self.completed, self.upcoming])
+
+    def test_sync_only_rebuilds_open_matchdays(self):
+        get_fixture_grid([self.completed, self.upcoming])
+        Match.objects.filter(pk=self.fixture.pk).update(kickoff=self.fixture.kickoff + timedelta(hours=2))
+        invalidate_calendar()
+
+        with CaptureQueriesContext(connection) as queries:
+            grid = get_fixture_grid([self.completed, self.upcoming])
+        self.assertEqual(len(queries), 1)
+        self.assertIn(f'IN ({self.upcoming.id})', queries[0]['sql'])
+        self.assertEqual(grid[1]['matches'][0]['kickoff'], self.fixture.kickoff + timedelta(hours=2))
+
+    def test_corrected_result_replaces_the_kept_matchday(self):
+        get_fixture_grid([self.completed, self.upcoming])
+        invalidate_team_registry()
+        payload = benchmark.recorded_matches_payload(self.completed.season, {self.result.id: (2, 2)})
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(payload, f)
+            f.flush()
+            call_command('sync_fixtures', '--from-file', f.name, '--season', '2025', stdout=StringIO())
+
+        grid = get_fixture_grid([self.completed, self.upcoming])
+        self.assertEqual(grid[0]['matches'][0]['away_score'], 2)
+        self.assertEqual(grid[0]['matches'][0]['result'], 'DRAW')
+
+
+class TeamRegistryTests(TestCase):
+
+    def setUp(self):
+        self.bayern = Team.objects.create(name='Bayern Munich', short_name='FCB')
+        invalidate_team_registry()
+
+    def test_lookups_need_no_queries_once_loaded(self):
+        get_team_registry()
+        with self.assertNumQueries(0):
+            registry = get_team_registry()
+            self.assertEqual(registry.by_id[self.bayern.id], self.bayern)
+            self.assertEqual(registry.by_short_name['FCB'], self.bayern)
+            self.assertEqual(registry.by_api_name['FC Bayern München'], self.bayern)
+
+    def test_load_teams_invalidates_the_registry(self):
+        self.assertEqual(len(get_team_registry()), 1)
+        call_command('load_teams', stdout=StringIO())
+        self.assertEqual(len(get_team_registry()), 18)
+
+
+class TeamMapperTests(TestCase):
+
+    def setUp(self):
+        Team.objects.create(name='St. Pauli', short_name='STP')
+        invalidate_team_registry()
+        TeamMapper.misses.clear()
+
+    def test_exact_alias_and_normalized_names(self):
+        self.assertEqual(TeamMapper.get_team_name('FC Bayern München'), 'Bayern Munich')
+        self.assertEqual(TeamMapper.get_api_name('Bayern Munich'), 'FC Bayern München')
+        # Not in the alias table, but normalizes to a known team
+        self.assertEqual(TeamMapper.get_team_name('FC St. Pauli 1910'), 'St. Pauli')
+        self.assertEqual(TeamMapper.get_team_name('Bayer Leverkusen'), 'Bayer Leverkusen')
+        self.assertFalse(TeamMapper.misses)
+
+    def test_misses_are_counted(self):
+        TeamMapper.get_team_name('Hamburger SV')
+        TeamMapper.get_team_name('Hamburger SV')
+        self.assertEqual(TeamMapper.misses['Hamburger SV'], 2)
+
+    def test_new_alias_is_picked_up_after_invalidation(self):
+        TeamAlias.objects.create(name='HSV', team_name='Hamburg')
+        invalidate_team_registry()
+        self.assertEqual(TeamMapper.get_team_name('HSV'), 'Hamburg')
+
+
+class QueryPlanTests(TestCase):
+    """
+    The hot queries must stay on an index once the tables are large.
+
+    Runs against whatever database the suite uses (SQLite locally, Postgres
+    when DATABASE_URL points at one) and fails if a plan falls back to a
+    full scan of the queried table.
+    """
+
+    POOLS = 20
+    ENTRIES_PER_POOL = 50
+    PICKED_MATCHDAYS = 10
+    # Late in the season almost every match is played and processed
+    PLAYED_MATCHDAYS = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        season = Season.objects.create(
+            year='2025-26', is_active=True,
+            start_date=date(2025, 8, 1), end_date=date(2026, 5, 31)
+        )
+        teams = Team.objects.bulk_create(
+            Team(name=f'Team {i}', short_name=f'T{i:02d}') for i in range(18)
+        )
+        start = timezone.now() - timedelta(weeks=cls.PLAYED_MATCHDAYS)
+        matchdays = Matchday.objects.bulk_create(
+            Matchday(
+                season=season, number=n + 1, start_date=start + timedelta(weeks=n),
+                end_date=start + timedelta(weeks=n, days=3), is_complete=n < cls.PLAYED_MATCHDAYS
+            )
+            for n in range(34)
+        )
+        Match.objects.bulk_create(
+            Match(
+                matchday=matchday, home_team=teams[i], away_team=teams[17 - i],
+                kickoff=matchday.start_date + timedelta(hours=i),
+                result='HOME' if n < cls.PLAYED_MATCHDAYS else None,
+                is_processed=n < cls.PLAYED_MATCHDAYS - 1,
+            )
+            for n, matchday in enumerate(matchdays) for i in range(9)
+        )
+        users = User.objects.bulk_create(
+            User(username=f'user{i}') for i in range(cls.POOLS * cls.ENTRIES_PER_POOL)
+        )
+        cls.pools = GamePool.objects.bulk_create(
+            GamePool(name=f'Pool {i}', season=season, created_by=users[0]) for i in range(cls.POOLS)
+        )
+        entries = PlayerEntry.objects.bulk_create(
+            PlayerEntry(user=user, pool=cls.pools[i % cls.POOLS], is_eliminated=i % 3 == 0)
+            for i, user in enumerate(users)
+        )
+        # Consecutive teams, so no entry picks a team more than once
+        Pick.objects.bulk_create(
+            Pick(
+                player_entry=entry, matchday=matchdays[n], team=teams[(i + n) % 18],
+                is_successful=True if n < cls.PICKED_MATCHDAYS - 1 else None,
+            )
+            for i, entry in enumerate(entries) for n in range(cls.PICKED_MATCHDAYS)
+        )
+        cls.matchday = matchdays[cls.PICKED_MATCHDAYS - 1]
+        cls.entry = entries[0]
+        cls.team = teams[0]
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, table):
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            # "SCAN <table>" reads every row; "SEARCH" seeks an index and
+            # "SCAN <table> USING INDEX" walks one (e.g. a partial index)
+            full_scan = any(
+                line.split(' ', 3)[-1].strip() == f'SCAN {table}' for line in plan.splitlines()
+            )
+        elif connection.vendor == 'postgresql':
+            full_scan = f'Seq Scan on {table}' in plan
+        else:
+            self.skipTest(f'No plan check for {connection.vendor}')
+        self.assertFalse(full_scan, f'Full scan of {table}:\n{plan}')
+
+    def test_unprocessed_picks_of_a_matchday(self):
+        self.assertUsesIndex(
+            Pick.objects.filter(matchday=self.matchday, is_successful__isnull=True),
+            'survivor_pick'
+        )
+
+    def test_team_pick_count_of_an_entry(self):
+        self.assertUsesIndex(
+            Pick.objects.filter(player_entry=self.entry, team=self.team).order_by(),
+            'survivor_pick'
+        )
+
+    def test_active_players_of_a_pool(self):
+        self.assertUsesIndex(
+            PlayerEntry.objects.filter(pool=self.pools[0], is_eliminated=False).order_by(),
+            'survivor_playerentry'
+        )
+
+    def test_upcoming_matches(self):
+        self.assertUsesIndex(
+            Match.objects.filter(
+                kickoff__gte=timezone.now(), result__isnull=True
+            ).order_by('kickoff')[:5],
+            'survivor_match'
+        )
+
+    def test_fixture_grid_matches(self):
+        self.assertUsesIndex(
+            Match.objects.filter(matchday_id__in=[self.matchday.id]).order_by('kickoff'),
+            'survivor_match'
+        )
+
+    def test_unprocessed_matches_with_results(self):
+        self.assertUsesIndex(
+            Match.objects.filter(result__isnull=False, is_processed=False),
+            'survivor_match'
+        )
+
+
+class ScaleDataTests(TestCase):
+
+    def setUp(self):
+        call_command('load_teams', stdout=StringIO())
+
+    def test_scale_data_follows_the_game_rules(self):
+        call_command(
+            'create_test_data', '--scale', '--pools', '4', '--entries-per-pool', '10',
+            '--played', '6', stdout=StringIO()
+        )
+        self.assertEqual(PlayerEntry.objects.count(), 40)
+        self.assertFalse(
+            Pick.objects.values('player_entry', 'team').annotate(
+                picks=Count('id')
+            ).filter(picks__gt=2).exists()
+        )
+        for entry in PlayerEntry.objects.filter(is_eliminated=True).select_related('eliminated_matchday'):
+            last_pick = entry.picks.order_by('-matchday__number').first()
+            self.assertEqual(last_pick.matchday_id, entry.eliminated_matchday_id)
+            self.assertFalse(last_pick.is_successful)
+        self.assertEqual(
+            PickDistribution.objects.filter(pool=None).aggregate(total=Sum('count'))['total'],
+            Pick.objects.count()
+        )
+
+
+class BenchmarkHelperTests(TestCase):
+
+    def test_percentiles_and_regressions(self):
+        summary = benchmark.summarize([i / 1000 for i in range(1, 101)], [3, 5], wall_time=2.0)
+        self.assertEqual((summary['p50_ms'], summary['p95_ms'], summary['p99_ms']), (50.0, 95.0, 99.0))
+        self.assertEqual(summary['queries'], 4.0)
+        self.assertEqual(summary['throughput_rps'], 50.0)
+
+        baseline = {'home': {'p95_ms': 100.0, 'queries': 4, 'throughput_rps': 50.0}}
+        current = {'home': {'p95_ms': 110.0, 'queries': 5, 'throughput_rps': 30.0}}
+        regressions = benchmark.compare(
+            current, baseline, 0.2,
+            higher_is_worse=('p95_ms', 'queries'), lower_is_worse=('throughput_rps',)
+        )
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('home: queries 4 -> 5'))
+
+
+class RecordedMatchNightTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        self.generator = ScaleDataGenerator(pools=2, entries_per_pool=5, played=0, seed=1)
+        self.generator.generate()
+
+    def test_replayed_results_are_processed_for_every_match(self):
+        matchday = Matchday.objects.get(season=self.generator.season, number=1)
+        scores = {match_id: (1, 0) for match_id in matchday.matches.values_list('id', flat=True)}
+        payload = benchmark.recorded_matches_payload(self.generator.season, scores)
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(payload, f)
+            f.flush()
+            call_command('sync_fixtures', '--from-file', f.name, '--season', '2030', stdout=StringIO())
+
+        self.assertEqual(matchday.matches.filter(result='HOME', is_processed=False).count(), 9)
+        self.assertEqual(LiveEvent.objects.filter(kind='score', matchday=matchday).count(), 9)
+        with self.captureOnCommitCallbacks() as callbacks:
+            call_command('process_results', stdout=StringIO())
+        # The completed matchday is announced to other processes only once committed
+        self.assertIn(invalidate_calendar, callbacks)
+        self.assertFalse(Pick.objects.filter(matchday=matchday, is_successful__isnull=True).exists())
+        self.assertEqual(matchday.matches.filter(is_processed=True).count(), 9)
+
+        # Live events: one per pool that lost players, and the completed matchday
+        eliminated = PlayerEntry.objects.filter(eliminated_matchday=matchday)
+        events = LiveEvent.objects.filter(kind='elimination')
+        self.assertEqual(events.count(), eliminated.values('pool').distinct().count())
+        self.assertEqual(sum(len(event.payload['eliminated']) for event in events), eliminated.count())
+        self.assertTrue(LiveEvent.objects.filter(kind='matchday_complete', matchday=matchday).exists())
+
+
+class SimulationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        self.generator = ScaleDataGenerator(pools=1, entries_per_pool=6, played=0, seed=3)
+        self.generator.generate()
+        self.pool = GamePool.objects.get(season=self.generator.season)
+
+    def test_home_teams_always_winning(self):
+        matches = Match.objects.filter(matchday__season=self.generator.season)
+        probabilities = {match.id: (1.0, 0.0, 0.0) for match in matches}
+        model, forecasts = simulate_pool(self.pool, trials=200, seed=1, probabilities=probabilities)
+
+        # Matchday 1 picks are locked: only entries that picked a home team survive it
+        home_teams = set(matches.filter(matchday__number=1).values_list('home_team_id', flat=True))
+        for forecast in forecasts:
+            pick = Pick.objects.get(player_entry_id=forecast.player_entry_id, matchday__number=1)
+            self.assertEqual(forecast.survive_next, 1.0 if pick.team_id in home_teams else 0.0)
+        self.assertAlmostEqual(sum(f.win_probability for f in forecasts), 1.0)
+        self.assertEqual(SurvivalForecast.objects.filter(player_entry__pool=self.pool).count(), 6)
+
+    def test_pool_detail_shows_the_forecast(self):
+        simulate_pool(self.pool, trials=100, seed=1)
+        entry = PlayerEntry.objects.filter(pool=self.pool).select_related('user').first()
+        self.client.force_login(entry.user)
+        response = self.client.get(reverse('survivor:pool_detail', args=[self.pool.id]))
+        self.assertContains(response, 'Survival Odds')
+
+
+class PickPlannerTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        self.generator = ScaleDataGenerator(pools=1, entries_per_pool=2, played=0, seed=5)
+        self.generator.generate()
+        self.entry = PlayerEntry.objects.filter(pool__season=self.generator.season).select_related(
+            'user', 'pool__season'
+        ).first()
+
+    def test_assignment_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        for rows, cols in [(3, 3), (4, 6), (5, 7)]:
+            cost = rng.random((rows, cols))
+            assignment = solve_assignment(cost)
+            self.assertEqual(len(set(assignment)), rows)
+            best = min(
+                sum(cost[r, c] for r, c in enumerate(columns))
+                for columns in itertools.permutations(range(cols), rows)
+            )
+            self.assertAlmostEqual(cost[np.arange(rows), assignment].sum(), best)
+
+    def test_full_season_plan_respects_the_two_pick_limit(self):
+        started = time.perf_counter()
+        plan = get_pick_plan(self.entry)
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+        self.assertEqual(len(plan['matchdays']), 34)
+        self.assertTrue(plan['matchdays'][0]['locked'])
+        usage = Counter(row['team_id'] for row in plan['matchdays'])
+        self.assertLessEqual(max(usage.values()), 2)
+        self.assertAlmostEqual(
+            plan['survival'], math.prod(row['probability'] for row in plan['matchdays'])
+        )
+
+        # Cached until the picks change
+        with self.assertNumQueries(1):
+            self.assertEqual(get_pick_plan(self.entry), plan)
+        matchday = Matchday.objects.get(season=self.generator.season, number=2)
+        Pick.objects.update_or_create(
+            player_entry=self.entry, matchday=matchday, defaults={'team_id': plan['matchdays'][1]['team_id']}
+        )
+        self.assertEqual(get_pick_plan(self.entry)['matchdays'][1]['current_team_id'], plan['matchdays'][1]['team_id'])
+
+    def test_plan_page(self):
+        self.client.force_login(self.entry.user)
+        response = self.client.get(reverse('survivor:pick_plan', args=[self.entry.pool_id]))
+        self.assertContains(response, 'Plan Your Picks')
+        self.assertEqual(len(response.context['rows']), 34)
+
+
+class RatingEngineTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        self.generator = ScaleDataGenerator(pools=1, entries_per_pool=2, played=0, seed=9)
+        self.generator.generate()
+        self.season = self.generator.season
+
+    def test_probabilities_and_updates(self):
+        home, draw, away = outcome_probabilities(1500, 1500, home_advantage=0)
+        self.assertAlmostEqual(home + draw + away, 1.0)
+        self.assertAlmostEqual(home, away)
+        self.assertAlmostEqual(draw, 0.75 / 2.75)
+
+        new_home, new_away = rate_match(1500, 1500, 3, 0)
+        self.assertGreater(new_home, 1500)
+        self.assertAlmostEqual(new_home + new_away, 3000)
+
+    def test_process_results_rates_matches_without_picks(self):
+        Pick.objects.filter(matchday__season=self.season).delete()
+        matches = Match.objects.filter(matchday__season=self.season, matchday__number=1)
+        for i, match in enumerate(matches):
+            match.home_score, match.away_score = i % 3, 1
+            match.save()
+
+        call_command('process_results', stdout=StringIO())
+
+        self.assertFalse(matches.filter(is_processed=False).exists())
+        self.assertEqual(TeamRating.objects.filter(matchday__season=self.season).count(), 18)
+        ratings = dict(Team.objects.values_list('id', 'rating'))
+        self.assertNotEqual(len(set(ratings.values())), 1)
+        upcoming = Match.objects.filter(matchday__season=self.season, matchday__number=2).first()
+        self.assertAlmostEqual(
+            upcoming.home_win_probability,
+            outcome_probabilities(ratings[upcoming.home_team_id], ratings[upcoming.away_team_id])[0]
+        )
+
+        # Nothing is rated twice, and a replay gives the same ratings
+        call_command('process_results', stdout=StringIO())
+        self.assertEqual(dict(Team.objects.values_list('id', 'rating')), ratings)
+        call_command('rebuild_ratings', '--season', self.season.year, stdout=StringIO())
+        for team_id, rating in Team.objects.values_list('id', 'rating'):
+            self.assertAlmostEqual(rating, ratings[team_id])
+
+        # The pick grid shows the rated chance of not losing
+        entry = PlayerEntry.objects.filter(pool__season=self.season).select_related('user').first()
+        self.client.force_login(entry.user)
+        response = self.client.get(reverse('survivor:pool_detail', args=[entry.pool_id]))
+        self.assertContains(response, 'not to lose')
+
+    def test_full_sync_does_not_rate_processed_matches_again(self):
+        matchday = Matchday.objects.get(season=self.season, number=1)
+        scores = {match_id: (2, 0) for match_id in matchday.matches.values_list('id', flat=True)}
+
+        def sync():
+            payload = benchmark.recorded_matches_payload(self.season, scores)
+            with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+                json.dump(payload, f)
+                f.flush()
+                call_command(
+                    'sync_fixtures', '--from-file', f.name, '--season', self.season.year[:4], stdout=StringIO()
+                )
+
+        sync()
+        call_command('process_results', stdout=StringIO())
+        ratings = dict(Team.objects.values_list('id', 'rating'))
+
+        sync()
+        self.assertFalse(matchday.matches.filter(is_processed=False).exists())
+        call_command('process_results', stdout=StringIO())
+        self.assertEqual(dict(Team.objects.values_list('id', 'rating')), ratings)
+
+        # A corrected score replays the season rather than rating the match twice
+        scores[min(scores)] = (0, 3)
+        sync()
+        corrected = dict(Team.objects.values_list('id', 'rating'))
+        self.assertNotEqual(corrected, ratings)
+        call_command('process_results', stdout=StringIO())
+        call_command('rebuild_ratings', '--season', self.season.year, stdout=StringIO())
+        for team_id, rating in Team.objects.values_list('id', 'rating'):
+            self.assertAlmostEqual(rating, corrected[team_id])
+
+
+class StandingsSnapshotTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        self.generator = ScaleDataGenerator(pools=2, entries_per_pool=20, played=4, seed=11)
+        self.generator.generate()
+        self.pool = GamePool.objects.filter(season=self.generator.season).first()
+
+    def test_bitset_round_trip(self):
+        ids = [17, 18, 40, 1000]
+        base, data = encode_ids(ids)
+        self.assertEqual(base, 17)
+        self.assertEqual(len(data), (1000 - 17) // 8 + 1)
+        self.assertEqual(decode_ids(base, data).tolist(), ids)
+        self.assertEqual(decode_ids(*encode_ids([])).tolist(), [])
+
+    def test_backfilled_snapshots_match_eliminations(self):
+        call_command('build_standings_snapshots', '--season', self.generator.season.year, stdout=StringIO())
+        entries = PlayerEntry.objects.filter(pool=self.pool).select_related('eliminated_matchday')
+        for number in range(1, 5):
+            snapshot = StandingsSnapshot.objects.get(pool=self.pool, matchday__number=number)
+            expected = sorted(
+                entry.id for entry in entries
+                if not entry.is_eliminated or entry.eliminated_matchday.number > number
+            )
+            self.assertEqual(snapshot.survivor_ids().tolist(), expected)
+            self.assertEqual(snapshot.total_count, 20)
+
+        # Append-only: a second run writes nothing
+        self.assertEqual(
+            write_matchday_snapshots(Matchday.objects.get(season=self.generator.season, number=1)), 0
+        )
+
+        entry = entries.first()
+        self.client.force_login(entry.user)
+        response = self.client.get(reverse('survivor:standings_as_of', args=[self.pool.id, 2]))
+        self.assertContains(response, 'Standings after Matchday 2')
+        self.assertEqual(len(response.context['curve']), 4)
+
+    def test_process_results_snapshots_completed_matchdays(self):
+        matchday = Matchday.objects.get(season=self.generator.season, number=5)
+        for match in matchday.matches.all():
+            match.home_score, match.away_score = 1, 0
+            match.save()
+        call_command('process_results', stdout=StringIO())
+        snapshot = StandingsSnapshot.objects.get(pool=self.pool, matchday=matchday)
+        self.assertEqual(
+            snapshot.alive_count,
+            PlayerEntry.objects.filter(pool=self.pool, is_eliminated=False).count()
+        )
+
+
+class PoolAnalyticsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        self.generator = ScaleDataGenerator(pools=1, entries_per_pool=30, played=5, seed=13)
+        self.generator.generate()
+        self.pool = GamePool.objects.get(season=self.generator.season)
+
+    def test_analytics_match_the_picks(self):
+        analytics = get_pool_analytics(self.pool)
+        self.assertEqual(analytics['through_matchday'], 5)
+        for point in analytics['survivors']:
+            knocked_out = Pick.objects.filter(
+                is_successful=False, matchday__number__lte=point['matchday']
+            ).values('player_entry_id')
+            self.assertEqual(
+                point['alive'],
+                PlayerEntry.objects.filter(pool=self.pool).exclude(id__in=knocked_out).count()
+            )
+
+        failed = Pick.objects.filter(player_entry__pool=self.pool, is_successful=False)
+        self.assertEqual(sum(item['eliminations'] for item in analytics['elimination_by_team']), failed.count())
+        top = failed.values('matchday__number', 'team__name').annotate(n=Count('id')).order_by('-n').first()
+        self.assertEqual(analytics['losing_picks'][0]['eliminated'], top['n'])
+
+        entry = PlayerEntry.objects.filter(pool=self.pool).first()
+        self.assertEqual(
+            [number for number, _, _ in analytics['paths'][entry.id]['picks']],
+            list(entry.picks.filter(matchday__number__lte=5).order_by('matchday__number')
+                 .values_list('matchday__number', flat=True)),
+        )
+
+    def test_cached_page_and_json(self):
+        entry = PlayerEntry.objects.filter(pool=self.pool).select_related('user').first()
+        self.client.force_login(entry.user)
+        self.client.get(reverse('survivor:pool_analytics', args=[self.pool.id]))
+        # Warm cache: no pick scan
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('survivor:pool_analytics', args=[self.pool.id]))
+        self.assertContains(response, 'Survivors per Matchday')
+        self.assertFalse(any('survivor_pick' in query['sql'] for query in queries.captured_queries))
+
+        data = self.client.get(reverse('survivor:pool_analytics_json', args=[self.pool.id])).json()
+        self.assertEqual(data['entries'], 30)
+        self.assertEqual(len(data['paths']), 30)
+
+
+class PickCubeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        self.generator = ScaleDataGenerator(pools=3, entries_per_pool=10, played=3, seed=17)
+        self.generator.generate()
+        self.season = self.generator.season
+        self.pool = GamePool.objects.filter(season=self.season).first()
+
+    def test_cube_matches_picks(self):
+        cube = get_pick_cube(self.season)
+        # Matchdays 1-3 were played and matchday 4 is under way: all locked
+        self.assertEqual(cube.matchday_numbers, [1, 2, 3, 4])
+        for row in Pick.objects.filter(matchday__season=self.season).values(
+            'player_entry__pool', 'matchday__number', 'team'
+        ).annotate(n=Count('id')):
+            heat = cube.heatmap(row['player_entry__pool'])
+            self.assertEqual(heat[row['matchday__number'] - 1, cube.team_index[row['team']]], row['n'])
+
+        team_id = cube.team_ids[0]
+        self.assertEqual(
+            cube.team_series(team_id).sum(),
+            Pick.objects.filter(matchday__season=self.season, team_id=team_id).count()
+        )
+
+        # Rebuilding from the distributions gives the same cube
+        rebuilt = rebuild_pick_cube(self.season)
+        self.assertEqual(int(rebuilt.counts.sum()), int(cube.counts.sum()))
+
+    def test_heatmap_and_exports_do_not_read_picks(self):
+        user = PlayerEntry.objects.filter(pool=self.pool).select_related('user').first().user
+        self.client.force_login(user)
+        get_pick_cube(self.season)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('survivor:pick_heatmap'), {'pool': self.pool.id})
+            csv_response = self.client.get(reverse('survivor:pick_cube_csv'), {'pool': self.pool.id})
+            npz_response = self.client.get(reverse('survivor:pick_cube_npz'))
+        self.assertFalse(any('survivor_pick"' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(len(response.context['rows']), 4)
+
+        lines = csv_response.content.decode().strip().splitlines()
+        self.assertEqual(
+            sum(int(line.rsplit(',', 1)[1]) for line in lines[1:]),
+            Pick.objects.filter(player_entry__pool=self.pool).count()
+        )
+        with np.load(io.BytesIO(npz_response.content)) as arrays:
+            self.assertEqual(arrays['counts'].shape[0], 3)
+
+    def test_update_keeps_other_slices_and_invalidates_on_commit(self):
+        before = get_pick_cube(self.season).counts.copy()
+        matchday = Matchday.objects.get(season=self.season, number=2)
+        version = get_version('pick_cube')
+        with self.captureOnCommitCallbacks(execute=True):
+            update_pick_cube(matchday)
+            # Other processes only hear of it once it is committed
+            self.assertEqual(get_version('pick_cube'), version)
+        self.assertNotEqual(get_version('pick_cube'), version)
+        np.testing.assert_array_equal(get_pick_cube(self.season).counts, before)
+
+
+class LeaderboardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        self.generator = ScaleDataGenerator(pools=3, entries_per_pool=15, played=4, seed=19)
+        self.generator.generate()
+        call_command('rebuild_leaderboard', stdout=StringIO())
+
+    def board(self):
+        return list(LeaderboardEntry.objects.order_by('user_id').values_list(
+            'user_id', 'pools_entered', 'matchdays_survived', 'best_finish'
+        ))
+
+    def test_incremental_updates_match_a_rebuild(self):
+        self.assertEqual(
+            sum(row[2] for row in self.board()),
+            Pick.objects.filter(is_successful=True).count()
+        )
+
+        matchday = Matchday.objects.get(season=self.generator.season, number=5)
+        for match in matchday.matches.all():
+            match.home_score, match.away_score = 1, 0
+            match.save()
+        call_command('process_results', stdout=StringIO())
+        incremental = self.board()
+        rebuild_leaderboard()
+        self.assertEqual(incremental, self.board())
+
+        pool = GamePool.objects.filter(season=self.generator.season).first()
+        pool.deadline = timezone.now() + timedelta(days=1)
+        pool.save()
+        user = User.objects.create_user('latecomer', password='pw')
+        self.client.force_login(user)
+        self.client.post(reverse('survivor:join_pool', args=[pool.id]))
+        self.assertIn((user.id, 1, 0, None), self.board())
+
+    def test_keyset_pages_cover_the_board_in_order(self):
+        expected = list(
+            LeaderboardEntry.objects.order_by('-matchdays_survived', 'user_id').values_list('user_id', flat=True)
+        )
+        seen, cursor = [], None
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                rows, cursor = leaderboard_page(cursor, size=8)
+            self.assertEqual(len(queries.captured_queries), 1)
+            seen.extend(row.user_id for row in rows)
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(rows[-1].position, len(expected))
+
+        self.client.force_login(User.objects.get(id=expected[0]))
+        response = self.client.get(reverse('survivor:leaderboard'))
+        self.assertContains(response, 'Leaderboard')
+        self.assertEqual(len(response.context['rows']), len(expected))
+
+
+class MyPoolsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        # Ten users, each in all six pools
+        self.generator = ScaleDataGenerator(pools=6, entries_per_pool=10, users=10, played=3, seed=29)
+        self.generator.generate()
+        self.entry = PlayerEntry.objects.filter(is_eliminated=False).select_related('user').first()
+
+    def test_query_count_does_not_grow_with_pools(self):
+        pool = self.entry.pool
+        newcomer = User.objects.create_user('newcomer', password='pw')
+        PlayerEntry.objects.create(user=newcomer, pool=pool)
+
+        self.client.force_login(newcomer)
+        self.client.get(reverse('survivor:my_pools'))
+        with CaptureQueriesContext(connection) as one_pool:
+            response = self.client.get(reverse('survivor:my_pools'))
+        self.assertEqual(len(response.context['pools']), 1)
+
+        self.client.force_login(self.entry.user)
+        with CaptureQueriesContext(connection) as six_pools:
+            response = self.client.get(reverse('survivor:my_pools'))
+        self.assertEqual(len(response.context['pools']), 6)
+        self.assertEqual(len(six_pools.captured_queries), len(one_pool.captured_queries))
+
+        item = next(item for item in response.context['pools'] if item['entry'] == self.entry)
+        self.assertEqual(item['total_count'], 11)
+        self.assertEqual(item['active_count'], PlayerEntry.objects.filter(pool=pool, is_eliminated=False).count())
+        self.assertEqual(
+            sum(usage['used'] for usage in item['team_usage']),
+            self.entry.picks.count()
+        )
+
+
+class AsyncViewsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        ScaleDataGenerator(pools=3, entries_per_pool=12, played=3, seed=31).generate()
+        self.pool = GamePool.objects.order_by('id').first()
+        self.matchday = get_season_calendar(self.pool.season_id).current()
+        self.client.force_login(PlayerEntry.objects.filter(pool=self.pool).first().user)
+
+    def pages(self):
+        rows = reverse('survivor:pool_standings_rows', args=[self.pool.id])
+        responses = {
+            'home': self.client.get(reverse('home')),
+            'fixtures': self.client.get(reverse('survivor:fixtures')),
+            'matchday': self.client.get(
+                reverse('survivor:matchday_fixtures', args=[self.matchday.id]), {'pool': self.pool.id}
+            ),
+            'rows': self.client.get(rows),
+            'search': self.client.get(rows, {'q': 'load'}),
+        }
+        for response in responses.values():
+            self.assertEqual(response.status_code, 200)
+        return responses
+
+    def test_async_views_serve_the_same_pages(self):
+        sync = self.pages()
+        with benchmark.use_async_views():
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(reverse('home')).func))
+            async_ = self.pages()
+        self.assertFalse(asyncio.iscoroutinefunction(resolve(reverse('home')).func))
+
+        self.assertEqual(
+            [(pool.id, pool.active_count, pool.total_count) for pool in async_['home'].context['active_pools']],
+            [(pool.id, pool.active_count, pool.total_count) for pool in sync['home'].context['active_pools']],
+        )
+        self.assertEqual(async_['fixtures'].context['current_matchday'], sync['fixtures'].context['current_matchday'])
+        self.assertEqual(async_['matchday'].context['total_picks'], sync['matchday'].context['total_picks'])
+        self.assertEqual(async_['rows'].content, sync['rows'].content)
+        self.assertEqual(async_['search'].content, sync['search'].content)
+
+    def test_pool_that_is_not_a_number_is_not_found(self):
+        matchday = reverse('survivor:matchday_fixtures', args=[self.matchday.id])
+        self.assertEqual(self.client.get(matchday, {'pool': 'abc'}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('survivor:pick_heatmap'), {'pool': '1x'}).status_code, 404)
+        with benchmark.use_async_views():
+            self.assertEqual(self.client.get(matchday, {'pool': 'abc'}).status_code, 404)
+
+    def test_home_counts_players_without_a_query_per_pool(self):
+        with CaptureQueriesContext(connection) as three_pools:
+            self.client.get(reverse('home'))
+        user = User.objects.create_user('extra', password='pw')
+        extra = GamePool.objects.create(name='Extra', season=self.pool.season, created_by=user)
+        PlayerEntry.objects.create(user=user, pool=extra)
+
+        with CaptureQueriesContext(connection) as four_pools:
+            response = self.client.get(reverse('home'))
+        self.assertEqual(len(four_pools.captured_queries), len(three_pools.captured_queries))
+        for pool in response.context['active_pools']:
+            self.assertEqual(pool.active_count, pool.active_players_count)
+            self.assertEqual(pool.total_count, pool.total_players_count)
+
+
+class CachingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_urls(self):
+        self.assertEqual(
+            cache_url.parse('redis://cache.internal:6379/1'),
+            {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache.internal:6379/1'},
+        )
+        self.assertEqual(cache_url.parse('file:///var/cache/survivor')['LOCATION'], '/var/cache/survivor')
+        self.assertEqual(cache_url.parse('db://')['LOCATION'], 'survivor_cache')
+        self.assertEqual(cache_url.parse('db://')['OPTIONS'], {'MAX_ENTRIES': cache_url.DEFAULT_MAX_ENTRIES})
+        self.assertEqual(cache_url.parse('file:///tmp/c?max_entries=5000')['OPTIONS'], {'MAX_ENTRIES': 5000})
+        with self.assertRaises(ImproperlyConfigured):
+            cache_url.parse('memcache://localhost')
+
+    def test_get_or_compute_computes_once_and_shares_refreshes(self):
+        compute = mock.Mock(return_value='fresh')
+        self.assertEqual(caching.get_or_compute('page', compute, 60), 'fresh')
+        self.assertEqual(caching.get_or_compute('page', compute, 60), 'fresh')
+        self.assertEqual(compute.call_count, 1)
+
+        # Close to expiry after a slow computation, a reader refreshes early...
+        cache.set('page', ('old', 10.0, time.time() + 1), 60)
+        with mock.patch('survivor.services.caching.random.random', return_value=0.5):
+            self.assertEqual(caching.get_or_compute('page', compute, 60), 'fresh')
+        self.assertEqual(compute.call_count, 2)
+
+        # ...unless someone else already is, in which case it gets the old value
+        cache.set('page', ('old', 10.0, time.time() + 1), 60)
+        cache.add(caching.LOCK_PREFIX + 'page', 1)
+        self.assertEqual(caching.get_or_compute('page', compute, 60), 'old')
+        self.assertEqual(compute.call_count, 2)
+
+    def test_incr_and_add_are_atomic_across_threads_on_the_file_cache(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            CACHES={'default': cache_url.parse(f'file://{directory}/cache')},
+            CACHE_LOCK_DIR=f'{directory}/locks',
+        ):
+            def count():
+                for _ in range(25):
+                    caching.incr('counter', 60)
+
+            threads = [threading.Thread(target=count) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(cache.get('counter'), 200)
+
+            # Only one of many racing callers gets a lock
+            won = []
+            start = threading.Barrier(16)
+
+            def take_lock():
+                start.wait()
+                if caching.add('lock', 1, 60):
+                    won.append(1)
+
+            threads = [threading.Thread(target=take_lock) for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(won), 1)
+
+    @override_settings(API_RATE_LIMIT=2)
+    def test_api_requests_share_one_rate_limit(self):
+        ok = mock.Mock(status_code=200)
+        ok.json.return_value = {'teams': []}
+        # Waiting out the window starts a new one
+        with mock.patch('survivor.services.football_api.requests.get', return_value=ok), \
+                mock.patch.object(FootballDataAPI, '_wait', side_effect=lambda *args, **kwargs: cache.clear()) as wait:
+            FootballDataAPI().get_teams()
+            FootballDataAPI().get_teams()
+            wait.assert_not_called()
+            FootballDataAPI().get_teams()
+        wait.assert_called_once()
+
+    @override_settings(API_RATE_LIMIT=1, API_RATE_PERIOD=60)
+    def test_no_wait_when_the_window_ends_while_counting(self):
+        ok = mock.Mock(status_code=200)
+        ok.json.return_value = {'teams': []}
+        cache.set('api_requests:0', 1, 60)
+        # The window is used up, but over by the time incr() returns
+        clock = itertools.chain([59.9], itertools.repeat(60.1))
+        with mock.patch('survivor.services.football_api.requests.get', return_value=ok), \
+                mock.patch('survivor.services.football_api.time.time', side_effect=lambda: next(clock)), \
+                mock.patch('survivor.services.football_api.time.sleep') as sleep:
+            FootballDataAPI().get_teams()
+            self.assertEqual(cache.get('api_requests:1'), 1)
+        sleep.assert_not_called()
+
+
+class DegradationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        ScaleDataGenerator(pools=1, entries_per_pool=8, played=2, seed=37).generate()
+        self.pool = GamePool.objects.get()
+        self.client.force_login(PlayerEntry.objects.filter(pool=self.pool).first().user)
+        self.url = reverse('survivor:pool_detail', args=[self.pool.id])
+        self.addCleanup(degradation.health.reset)
+
+    def stale_count(self, reason):
+        return metrics.STALE_PAGES.values.get(('pool_detail', reason), 0)
+
+    def test_slow_database_serves_the_last_good_render(self):
+        fresh = self.client.get(self.url)
+        self.assertNotIn('X-Survivor-Stale', fresh)
+
+        degradation.health.latency = 1.0
+        served = self.stale_count('slow')
+        with mock.patch('survivor.services.degradation._revalidate') as revalidate, \
+                mock.patch('survivor.views.get_pool_standings') as standings:
+            stale = self.client.get(self.url)
+        standings.assert_not_called()
+        revalidate.assert_called_once()
+        self.assertEqual(stale['X-Survivor-Stale'], 'slow')
+        self.assertContains(stale, 'class="stale-notice"')
+        self.assertEqual(
+            stale.content.decode().split('<div class="stale-notice">')[0],
+            fresh.content.decode().split('<!-- stale-notice -->')[0],
+        )
+        self.assertEqual(self.stale_count('slow'), served + 1)
+
+    def test_failing_query_falls_back_and_degrades_the_process(self):
+        with mock.patch('survivor.views.get_pool_standings', side_effect=OperationalError('locked')):
+            with self.assertRaises(OperationalError):
+                self.client.get(self.url)
+        degradation.health.reset()
+
+        self.client.get(self.url)
+        served = self.stale_count('error')
+        with mock.patch('survivor.views.get_pool_standings', side_effect=OperationalError('locked')), \
+                mock.patch('survivor.services.degradation._revalidate'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Survivor-Stale'], 'error')
+        self.assertEqual(degradation.health.degraded(), 'error')
+        self.assertEqual(self.stale_count('error'), served + 1)
+
+    def test_revalidation_refreshes_the_kept_render(self):
+        self.client.get(self.url)
+        PlayerEntry.objects.create(user=User.objects.create_user('latecomer', password='pw'), pool=self.pool)
+        degradation.health.latency = 1.0
+
+        # Revalidate in this thread rather than a background one
+        with mock.patch('survivor.services.degradation._revalidate', side_effect=degradation.render_again):
+            self.assertNotContains(self.client.get(self.url), 'latecomer')
+        # Its quick queries brought the average back down
+        self.assertIsNone(degradation.health.degraded())
+
+        degradation.health.latency = 1.0
+        with mock.patch('survivor.services.degradation._revalidate'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Survivor-Stale'], 'slow')
+        self.assertContains(response, 'latecomer')
+
+
+
+
+@override_settings(LIVE_EVENTS_POLL_INTERVAL=0.05)
+class LiveEventStreamTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('load_teams', stdout=StringIO())
+        invalidate_team_registry()
+        invalidate_calendar()
+        self.generator = ScaleDataGenerator(pools=1, entries_per_pool=3, played=1, seed=31)
+        self.generator.generate()
+        self.pool = GamePool.objects.get(season=self.generator.season)
+        self.matchday = Matchday.objects.get(season=self.generator.season, number=1)
+
+    def stream(self, path, cookie='', last_event_id=None, during=()):
+        """Run the ASGI stream, calling each of `during` on the way, until the fake client disconnects; returns (status, body)"""
+        headers = [(b'cookie', cookie.encode())]
+        if last_event_id is not None:
+            headers.append((b'last-event-id', str(last_event_id).encode()))
+        scope = {'type': 'http', 'method': 'GET', 'path': path, 'headers': headers}
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            for step in during:
+                await sync_to_async(step)()
+                await asyncio.sleep(0.3)
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        async_to_sync(live_events)(scope, receive, send)
+        body = b''.join(message.get('body', b'') for message in sent[1:]).decode()
+        return sent[0]['status'], body
+
+    def test_stream_requires_login_and_an_existing_pool(self):
+        path = f'/survivor/live/pool/{self.pool.id}/'
+        self.assertEqual(self.stream(path)[0], 403)
+        self.client.force_login(User.objects.create_user('fan', password='pw'))
+        cookie = f'sessionid={self.client.cookies["sessionid"].value}'
+        self.assertEqual(self.stream('/survivor/live/pool/999999/', cookie)[0], 404)
+
+    def test_replays_and_pushes_pool_events(self):
+        self.client.force_login(User.objects.create_user('fan', password='pw'))
+        cookie = f'sessionid={self.client.cookies["sessionid"].value}'
+        publish([elimination_event(self.matchday, self.pool.id, ['early'], 2)])
+
+        def knock_out_another():
+            publish([elimination_event(self.matchday, self.pool.id, ['late'], 1)])
+
+        path = f'/survivor/live/pool/{self.pool.id}/'
+        # New listeners get what happens while they are connected
+        status, body = self.stream(path, cookie, during=[knock_out_another])
+        self.assertEqual(status, 200)
+        self.assertIn('"late"', body)
+        self.assertNotIn('"early"', body)
+
+        # Reconnecting browsers catch up from their Last-Event-ID
+        _, body = self.stream(path, cookie, last_event_id=0)
+        self.assertEqual(body.count('event: elimination'), 2)
+        self.assertLess(body.index('"early"'), body.index('"late"'))
+
+    def test_events_committed_out_of_id_order_are_pushed(self):
+        self.client.force_login(User.objects.create_user('fan', password='pw'))
+        cookie = f'sessionid={self.client.cookies["sessionid"].value}'
+
+        first_id = (LiveEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+
+        # Two publishers: the row with the lower id commits last
+        def commit_higher_id():
+            event = elimination_event(self.matchday, self.pool.id, ['committed first'], 2)
+            event.id = first_id + 1
+            publish([event])
+
+        def commit_lower_id():
+            event = elimination_event(self.matchday, self.pool.id, ['committed last'], 1)
+            event.id = first_id
+            publish([event])
+
+        _, body = self.stream(
+            f'/survivor/live/pool/{self.pool.id}/', cookie, during=[commit_higher_id, commit_lower_id]
+        )
+        self.assertIn('"committed first"', body)
+        self.assertIn('"committed last"', body)
+        self.assertEqual(body.count('event: elimination'), 2)
 
-# Create your tests here.
@@ -1,17 +1,34 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from . import admin_views
 
+# The read-only pages, async under ASGI
+read_views = views
+if settings.ASYNC_VIEWS:
+    from . import async_views as read_views
+
 app_name = 'survivor'
 urlpatterns = [
+    path('pools/mine/', views.my_pools, name='my_pools'),
     path('pool/<int:pool_id>/', views.pool_detail, name='pool_detail'),
     path('pool/<int:pool_id>/pick/', views.make_pick, name='make_pick'),
     path('pool/<int:pool_id>/join/', views.join_pool, name='join_pool'),
     path('pool/<int:pool_id>/history/', views.pick_history, name='pick_history'),
-    path('pool/<int:pool_id>/fixtures/', views.fixtures, name='pool_fixtures'),
+    path('pool/<int:pool_id>/plan/', views.pick_plan, name='pick_plan'),
+    path('pool/<int:pool_id>/standings/', views.standings_history, name='standings_history'),
+    path('pool/<int:pool_id>/analytics/', views.pool_analytics, name='pool_analytics'),
+    path('pool/<int:pool_id>/analytics.json', views.pool_analytics_json, name='pool_analytics_json'),
+    path('pool/<int:pool_id>/standings/rows/', read_views.pool_standings_rows, name='pool_standings_rows'),
+    path('pool/<int:pool_id>/standings/<int:matchday_number>/', views.standings_history, name='standings_as_of'),
+    path('pool/<int:pool_id>/fixtures/', read_views.fixtures, name='pool_fixtures'),
     path('pool/create/', views.create_pool, name='create_pool'),
-    path('fixtures/', views.fixtures, name='fixtures'),
-    path('matchday/<int:matchday_id>/', views.matchday_fixtures, name='matchday_fixtures'),
+    path('fixtures/', read_views.fixtures, name='fixtures'),
+    path('matchday/<int:matchday_id>/', read_views.matchday_fixtures, name='matchday_fixtures'),
+    path('picks/heatmap/', views.pick_heatmap, name='pick_heatmap'),
+    path('picks/export.csv', views.pick_cube_export, {'fmt': 'csv'}, name='pick_cube_csv'),
+    path('picks/export.npz', views.pick_cube_export, {'fmt': 'npz'}, name='pick_cube_npz'),
+    path('leaderboard/', views.leaderboard, name='leaderboard'),
     
     # Admin sync URLs
     path('admin/sync/', admin_views.sync_dashboard, name='sync_dashboard'),
@@ -4,22 +4,48 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models import Q, Count, Prefetch
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.conf import settings
+from django.db.models import Count, Q
 from datetime import timedelta
-from .models import GamePool, PlayerEntry, Pick, Matchday, Team, Season, Match
+import csv
+from .models import (
+    MAX_PICKS_PER_TEAM, GamePool, PlayerEntry, Pick, Matchday, Team, Season, Match, SurvivalForecast, StandingsSnapshot,
+)
+from .services import metrics as survivor_metrics
+from .services.standings import get_pool_standings, render_standings_rows
+from .services.pick_distribution import get_pick_counts
+from .services.calendar import get_active_season, get_season_calendar
+from .services.fixtures import get_fixture_grid
+from .services.teams import get_team_registry
+from .services.simulation import get_pool_forecast
+from .services.planner import get_pick_plan
+from .services.snapshots import survival_curve
+from .services.analytics import get_pool_analytics
+from .services.pick_cube import get_pick_cube
+from .services.leaderboard import leaderboard_page, record_join
+from .services.dashboard import get_user_pools
+from .services.degradation import serve_stale
 
-def home(request):
-    active_pools = GamePool.objects.filter(is_active=True).select_related('season')
-    
-    # Get upcoming matches for preview
-    upcoming_matches = Match.objects.filter(
+def active_pools_query():
+    """Active pools with their player counts annotated, for the home page"""
+    return GamePool.objects.filter(is_active=True).select_related('season').annotate(
+        active_count=Count('entries', filter=Q(entries__is_eliminated=False)),
+        total_count=Count('entries'),
+    )
+
+def upcoming_matches_query():
+    return Match.objects.filter(
         kickoff__gte=timezone.now(),
         result__isnull=True
     ).select_related('home_team', 'away_team', 'matchday').order_by('kickoff')[:5]
-    
+
+@serve_stale
+def home(request):
     context = {
-        'active_pools': active_pools,
-        'upcoming_matches': upcoming_matches
+        'active_pools': active_pools_query(),
+        # Get upcoming matches for preview
+        'upcoming_matches': upcoming_matches_query()
     }
     return render(request, 'home.html', context)
 
@@ -38,8 +64,14 @@ def signup(request):
     return render(request, 'signup.html', {'form': form})
 
 @login_required
+def my_pools(request):
+    """Every pool the user has joined, in a fixed number of queries"""
+    return render(request, 'my_pools.html', {'pools': get_user_pools(request.user)})
+
+@login_required
+@serve_stale
 def pool_detail(request, pool_id):
-    pool = get_object_or_404(GamePool, id=pool_id)
+    pool = get_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
 
     # Check if user is in this pool
     try:
@@ -47,22 +79,13 @@ def pool_detail(request, pool_id):
     except PlayerEntry.DoesNotExist:
         player_entry = None
 
-    # Get current matchday
-    current_matchday = Matchday.objects.filter(
-        season=pool.season,
-        start_date__lte=timezone.now()
-    ).order_by('-number').first()
-
-    # Get next matchday for picks
-    next_matchday = Matchday.objects.filter(
-        season=pool.season,
-        start_date__gt=timezone.now()
-    ).order_by('number').first()
+    # Get current matchday and next matchday for picks from the in-process calendar
+    calendar = get_season_calendar(pool.season_id)
+    current_matchday = calendar.current()
+    next_matchday = calendar.next()
 
-    # Get all players in pool
-    all_entries = PlayerEntry.objects.filter(
-        pool=pool
-    ).select_related('user').order_by('is_eliminated', '-eliminated_matchday__number')
+    # Get the standings table, cached until someone joins or is eliminated
+    standings = get_pool_standings(pool)
 
     # Get fixtures for next matchday
     next_fixtures = []
@@ -84,23 +107,30 @@ def pool_detail(request, pool_id):
         'player_entry': player_entry,
         'current_matchday': current_matchday,
         'next_matchday': next_matchday,
-        'all_entries': all_entries,
+        'standings_html': standings['html'],
+        'active_players_count': standings['active_count'],
+        'total_players_count': standings['total_count'],
         'next_fixtures': next_fixtures,
-        'recent_results': recent_results
+        'recent_results': recent_results,
+        'forecast': get_pool_forecast(pool),
+        'my_forecast': None,
     }
 
+    if player_entry and not player_entry.is_eliminated and context['forecast']['favourites']:
+        context['my_forecast'] = SurvivalForecast.objects.filter(player_entry=player_entry).first()
+
     # If player is in pool and not eliminated, get pick info
     if player_entry and not player_entry.is_eliminated and next_matchday:
         # Get teams already picked by count
         picked_teams = {}
-        for pick in player_entry.picks.all():
-            if pick.team.id not in picked_teams:
-                picked_teams[pick.team.id] = 0
-            picked_teams[pick.team.id] += 1
+        for team_id in player_entry.picks.values_list('team_id', flat=True):
+            if team_id not in picked_teams:
+                picked_teams[team_id] = 0
+            picked_teams[team_id] += 1
 
         # Get all teams with pick availability and their fixtures
         teams = []
-        for team in Team.objects.all().order_by('name'):
+        for team in get_team_registry():
             # Find this team's match in the next matchday
             team_match = None
             for fixture in next_fixtures:
@@ -108,31 +138,86 @@ def pool_detail(request, pool_id):
                     team_match = fixture
                     break
             
+            not_lose = team_match.not_lose_probability(team) if team_match else None
             teams.append({
                 'team': team,
                 'pick_count': picked_teams.get(team.id, 0),
-                'available': picked_teams.get(team.id, 0) < 2,
+                'available': picked_teams.get(team.id, 0) < MAX_PICKS_PER_TEAM,
                 'match': team_match,  # Add match info to each team
-                'is_home': team_match.home_team == team if team_match else None
+                'is_home': team_match.home_team == team if team_match else None,
+                # Rated chance of not losing, as a difficulty hint
+                'not_lose_pct': not_lose * 100 if not_lose is not None else None
             })
 
         # Check if already picked for this matchday
         current_pick = Pick.objects.filter(
             player_entry=player_entry,
             matchday=next_matchday
-        ).first()
+        ).select_related('team').first()
 
         context['teams'] = teams
         context['current_pick'] = current_pick
 
     return render(request, 'pool_detail.html', context)
 
+def fixtures_context(request, season, pool):
+    """Template context of the fixtures page for a season"""
+    # Categorize matchdays using the calendar's sorted start and end times
+    calendar = get_season_calendar(season.id)
+    now = timezone.now()
+    all_matchdays = calendar.matchdays
+    past_matchdays = calendar.past(now)
+    in_progress = calendar.in_progress(now)
+    current_matchday = in_progress[-1] if in_progress else None
+    future_matchdays = calendar.future(now)
+    
+    try:
+        window = max(1, int(request.GET['window']))
+    except (KeyError, ValueError):
+        window = None
+    
+    if window:
+        anchor = current_matchday or (future_matchdays[0] if future_matchdays else None)
+        anchor_index = all_matchdays.index(anchor) if anchor else len(all_matchdays) - 1
+        start = max(0, min(anchor_index - (window - 1) // 2, len(all_matchdays) - window))
+        all_matchdays = all_matchdays[start:start + window]
+        shown = {md.id for md in all_matchdays}
+        past_matchdays = [md for md in past_matchdays if md.id in shown]
+        future_matchdays = [md for md in future_matchdays if md.id in shown]
+        if current_matchday and current_matchday.id not in shown:
+            current_matchday = None
+    else:
+        past_matchdays = past_matchdays[-3:]
+        future_matchdays = future_matchdays[:3]
+    
+    # Load the pre-serialized matches of the matchdays actually rendered
+    shown_matchdays = past_matchdays + future_matchdays
+    if current_matchday:
+        shown_matchdays.append(current_matchday)
+    grid = {data['id']: data for data in get_fixture_grid(shown_matchdays)}
+    
+    return {
+        'season': season,
+        'pool': pool,
+        'window': window,
+        'past_matchdays': [grid[md.id] for md in past_matchdays],
+        'current_matchday': grid[current_matchday.id] if current_matchday else None,
+        'future_matchdays': [grid[md.id] for md in future_matchdays],
+        'all_matchdays': all_matchdays
+    }
+
 @login_required
+@serve_stale
 def fixtures(request, pool_id=None):
-    """Display fixtures and results for all matchdays"""
+    """Display fixtures and results for the season
+
+    By default shows the current matchday with the three before and after it.
+    `?window=N` shows N matchdays around today instead, with navigation
+    limited to that window.
+    """
     
     # Get active season
-    season = Season.objects.filter(is_active=True).first()
+    season = get_active_season()
     if not season:
         messages.warning(request, 'No active season found.')
         return redirect('home')
@@ -140,62 +225,13 @@ def fixtures(request, pool_id=None):
     # Get pool if specified
     pool = None
     if pool_id:
-        pool = get_object_or_404(GamePool, id=pool_id)
+        pool = get_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
         season = pool.season
     
-    # Get all matchdays with their matches
-    matchdays = Matchday.objects.filter(
-        season=season
-    ).prefetch_related(
-        Prefetch(
-            'matches',
-            queryset=Match.objects.select_related('home_team', 'away_team').order_by('kickoff')
-        )
-    ).order_by('number')
-    
-    # Categorize matchdays
-    past_matchdays = []
-    current_matchday = None
-    future_matchdays = []
-    
-    now = timezone.now()
-    for md in matchdays:
-        if md.end_date < now:
-            past_matchdays.append(md)
-        elif md.start_date <= now <= md.end_date:
-            current_matchday = md
-        else:
-            future_matchdays.append(md)
-    
-    context = {
-        'season': season,
-        'pool': pool,
-        'past_matchdays': past_matchdays,
-        'current_matchday': current_matchday,
-        'future_matchdays': future_matchdays,
-        'all_matchdays': matchdays
-    }
-    
+    context = fixtures_context(request, season, pool)
     return render(request, 'fixtures.html', context)
 
-def matchday_fixtures(request, matchday_id):
-    """Display detailed fixtures for a specific matchday"""
-    matchday = get_object_or_404(Matchday, id=matchday_id)
-    
-    matches = Match.objects.filter(
-        matchday=matchday
-    ).select_related('home_team', 'away_team').order_by('kickoff')
-    
-    # Get pick statistics for each team
-    team_picks = {}
-    if request.user.is_authenticated:
-        picks = Pick.objects.filter(
-            matchday=matchday
-        ).values('team').annotate(count=Count('id'))
-        
-        for pick in picks:
-            team_picks[pick['team']] = pick['count']
-    
+def matchday_fixtures_context(matchday, pool, matches, team_picks):
     # Add pick counts to matches
     matches_with_stats = []
     for match in matches:
@@ -205,11 +241,42 @@ def matchday_fixtures(request, matchday_id):
             'away_picks': team_picks.get(match.away_team.id, 0)
         })
     
-    context = {
+    return {
         'matchday': matchday,
+        'pool': pool,
         'matches_with_stats': matches_with_stats,
         'total_picks': sum(team_picks.values())
     }
+
+def pool_id_param(request):
+    """The ?pool= id a page is limited to, or None; anything but a number is a 404"""
+    pool_id = request.GET.get('pool')
+    if not pool_id:
+        return None
+    if not pool_id.isdecimal():
+        raise Http404('No GamePool matches the given query.')
+    return int(pool_id)
+
+def matchday_fixtures(request, matchday_id):
+    """Display detailed fixtures for a specific matchday"""
+    matchday = get_object_or_404(Matchday, id=matchday_id)
+    
+    matches = Match.objects.filter(
+        matchday=matchday
+    ).select_related('home_team', 'away_team').order_by('kickoff')
+    
+    # Optionally limit pick statistics to a single pool
+    pool = None
+    pool_id = pool_id_param(request)
+    if pool_id:
+        pool = get_object_or_404(GamePool, id=pool_id)
+    
+    # Get pick statistics for each team from the precomputed distribution
+    team_picks = {}
+    if request.user.is_authenticated:
+        team_picks = get_pick_counts(matchday, pool=pool)
+    
+    context = matchday_fixtures_context(matchday, pool, matches, team_picks)
     
     return render(request, 'matchday_fixtures.html', context)
 
@@ -227,10 +294,23 @@ def join_pool(request, pool_id):
         messages.warning(request, 'You are already in this pool.')
     else:
         PlayerEntry.objects.create(user=request.user, pool=pool)
+        record_join(request.user)
         messages.success(request, f'Successfully joined pool {pool.name}!')
 
     return redirect('survivor:pool_detail', pool_id=pool.id)
 
+@login_required
+def pool_standings_rows(request, pool_id):
+    """A page of standings rows for the pool_detail table, loaded as it scrolls or is searched"""
+    pool = get_object_or_404(GamePool, id=pool_id)
+    after = request.GET.get('after')
+    prefix = request.GET.get('q', '').strip()
+    
+    # The unsearched first page is the cached one from pool_detail
+    if not after and not prefix:
+        return HttpResponse(get_pool_standings(pool)['rows'])
+    return HttpResponse(render_standings_rows(pool, after, prefix))
+
 @login_required
 def make_pick(request, pool_id):
     if request.method == 'POST':
@@ -245,7 +325,10 @@ def make_pick(request, pool_id):
         team_id = request.POST.get('team_id')
         
         matchday = get_object_or_404(Matchday, id=matchday_id)
-        team = get_object_or_404(Team, id=team_id)
+        try:
+            team = get_team_registry().by_id[int(team_id)]
+        except (KeyError, TypeError, ValueError):
+            raise Http404('No Team matches the given query.')
         
         # Check if matchday has started
         if matchday.has_started:
@@ -274,70 +357,281 @@ def make_pick(request, pool_id):
 @login_required
 def pick_history(request, pool_id):
     """Display user's pick history for a pool"""
-    pool = get_object_or_404(GamePool, id=pool_id)
+    pool = get_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
     
     try:
-        player_entry = PlayerEntry.objects.get(user=request.user, pool=pool)
+        player_entry = PlayerEntry.objects.select_related('eliminated_matchday').get(
+            user=request.user, pool=pool
+        )
     except PlayerEntry.DoesNotExist:
         messages.warning(request, 'You are not in this pool.')
         return redirect('survivor:pool_detail', pool_id=pool.id)
     
-    picks = Pick.objects.filter(
+    picks = list(Pick.objects.filter(
         player_entry=player_entry
-    ).select_related('team', 'matchday').order_by('matchday__number')
+    ).select_related('team', 'matchday').order_by('matchday__number'))
+    
+    # Get the matches of all picked matchdays at once, indexed by (matchday, team)
+    matches_by_team = {}
+    matches = Match.objects.filter(
+        matchday_id__in={pick.matchday_id for pick in picks}
+    ).select_related('home_team', 'away_team')
+    for match in matches:
+        matches_by_team[(match.matchday_id, match.home_team_id)] = match
+        matches_by_team[(match.matchday_id, match.away_team_id)] = match
     
-    # Get the match each team played
+    # Pair each pick with its match and gather statistics in a single pass
     picks_with_matches = []
+    pick_counts = {}
+    successful_picks = failed_picks = pending_picks = 0
     for pick in picks:
-        match = Match.objects.filter(
-            Q(home_team=pick.team) | Q(away_team=pick.team),
-            matchday=pick.matchday
-        ).select_related('home_team', 'away_team').first()
+        match = matches_by_team.get((pick.matchday_id, pick.team_id))
+        was_home = match.home_team_id == pick.team_id if match else None
         
         picks_with_matches.append({
             'pick': pick,
             'match': match,
-            'opponent': match.away_team if match and match.home_team == pick.team else match.home_team if match else None,
-            'was_home': match.home_team == pick.team if match else None
+            'opponent': (match.away_team if was_home else match.home_team) if match else None,
+            'was_home': was_home
         })
+        
+        pick_counts[pick.team_id] = pick_counts.get(pick.team_id, 0) + 1
+        if pick.is_successful is True:
+            successful_picks += 1
+        elif pick.is_successful is False:
+            failed_picks += 1
+        else:
+            pending_picks += 1
     
     # Calculate team usage for all teams
     team_usage = []
-    all_teams = Team.objects.all().order_by('name')
-    
-    for team in all_teams:
-        pick_count = player_entry.get_pick_count_for_team(team)
+    for team in get_team_registry():
+        pick_count = pick_counts.get(team.id, 0)
         team_usage.append({
             'team': team,
             'pick_count': pick_count,
             'status': 'used-twice' if pick_count == 2 else 'used-once' if pick_count == 1 else 'available'
         })
     
-    # Calculate statistics
-    successful_picks = picks.filter(is_successful=True).count()
-    failed_picks = picks.filter(is_successful=False).count()
-    pending_picks = picks.filter(is_successful__isnull=True).count()
-    unique_teams = picks.values('team').distinct().count()
-    
+    total_picks = len(picks)
     context = {
         'pool': pool,
         'player_entry': player_entry,
         'picks_with_matches': picks_with_matches,
         'team_usage': team_usage,
         'stats': {
-            'total_picks': picks.count(),
+            'total_picks': total_picks,
             'successful_picks': successful_picks,
             'failed_picks': failed_picks,
             'pending_picks': pending_picks,
-            'unique_teams': unique_teams,
-            'weeks_survived': picks.count() - 1 if player_entry.is_eliminated else picks.count()
+            'unique_teams': len(pick_counts),
+            'weeks_survived': total_picks - 1 if player_entry.is_eliminated else total_picks
         }
     }
     
     return render(request, 'pick_history.html', context)
 
+@login_required
+def pick_plan(request, pool_id):
+    """Suggest the best-survival picks for the user's remaining matchdays"""
+    pool = get_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
+    
+    try:
+        player_entry = PlayerEntry.objects.select_related('pool__season').get(
+            user=request.user, pool=pool
+        )
+    except PlayerEntry.DoesNotExist:
+        messages.warning(request, 'You are not in this pool.')
+        return redirect('survivor:pool_detail', pool_id=pool.id)
+    
+    if player_entry.is_eliminated:
+        messages.info(request, 'You have been eliminated from this pool, there is nothing left to plan.')
+        return redirect('survivor:pick_history', pool_id=pool.id)
+    
+    plan = get_pick_plan(player_entry)
+    teams = get_team_registry()
+    rows = [
+        {
+            **row,
+            'team': teams.get(row['team_id']),
+            'opponent': teams.get(row['opponent_id']),
+            'current_team': teams.get(row['current_team_id']),
+            'probability_pct': row['probability'] * 100,
+        }
+        for row in plan['matchdays']
+    ]
+    
+    context = {
+        'pool': pool,
+        'player_entry': player_entry,
+        'rows': rows,
+        'survival_pct': plan['survival'] * 100,
+    }
+    
+    return render(request, 'pick_plan.html', context)
+
+@login_required
+def standings_history(request, pool_id, matchday_number=None):
+    """Who was still alive after a completed matchday, from its snapshot"""
+    pool = get_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
+    
+    curve = survival_curve(pool)
+    if not curve:
+        messages.info(request, 'No matchday of this pool has been completed yet.')
+        return redirect('survivor:pool_detail', pool_id=pool.id)
+    if matchday_number is None:
+        matchday_number = curve[-1][0]
+    
+    snapshot = get_object_or_404(
+        StandingsSnapshot.objects.select_related('matchday'),
+        pool=pool, matchday__number=matchday_number
+    )
+    alive = set(snapshot.survivor_ids().tolist())
+    survivors = [
+        {'entry_id': entry_id, 'username': username}
+        for entry_id, username in PlayerEntry.objects.filter(pool=pool)
+        .order_by('user__username').values_list('id', 'user__username')
+        if entry_id in alive
+    ]
+    
+    context = {
+        'pool': pool,
+        'snapshot': snapshot,
+        'survivors': survivors,
+        'curve': [
+            {
+                'number': number,
+                'alive': alive_count,
+                'pct': alive_count / snapshot.total_count * 100 if snapshot.total_count else 0,
+            }
+            for number, alive_count in curve
+        ],
+    }
+    
+    return render(request, 'standings_history.html', context)
+
+@login_required
+def pool_analytics(request, pool_id):
+    """Survival curve and elimination statistics of a pool"""
+    pool = get_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
+    analytics = get_pool_analytics(pool)
+    
+    player_entry = PlayerEntry.objects.filter(user=request.user, pool=pool).first()
+    entries = analytics['entries']
+    context = {
+        'pool': pool,
+        'analytics': analytics,
+        'survivors': [
+            {**point, 'pct': point['alive'] / entries * 100 if entries else 0}
+            for point in analytics['survivors']
+        ],
+        'elimination_by_team': [
+            {**item, 'rate_pct': item['elimination_rate'] * 100}
+            for item in analytics['elimination_by_team']
+        ],
+        'my_path': analytics['paths'].get(player_entry.id) if player_entry else None,
+    }
+    
+    return render(request, 'pool_analytics.html', context)
+
+@login_required
+def pool_analytics_json(request, pool_id):
+    """The pool analytics, including every entry's path, as JSON"""
+    pool = get_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
+    return JsonResponse(get_pool_analytics(pool))
+
+def _pick_cube_scope(request):
+    """The season and optional pool (?pool=) a pick cube view is about"""
+    pool = None
+    season = get_active_season()
+    pool_id = pool_id_param(request)
+    if pool_id:
+        pool = get_object_or_404(GamePool.objects.select_related('season'), id=pool_id)
+        season = pool.season
+    if not season:
+        raise Http404('No active season found.')
+    return season, pool
+
+@login_required
+def pick_heatmap(request):
+    """Pick popularity by team and locked matchday, for all pools or one"""
+    season, pool = _pick_cube_scope(request)
+    cube = get_pick_cube(season)
+    heat = cube.heatmap(pool.id if pool else None)
+    
+    teams = [team for team in get_team_registry() if team.id in cube.team_index]
+    columns = [cube.team_index[team.id] for team in teams]
+    rows = []
+    for number in cube.matchday_numbers:
+        counts = heat[number - 1, columns]
+        total = int(counts.sum())
+        rows.append({
+            'number': number,
+            'total': total,
+            'cells': [
+                {'count': int(count), 'share': count / total if total else 0}
+                for count in counts
+            ],
+        })
+    
+    context = {
+        'season': season,
+        'pool': pool,
+        'teams': teams,
+        'rows': rows,
+        'team_totals': [int(total) for total in heat[:, columns].sum(axis=0)] if rows else [],
+    }
+    
+    return render(request, 'pick_heatmap.html', context)
+
+@login_required
+def pick_cube_export(request, fmt):
+    """Download the pick cube as CSV cells or as NumPy arrays"""
+    season, pool = _pick_cube_scope(request)
+    cube = get_pick_cube(season)
+    filename = f"picks-{season.year}{f'-pool{pool.id}' if pool else ''}"
+    
+    if fmt == 'npz':
+        response = HttpResponse(cube.to_bytes(pool.id if pool else None), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.npz"'
+        return response
+    
+    teams = get_team_registry()
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    writer = csv.writer(response)
+    writer.writerow(['pool_id', 'matchday', 'team_id', 'team', 'count'])
+    for pool_id, number, team_id, count in cube.cells(pool.id if pool else None):
+        team = teams.get(team_id)
+        writer.writerow([pool_id, number, team_id, team.name if team else '', count])
+    return response
+
 @login_required
 def create_pool(request):
     # Implementation for creating a new pool
     # This would typically have a form
-    pass
\ No newline at end of file
+    pass
+
+def metrics(request):
+    """Expose application metrics in the Prometheus text format"""
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden('Invalid metrics token')
+
+    return HttpResponse(
+        survivor_metrics.registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+@login_required
+def leaderboard(request):
+    """Every player's record across all pools, a keyset page at a time"""
+    rows, next_cursor = leaderboard_page(request.GET.get('after'))
+    
+    context = {
+        'rows': rows,
+        'next_cursor': next_cursor,
+        'first_page': not request.GET.get('after'),
+    }
+    
+    return render(request, 'leaderboard.html', context)